@@ -6,15 +6,77 @@ class Settings(BaseSettings):
     google_client_id: str = ""
     google_client_secret: str = ""
     google_redirect_uri: str = "http://localhost:8000/auth/google/callback"
+    google_api_base_url: str = "https://www.googleapis.com"
+    google_oauth_base_url: str = "https://oauth2.googleapis.com"
     canvas_base_url: str = ""
     canvas_client_id: str = ""
     canvas_client_secret: str = ""
     canvas_redirect_uri: str = "http://localhost:8000/auth/canvas/callback"
-    token_encryption_key: str = ""
+    token_encryption_key: str = ""  # comma-separated for rotation; first one encrypts
+    token_reencrypt_on_startup: bool = False
     jwt_secret: str = "dev-secret-change-me"
     jwt_algorithm: str = "HS256"
     jwt_expire_hours: int = 72
+    jwt_previous_secrets: str = ""  # comma-separated; still accepted after rotating jwt_secret
+    jwt_cache_max_entries: int = 4096
+    storage_backend: str = "memory"  # memory | sqlite
+    sqlite_path: str = "chronoforge.db"
+    sqlite_pool_size: int = 4
+    shared_state_url: str = ""  # redis://host:6379/0; empty = in-process
     gemini_api_key: str = ""
+    gemini_api_base_url: str = ""  # empty = SDK default; set to use the REST transport against another host
+    gemini_timeout_seconds: float = 20.0
+    gemini_max_concurrency: int = 4
+    gemini_native_async: bool = False
+    gemini_prompt_token_budget: int = 1200
+    insights_cache_ttl_seconds: float = 3600.0
+    insights_cache_max_entries: int = 1024
+    insights_local_first: bool = False
+    insights_batch_enabled: bool = False
+    insights_batch_hour_utc: int = 2
+    insights_batch_rpm: float = 30.0
+    insights_batch_concurrency: int = 4
+    insights_batch_ttl_seconds: float = 18 * 3600.0
+    insights_batch_active_days: int = 7  # only users who opened the app this recently
+    checkin_worker_concurrency: int = 2
+    checkin_max_attempts: int = 3
+    checkin_retry_backoff_seconds: float = 2.0
+    checkin_retention_per_user: int = 1000
+    http_cache_max_entries: int = 2048
+    presync_enabled: bool = False
+    presync_interval_seconds: float = 300.0
+    presync_lead_seconds: float = 600.0  # sync users expected to open the app within this
+    presync_max_age_seconds: float = 6 * 3600.0  # ...and anyone not synced for this long
+    presync_concurrency: int = 4
+    presync_max_users_per_cycle: int = 500
+    upstream_fresh_seconds: float = 60.0
+    upstream_max_staleness_seconds: float = 900.0
+    upstream_failure_threshold: int = 5
+    upstream_circuit_reset_seconds: float = 30.0
+    request_deadline_seconds: float = 20.0
+    upstream_timeout_seconds: float = 10.0
+    hedge_enabled: bool = False
+    hedge_max_ratio: float = 0.05
+    hedge_min_samples: int = 20
+    hedge_min_delay_seconds: float = 0.05
+    metrics_enabled: bool = False
+    profiling_enabled: bool = False
+    profiling_token: str = ""  # operators send it as X-Profile-Token
+    profiling_max_profiles: int = 20
+    admission_enabled: bool = True
+    admission_cpu_rate_per_minute: float = 30.0  # plan generate / tradeoff, per user
+    admission_cpu_burst: int = 10
+    admission_cpu_concurrency: int = 4  # per worker, across users
+    admission_llm_rate_per_minute: float = 10.0  # insights / check-ins, per user
+    admission_llm_burst: int = 5
+    admission_llm_concurrency: int = 8
+    admission_max_queued_per_user: int = 2  # per class; beyond this, 429
+    admission_max_wait_seconds: float = 5.0
+    warm_up_on_startup: bool = True  # load deferred imports and clients right after startup
+    push_heartbeat_seconds: float = 15.0  # SSE comment ping, keeps proxies from closing idle streams
+    push_retry_ms: int = 3000  # reconnect delay sent to EventSource clients
+    push_buffer_size: int = 50  # events kept per user for Last-Event-ID resume
+    push_max_streams_per_user: int = 5
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -1,12 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.config import get_settings
+from app.routers import admin, auth, calendar, gmail, canvas, goals, plan, checkins, dashboard, events
+from app.services import admission, hedging, jwt_service, metrics, profiler
+from app.services.checkin_pipeline import checkin_jobs, resume_pending
+from app.services.database import database
+from app.services.deadline import DeadlineExceeded, deadline_scope
+from app.services.freshness import busy_snapshots, calendar_snapshots, canvas_snapshots
+from app.services.http_cache import http_cache
+from app.services.insights_batch import nightly_loop
+from app.services.insights_cache import insights_cache
+from app.services.lazy import warm_up_in_background
+from app.services.presync import presync_loop
+from app.services.push import bus
+from app.services.token_store import reencrypt_all
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    s = get_settings()
+    background: list[asyncio.Task] = []
+    if s.warm_up_on_startup:
+        background.append(asyncio.create_task(warm_up_in_background()))
+    if s.insights_batch_enabled:
+        background.append(asyncio.create_task(nightly_loop()))
+    if s.presync_enabled:
+        background.append(asyncio.create_task(presync_loop()))
+    if s.token_reencrypt_on_startup:
+        background.append(asyncio.create_task(reencrypt_all()))
+    background.append(asyncio.create_task(resume_pending()))
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await checkin_jobs.stop()
+    if s.storage_backend == "sqlite":
+        await asyncio.to_thread(database().release_leases)
 
-from app.routers import auth, calendar, gmail, canvas, goals, plan, checkins
 
 app = FastAPI(
     title="ChronoForge API",
     version="0.1.0",
     description="Ruthless schedule optimizer + goal coach backend",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -17,6 +60,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Trace this one request when an operator sends X-Profile-Token."""
+    if not admin.is_operator(request.headers.get("X-Profile-Token")):
+        return await call_next(request)
+    recorder, token = profiler.start(f"{request.method} {request.url.path}")
+    response = None
+    try:
+        response = await call_next(request)
+    finally:
+        profile_id = profiler.stop(recorder, token, {
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code if response is not None else 500,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """Latency and status per route template (not per concrete path)."""
+    if not metrics.enabled():
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.http_latency.observe(time.perf_counter() - started, request.method, path)
+        metrics.http_requests.inc(request.method, path, str(status))
+
+
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Give each request a time budget; clients may ask for a tighter one."""
+    budget = get_settings().request_deadline_seconds
+    requested = request.headers.get("X-Request-Timeout")
+    if requested:
+        try:
+            budget = min(budget, max(float(requested), 0.0))
+        except ValueError:
+            pass
+    with deadline_scope(budget):
+        return await call_next(request)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+
+app.include_router(admin.router)
 app.include_router(auth.router)
 app.include_router(calendar.router)
 app.include_router(gmail.router)
@@ -24,6 +126,26 @@ app.include_router(canvas.router)
 app.include_router(goals.router)
 app.include_router(plan.router)
 app.include_router(checkins.router)
+app.include_router(dashboard.router)
+app.include_router(events.router)
+
+
+metrics.register_cache("http_conditional", http_cache.metrics)
+metrics.register_cache("calendar_snapshots", calendar_snapshots.metrics)
+metrics.register_cache("busy_snapshots", busy_snapshots.metrics)
+metrics.register_cache("canvas_snapshots", canvas_snapshots.metrics)
+metrics.register_cache("insights", insights_cache.metrics)
+metrics.register_cache("jwt", jwt_service.metrics)
+metrics.register_cache("admission", admission.metrics)
+metrics.register_cache("hedging", hedging.metrics)
+metrics.register_cache("push", bus.metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not metrics.enabled():
+        raise HTTPException(404, "Not Found")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/health")
@@ -39,6 +39,10 @@ class CalendarEvent(BaseModel):
 class CalendarEventsResponse(BaseModel):
     events: list[CalendarEvent]
 
+class BusyInterval(BaseModel):
+    start: datetime
+    end: datetime
+
 
 # ── Gmail Signals ─────────────────────────────────────────────────────
 
@@ -175,11 +179,23 @@ class PlanInsightsResponse(BaseModel):
     summary: str
     time_breakdown: str
     where_to_add_more: str
-    available: bool = True  # False when Gemini API key not configured
+    available: bool = True  # False when no insights could be produced
+    source: str = "gemini"  # gemini, local
 
 
 # ── Check-ins (post-slot reflection + honesty tracking) ────────────────
 
+class CheckInStatus(str, Enum):
+    pending = "pending"      # assessment queued or running
+    assessed = "assessed"
+    failed = "failed"
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
 class CheckInCreate(BaseModel):
     block_id: str
     planned_goal_id: str
@@ -190,14 +206,41 @@ class CheckInCreate(BaseModel):
 
 class CheckIn(CheckInCreate):
     id: str
-    assessment: str
-    motivational_message: str
+    assessment: str = ""
+    motivational_message: str = ""
+    status: CheckInStatus = CheckInStatus.assessed
     created_at: datetime
 
 class CheckInResponse(BaseModel):
     assessment: str
     motivational_message: str
     check_in_id: str
+    status: CheckInStatus = CheckInStatus.assessed
+    job_id: str | None = None
+
+class CheckInJob(BaseModel):
+    job_id: str
+    check_in_id: str
+    status: JobStatus
+    attempts: int
+    error: str | None = None
 
 class CheckInsListResponse(BaseModel):
     check_ins: list[CheckIn]
+    next_cursor: str | None = None
+
+
+# ── Dashboard (one round trip for app launch) ─────────────────────────
+
+class DashboardSectionError(BaseModel):
+    section: str  # events, signals, tasks, goals, plan
+    status: int  # what the standalone endpoint would have returned
+    detail: str
+
+class DashboardResponse(BaseModel):
+    events: list[CalendarEvent] | None = None  # None when the section failed; see errors
+    signals: list[GmailSignal] | None = None
+    tasks: list[CanvasTask] | None = None
+    goals: list[Goal] | None = None
+    plan: PlanResponse | None = None
+    errors: list[DashboardSectionError] = []
@@ -0,0 +1,42 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.config import get_settings
+from app.services.profiler import profiles
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def is_operator(token: str | None) -> bool:
+    s = get_settings()
+    return bool(
+        s.profiling_enabled and s.profiling_token and token
+        and hmac.compare_digest(token.encode(), s.profiling_token.encode())  # str form rejects non-ASCII
+    )
+
+
+async def require_operator(x_profile_token: str | None = Header(None)) -> None:
+    if not get_settings().profiling_enabled:
+        raise HTTPException(404, "Not Found")
+    if not is_operator(x_profile_token):
+        raise HTTPException(403, "Operator token required")
+
+
+@router.get("/profiles", dependencies=[Depends(require_operator)])
+async def list_profiles():
+    """Captured request profiles, newest first."""
+    return {"profiles": profiles.list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_operator)])
+async def get_profile(profile_id: str):
+    """A profile as speedscope JSON; open it at https://www.speedscope.app."""
+    profile = profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(404, "Profile not found")
+    return JSONResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
@@ -6,7 +6,7 @@ from app.models.schemas import (
 )
 from app.services import google_service, canvas_service
 from app.services.token_store import store
-from app.services.jwt_service import create_token, get_current_user
+from app.services.jwt_service import create_token, get_bearer_token, get_current_user, revoke_token
 from fastapi import Depends
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -29,16 +29,24 @@ async def google_callback(code: str = Query(...)):
     email = await google_service.get_user_email(access_token)
 
     user_id = email
-    ut = store.get_or_create(user_id)
+    ut = await store.aio.get_or_create(user_id)
     ut.google_access_token = access_token
     ut.email = email
     if refresh_token:
         ut.set_google_refresh(refresh_token)
+    await store.aio.save(user_id, ut)
 
     jwt_token = create_token(user_id)
     return AuthCallbackResponse(token=jwt_token, email=email)
 
 
+@router.post("/logout", dependencies=[Depends(get_current_user)])
+async def logout(token: str = Depends(get_bearer_token)):
+    """Revoke the (verified) bearer token for the rest of its lifetime."""
+    await revoke_token(token)
+    return {"status": "ok"}
+
+
 @router.post("/canvas/start", response_model=AuthStartResponse)
 async def canvas_start():
     return AuthStartResponse(auth_url=canvas_service.build_auth_url())
@@ -54,8 +62,9 @@ async def canvas_callback(
     except Exception as e:
         raise HTTPException(400, f"Canvas OAuth failed: {e}")
 
-    ut = store.get_or_create(user_id)
+    ut = await store.aio.get_or_create(user_id)
     ut.canvas_access_token = tokens.get("access_token", "")
+    await store.aio.save(user_id, ut)
     return AuthCallbackResponse(token=create_token(user_id), email=ut.email)
 
 
@@ -64,14 +73,15 @@ async def canvas_token(
     body: CanvasTokenRequest,
     user_id: str = Depends(get_current_user),
 ):
-    ut = store.get_or_create(user_id)
+    ut = await store.aio.get_or_create(user_id)
     ut.canvas_access_token = body.access_token
+    await store.aio.save(user_id, ut)
     return {"status": "ok"}
 
 
 @router.get("/integrations/status", response_model=IntegrationStatus)
 async def integration_status(user_id: str = Depends(get_current_user)):
-    ut = store.get(user_id)
+    ut = await store.aio.get(user_id)
     if not ut:
         return IntegrationStatus()
     return IntegrationStatus(
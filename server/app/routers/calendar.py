@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.models.schemas import CalendarEventsResponse
-from app.services.google_service import fetch_calendar_events
+from app.services.freshness import get_calendar_events
 from app.services.jwt_service import get_current_user
 from app.services.token_store import store
 
@@ -15,12 +15,12 @@ async def get_events(
     from_date: datetime | None = Query(None, alias="from"),
     to_date: datetime | None = Query(None, alias="to"),
 ):
-    ut = store.get(user_id)
+    ut = await store.aio.get(user_id)
     if not ut or not ut.google_access_token:
         raise HTTPException(401, "Google not connected. Please reconnect.")
 
     try:
-        events = await fetch_calendar_events(ut.google_access_token, from_date, to_date)
+        events = await get_calendar_events(user_id, ut.google_access_token, from_date, to_date)
     except Exception:
         raise HTTPException(502, "Failed to fetch calendar events")
 
@@ -1,53 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.models.schemas import (
-    CheckInCreate, CheckIn, CheckInResponse, CheckInsListResponse,
+    CheckInCreate, CheckIn, CheckInJob, CheckInResponse, CheckInsListResponse, CheckInStatus,
 )
-from app.services.checkin_store import checkin_store
-from app.services.gemini_service import process_checkin
+from app.services.admission import admit
+from app.services.checkin_pipeline import checkin_jobs, submit_assessment
+from app.services.checkin_store import InvalidCursor, checkin_store
 from app.services.jwt_service import get_current_user
 
 router = APIRouter(prefix="/checkins", tags=["checkins"])
 
 
-@router.post("", response_model=CheckInResponse)
+@router.post("", response_model=CheckInResponse, status_code=202, dependencies=[Depends(admit("llm"))])
 async def submit_checkin(
     body: CheckInCreate,
     user_id: str = Depends(get_current_user),
 ):
-    """Submit what you did for a time block; get Gemini assessment + motivational message."""
-    recent = checkin_store.recent_summaries(user_id)
-    result = process_checkin(
-        planned_goal_name=body.planned_goal_name,
-        start=body.start,
-        end=body.end,
-        what_user_did=body.what_i_did,
-        recent_summaries=recent,
-    )
-    if not result:
-        raise HTTPException(
-            503,
-            "Gemini is not configured. Set GEMINI_API_KEY to enable check-in insights.",
-        )
-    assessment, motivational_message = result
-    check_in = checkin_store.add(
-        user_id=user_id,
-        create=body,
-        assessment=assessment,
-        motivational_message=motivational_message,
-    )
+    """
+    Submit what you did for a time block. The check-in is stored immediately;
+    the Gemini assessment + motivational message follow in the background —
+    poll GET /checkins/jobs/{job_id} or GET /checkins/{check_in_id}.
+    """
+    recent = await checkin_store.aio.recent_summaries(user_id)
+    check_in = await checkin_store.aio.add(user_id=user_id, create=body, status=CheckInStatus.pending)
+    job = submit_assessment(user_id, check_in, recent)
     return CheckInResponse(
         assessment=check_in.assessment,
         motivational_message=check_in.motivational_message,
         check_in_id=check_in.id,
+        status=check_in.status,
+        job_id=job.id,
     )
 
 
 @router.get("", response_model=CheckInsListResponse)
 async def list_checkins(
     user_id: str = Depends(get_current_user),
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
 ):
-    """List recent check-ins for honesty tracking / dashboard."""
-    check_ins = checkin_store.list_recent(user_id, limit=limit)
-    return CheckInsListResponse(check_ins=check_ins)
+    """
+    List check-ins newest first for honesty tracking / dashboard. Pass the
+    returned next_cursor to fetch the next (older) page.
+    """
+    try:
+        check_ins, next_cursor = await checkin_store.aio.list_page(user_id, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(400, "Invalid cursor")
+    return CheckInsListResponse(check_ins=check_ins, next_cursor=next_cursor)
+
+
+@router.get("/jobs/{job_id}", response_model=CheckInJob)
+async def get_job(job_id: str, user_id: str = Depends(get_current_user)):
+    job = checkin_jobs.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(404, "Job not found")
+    return CheckInJob(
+        job_id=job.id,
+        check_in_id=job.ref or "",
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+    )
+
+
+@router.get("/{check_in_id}", response_model=CheckIn)
+async def get_checkin(check_in_id: str, user_id: str = Depends(get_current_user)):
+    check_in = await checkin_store.aio.get(user_id, check_in_id)
+    if not check_in:
+        raise HTTPException(404, "Check-in not found")
+    return check_in
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.models.schemas import DashboardResponse, DashboardSectionError
+from app.services.freshness import get_calendar_events, get_canvas_tasks
+from app.services.goal_store import goal_store
+from app.services.google_service import fetch_gmail_signals
+from app.services.jwt_service import get_current_user
+from app.services.planning import current_plan
+from app.services.presync import open_times
+from app.services.token_store import store
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+GOOGLE_NOT_CONNECTED = "Google not connected. Please reconnect."
+CANVAS_NOT_CONNECTED = "Canvas not connected. Please reconnect."
+
+
+async def _section(name: str, aw: Awaitable[Any], failure: str) -> tuple[str, Any, DashboardSectionError | None]:
+    """Run one section; its failure becomes an entry in ``errors`` instead of failing the request."""
+    try:
+        return name, await aw, None
+    except HTTPException as e:
+        return name, None, DashboardSectionError(section=name, status=e.status_code, detail=str(e.detail))
+    except Exception:
+        return name, None, DashboardSectionError(section=name, status=502, detail=failure)
+
+
+async def _unavailable(status: int, detail: str):
+    raise HTTPException(status, detail)
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(user_id: str = Depends(get_current_user)):
+    """
+    Everything the app shows at launch in one round trip: calendar events,
+    Gmail signals, Canvas tasks, goals and the current plan, fetched
+    concurrently. A failing section comes back as null with an entry in
+    ``errors`` carrying the status its standalone endpoint would return.
+    """
+    await open_times.record(user_id)
+    ut = await store.aio.get(user_id)
+    google = ut.google_access_token if ut else None
+    canvas = ut.canvas_access_token if ut else None
+
+    # The plan is built from FreeBusy across all calendars (as /plan/current
+    # would), concurrently with the primary-calendar event list shown here.
+    sections = await asyncio.gather(
+        _section("events", get_calendar_events(user_id, google) if google else _unavailable(401, GOOGLE_NOT_CONNECTED),
+                 "Failed to fetch calendar events"),
+        _section("signals", fetch_gmail_signals(user_id, google) if google else _unavailable(401, GOOGLE_NOT_CONNECTED),
+                 "Failed to fetch Gmail signals"),
+        _section("tasks", get_canvas_tasks(user_id, canvas) if canvas else _unavailable(401, CANVAS_NOT_CONNECTED),
+                 "Failed to fetch Canvas tasks"),
+        _section("goals", goal_store.aio.list_goals(user_id), "Failed to load goals"),
+        _section("plan", current_plan(user_id), "Failed to build plan"),
+    )
+    response = DashboardResponse()
+    for name, value, error in sections:
+        if error is not None:
+            response.errors.append(error)
+        else:
+            setattr(response, name, value)
+    return response
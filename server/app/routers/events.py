@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.services.jwt_service import get_current_user
+from app.services.push import TooManyStreams, bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("")
+async def events(
+    request: Request,
+    user_id: str = Depends(get_current_user),
+    last_event_id: str | None = Header(None),
+):
+    """
+    Server-Sent Events stream of plan, sync and check-in notifications.
+    Events carry ids; reconnecting with Last-Event-ID replays what was
+    missed, or sends ``reset`` when the gap is too old (refetch everything).
+    """
+    s = get_settings()
+    try:
+        sub = bus.subscribe(user_id, last_event_id)
+    except TooManyStreams:
+        raise HTTPException(429, "Too many open event streams", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        bus.stream(sub, s.push_heartbeat_seconds, request.is_disconnected, s.push_retry_ms),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
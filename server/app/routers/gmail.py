@@ -10,12 +10,12 @@ router = APIRouter(prefix="/gmail", tags=["gmail"])
 
 @router.get("/signals", response_model=GmailSignalsResponse)
 async def get_signals(user_id: str = Depends(get_current_user)):
-    ut = store.get(user_id)
+    ut = await store.aio.get(user_id)
     if not ut or not ut.google_access_token:
         raise HTTPException(401, "Google not connected. Please reconnect.")
 
     try:
-        signals = await fetch_gmail_signals(ut.google_access_token)
+        signals = await fetch_gmail_signals(user_id, ut.google_access_token)
     except Exception:
         raise HTTPException(502, "Failed to fetch Gmail signals")
 
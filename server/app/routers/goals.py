@@ -9,7 +9,7 @@ router = APIRouter(prefix="/goals", tags=["goals"])
 
 @router.get("", response_model=GoalsResponse)
 async def list_goals(user_id: str = Depends(get_current_user)):
-    return GoalsResponse(goals=goal_store.list_goals(user_id))
+    return GoalsResponse(goals=await goal_store.aio.list_goals(user_id))
 
 
 @router.post("", response_model=Goal)
@@ -17,4 +17,4 @@ async def create_goal(
     body: GoalCreate,
     user_id: str = Depends(get_current_user),
 ):
-    return goal_store.create_goal(user_id, body)
+    return await goal_store.aio.create_goal(user_id, body)
@@ -1,100 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
+from app.config import get_settings
 from app.models.schemas import (
     PlanResponse, PlanGenerateRequest, CapacityConstraints,
-    CalendarEvent, TradeoffReport, PlanInsightsResponse,
+    TradeoffReport, PlanInsightsResponse,
 )
-from app.services.scheduler import generate_plan, compute_tradeoffs
+from app.services.admission import admit
+from app.services.scheduler import compute_tradeoffs
 from app.services.goal_store import goal_store
 from app.services.jwt_service import get_current_user
-from app.services.token_store import store
-from app.services.google_service import fetch_calendar_events
+from app.services.planning import build_plan, busy_intervals_for, cache_plan, current_plan
+from app.services.presync import open_times
 from app.services.gemini_service import get_plan_insights
+from app.services.deadline import run_until_disconnect
+from app.services.insights_cache import fingerprint, insights_cache
+from app.services.local_insights import generate_insights as generate_local_insights
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
-_plan_cache: dict[str, PlanResponse] = {}
 
-
-async def _get_fixed_events(user_id: str) -> list[CalendarEvent]:
-    ut = store.get(user_id)
-    if ut and ut.google_access_token:
-        try:
-            return await fetch_calendar_events(ut.google_access_token)
-        except Exception:
-            pass
-    return []
-
-
-@router.post("/generate", response_model=PlanResponse)
+@router.post("/generate", response_model=PlanResponse, dependencies=[Depends(admit("cpu"))])
 async def generate(
     body: PlanGenerateRequest | None = None,
     user_id: str = Depends(get_current_user),
 ):
-    goals = goal_store.list_goals(user_id)
-    events = await _get_fixed_events(user_id)
-    constraints = CapacityConstraints()
-
-    plan = generate_plan(
-        goals=goals,
-        fixed_events=events,
-        constraints=constraints,
-        simulate_goal=body.simulate_goal if body else None,
-    )
-    _plan_cache[user_id] = plan
+    plan = await build_plan(user_id, simulate_goal=body.simulate_goal if body else None)
+    await cache_plan(user_id, plan)
     return plan
 
 
 @router.get("/current", response_model=PlanResponse)
-async def current_plan(user_id: str = Depends(get_current_user)):
-    if user_id in _plan_cache:
-        return _plan_cache[user_id]
-    goals = goal_store.list_goals(user_id)
-    events = await _get_fixed_events(user_id)
-    constraints = CapacityConstraints()
-    plan = generate_plan(goals=goals, fixed_events=events, constraints=constraints)
-    _plan_cache[user_id] = plan
-    return plan
+async def get_current_plan(user_id: str = Depends(get_current_user)):
+    await open_times.record(user_id)
+    return await current_plan(user_id)
 
 
-@router.post("/tradeoff", response_model=TradeoffReport)
+@router.post("/tradeoff", response_model=TradeoffReport, dependencies=[Depends(admit("cpu"))])
 async def tradeoff(
     body: PlanGenerateRequest,
     user_id: str = Depends(get_current_user),
 ):
     if not body.simulate_goal:
         raise HTTPException(400, "simulate_goal is required")
-    goals = goal_store.list_goals(user_id)
-    events = await _get_fixed_events(user_id)
+    goals = await goal_store.aio.list_goals(user_id)
+    busy = await busy_intervals_for(user_id)
     constraints = CapacityConstraints()
-    return compute_tradeoffs(goals, body.simulate_goal, events, constraints)
+    return compute_tradeoffs(goals, body.simulate_goal, [], constraints, busy_intervals=busy)
+
+
+@router.get("/insights", response_model=PlanInsightsResponse, dependencies=[Depends(admit("llm"))])
+async def plan_insights(request: Request, user_id: str = Depends(get_current_user)):
+    """
+    Summary, time breakdown, and where to add more. Gemini when available,
+    otherwise (or, with INSIGHTS_LOCAL_FIRST, until Gemini has answered once
+    for this plan) the local rule-based insights.
+    """
+    plan = await current_plan(user_id)
+    goals = await goal_store.aio.list_goals(user_id)
+    key = fingerprint(plan, goals)
 
+    async def generate():
+        return await get_plan_insights(plan, goals)
 
-@router.get("/insights", response_model=PlanInsightsResponse)
-async def plan_insights(user_id: str = Depends(get_current_user)):
-    """Gemini-generated summary, time breakdown, and where to add more."""
-    plan = _plan_cache.get(user_id)
-    if not plan:
-        goals = goal_store.list_goals(user_id)
-        events = await _get_fixed_events(user_id)
-        plan = generate_plan(
-            goals=goals,
-            fixed_events=events,
-            constraints=CapacityConstraints(),
-        )
-        _plan_cache[user_id] = plan
-    goals = goal_store.list_goals(user_id)
-    insights = get_plan_insights(plan, goals)
-    if not insights:
-        return PlanInsightsResponse(
-            summary="",
-            time_breakdown="",
-            where_to_add_more="",
-            available=False,
-        )
-    return PlanInsightsResponse(
-        summary=insights["summary"],
-        time_breakdown=insights["time_breakdown"],
-        where_to_add_more=insights["where_to_add_more"],
-        available=True,
-    )
+    if get_settings().insights_local_first:
+        insights = await insights_cache.get(key)
+        if insights:
+            return PlanInsightsResponse(**insights, source="gemini")
+        insights_cache.refresh_in_background(key, generate)
+    else:
+        insights = await run_until_disconnect(request, insights_cache.get_or_generate(key, generate))
+        if insights:
+            return PlanInsightsResponse(**insights, source="gemini")
+    return PlanInsightsResponse(**generate_local_insights(plan, goals), source="local")
@@ -0,0 +1,219 @@
+"""
+Per-user admission control for expensive endpoints.
+
+Each route class ("cpu": plan generation and tradeoffs; "llm": Gemini-backed
+insights and check-ins) has a token bucket per user and a fixed number of
+concurrent slots per worker. A request first spends a token from its user's
+bucket (empty bucket: 429 with Retry-After), then waits for a slot. Waiting
+requests are queued per user and slots are handed out round-robin across
+users, so one client with many queued requests takes one turn per round
+instead of the whole worker. Per-user queue depth and wait time are capped;
+past either the request is also refused with 429.
+"""
+
+from __future__ import annotations
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException
+
+from app.config import get_settings
+from app.services.cache import LRUCache
+from app.services.deadline import clip
+from app.services.jwt_service import get_current_user
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class Budget:
+    rate_per_minute: float
+    burst: int
+    concurrency: int
+    max_queued_per_user: int
+    max_wait_seconds: float
+
+
+class TokenBuckets:
+    """One bucket per user, refilled lazily on take(); idle users fall out of the LRU (full again)."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_users: int = 10_000) -> None:
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self._buckets: LRUCache[list[float]] = LRUCache(max_users)
+
+    def take(self, user_id: str, now: float | None = None) -> float:
+        """Spend one token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets.set(user_id, bucket)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate if self.rate > 0 else math.inf
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class FairQueue:
+    """``concurrency`` slots shared by all users, granted round-robin by user when contended."""
+
+    def __init__(self, concurrency: int, max_queued_per_user: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_queued_per_user = max_queued_per_user
+        self._free = self.concurrency
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    @property
+    def in_use(self) -> int:
+        return self.concurrency - self._free
+
+    async def acquire(self, user_id: str, timeout: float) -> None:
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        queue = self._waiters.get(user_id)
+        if (len(queue) if queue else 0) >= self.max_queued_per_user:
+            raise Rejected("too many queued requests", timeout)
+        if queue is None:
+            queue = self._waiters[user_id] = deque()
+        granted = asyncio.get_running_loop().create_future()
+        queue.append(granted)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), timeout)
+        except BaseException as e:
+            if granted.done() and not granted.cancelled():
+                # Granted just as we gave up: pass the slot on.
+                self.release()
+            else:
+                granted.cancel()
+                self._discard(user_id, granted)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Rejected("queue wait exceeded", timeout) from None
+            raise
+
+    def _discard(self, user_id: str, granted: asyncio.Future) -> None:
+        queue = self._waiters.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(granted)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[user_id]
+
+    def release(self) -> None:
+        while self._waiters:
+            user_id, queue = next(iter(self._waiters.items()))
+            granted = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(user_id)  # next user's turn
+            else:
+                del self._waiters[user_id]
+            if not granted.done():
+                granted.set_result(None)
+                return
+        self._free += 1
+
+
+class AdmissionClass:
+    def __init__(self, name: str, budget: Budget) -> None:
+        self.name = name
+        self.budget = budget
+        self.buckets = TokenBuckets(budget.rate_per_minute, budget.burst)
+        self.queue = FairQueue(budget.concurrency, budget.max_queued_per_user)
+        self.admitted = 0
+        self.rejected = 0
+
+    async def enter(self, user_id: str) -> None:
+        wait = self.buckets.take(user_id)
+        if wait:
+            self.rejected += 1
+            raise Rejected("rate limit exceeded", wait)
+        try:
+            await self.queue.acquire(user_id, clip(self.budget.max_wait_seconds))
+        except Rejected:
+            self.rejected += 1
+            raise
+        self.admitted += 1
+
+    def exit(self) -> None:
+        self.queue.release()
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queued": self.queue.queued,
+            "in_use": self.queue.in_use,
+        }
+
+    def reset(self) -> None:
+        self.buckets.clear()
+        self.queue = FairQueue(self.budget.concurrency, self.budget.max_queued_per_user)
+        self.admitted = self.rejected = 0
+
+
+_s = get_settings()
+classes: dict[str, AdmissionClass] = {
+    "cpu": AdmissionClass("cpu", Budget(
+        rate_per_minute=_s.admission_cpu_rate_per_minute,
+        burst=_s.admission_cpu_burst,
+        concurrency=_s.admission_cpu_concurrency,
+        max_queued_per_user=_s.admission_max_queued_per_user,
+        max_wait_seconds=_s.admission_max_wait_seconds,
+    )),
+    "llm": AdmissionClass("llm", Budget(
+        rate_per_minute=_s.admission_llm_rate_per_minute,
+        burst=_s.admission_llm_burst,
+        concurrency=_s.admission_llm_concurrency,
+        max_queued_per_user=_s.admission_max_queued_per_user,
+        max_wait_seconds=_s.admission_max_wait_seconds,
+    )),
+}
+
+
+def metrics() -> dict[str, float]:
+    return {f"{name}_{k}": v for name, c in classes.items() for k, v in c.metrics().items()}
+
+
+def admit(kind: str):
+    """Route dependency: ``dependencies=[Depends(admit("cpu"))]``."""
+    admission = classes[kind]
+
+    async def dependency(user_id: str = Depends(get_current_user)):
+        if not get_settings().admission_enabled:
+            yield
+            return
+        try:
+            await admission.enter(user_id)
+        except Rejected as e:
+            raise HTTPException(
+                429, f"Too many requests: {e.reason}",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+        try:
+            yield
+        finally:
+            admission.exit()
+
+    return dependency
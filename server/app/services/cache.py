@@ -0,0 +1,92 @@
+"""Size-bounded LRU cache with optional TTL and hit-rate stats."""
+
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class LRUCache(Generic[V]):
+    """
+    Least-recently-used mapping bounded by ``max_entries``.
+    When ``ttl_seconds`` is set, entries older than that count as misses;
+    set() can override it per entry.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, tuple[float | None, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    @staticmethod
+    def _expired(expires_at: float | None) -> bool:
+        return expires_at is not None and time.monotonic() > expires_at
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        item = self._data.get(key)
+        if item is None or self._expired(item[0]):
+            if item is not None:
+                del self._data[key]
+            self.stats.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return item[1]
+
+    def peek(self, key: Hashable, default=None):
+        """Like get() but without touching recency or stats."""
+        item = self._data.get(key)
+        if item is None or self._expired(item[0]):
+            return default
+        return item[1]
+
+    def set(self, key: Hashable, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self._data[key] = (None if ttl is None else time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def items(self) -> list[tuple[Hashable, V]]:
+        """Live entries, least recently used first, without touching recency or stats."""
+        return [(k, v) for k, (expires_at, v) in self._data.items() if not self._expired(expires_at)]
+
+    def pop(self, key: Hashable, default: V | None = None) -> V | None:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
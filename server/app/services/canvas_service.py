@@ -4,11 +4,16 @@ from __future__ import annotations
 import urllib.parse
 from datetime import datetime, timezone
 
-import httpx
-from dateutil.parser import isoparse  # type: ignore[import-untyped]
 
 from app.config import get_settings
 from app.models.schemas import CanvasTask
+from app.services import ingest
+from app.services.deadline import upstream_timeout
+from app.services.http_cache import cached_get
+from app.services.lazy import lazy_import
+from app.services.metrics import instrumented
+
+httpx = lazy_import("httpx")
 
 
 def build_auth_url() -> str:
@@ -23,6 +28,7 @@ def build_auth_url() -> str:
     return f"{s.canvas_base_url}/login/oauth2/auth?" + urllib.parse.urlencode(params)
 
 
+@instrumented("canvas")
 async def exchange_code(code: str) -> dict:
     s = get_settings()
     async with httpx.AsyncClient() as client:
@@ -35,25 +41,29 @@ async def exchange_code(code: str) -> dict:
                 "redirect_uri": s.canvas_redirect_uri,
                 "code": code,
             },
+            timeout=upstream_timeout(),
         )
         resp.raise_for_status()
         return resp.json()
 
 
-async def fetch_tasks(access_token: str) -> list[CanvasTask]:
+@instrumented("canvas")
+async def fetch_tasks(user_id: str, access_token: str) -> list[CanvasTask]:
     s = get_settings()
     base = s.canvas_base_url
-    headers = {"Authorization": f"Bearer {access_token}"}
 
     async with httpx.AsyncClient() as client:
-        courses_resp = await client.get(
-            f"{base}/api/v1/courses",
-            headers=headers,
-            params={"enrollment_state": "active", "per_page": "50"},
-        )
-        if courses_resp.status_code != 200:
+        try:
+            courses = await cached_get(
+                client,
+                f"{base}/api/v1/courses",
+                user_id=user_id,
+                access_token=access_token,
+                params={"enrollment_state": "active", "per_page": "50"},
+                parse=lambda data: data,
+            )
+        except httpx.HTTPStatusError:
             return []
-        courses = courses_resp.json()
 
     tasks: list[CanvasTask] = []
     now = datetime.now(timezone.utc)
@@ -62,35 +72,23 @@ async def fetch_tasks(access_token: str) -> list[CanvasTask]:
         for course in courses:
             cid = course.get("id")
             cname = course.get("name", "Unknown Course")
-            resp = await client.get(
-                f"{base}/api/v1/courses/{cid}/assignments",
-                headers=headers,
-                params={
-                    "per_page": "50",
-                    "order_by": "due_at",
-                    "bucket": "upcoming",
-                },
-            )
-            if resp.status_code != 200:
+            try:
+                course_tasks = await cached_get(
+                    client,
+                    f"{base}/api/v1/courses/{cid}/assignments",
+                    user_id=user_id,
+                    access_token=access_token,
+                    params={
+                        "per_page": "50",
+                        "order_by": "due_at",
+                        "bucket": "upcoming",
+                    },
+                    parse=lambda data, cname=cname: ingest.canvas_tasks(data, cname),
+                )
+            except httpx.HTTPStatusError:
                 continue
-            for a in resp.json():
-                due_str = a.get("due_at")
-                due_at = None
-                if due_str:
-                    try:
-                        due_at = isoparse(due_str)
-                    except Exception:
-                        continue
-                    if due_at < now:
-                        continue
-                tasks.append(CanvasTask(
-                    id=str(a.get("id", "")),
-                    course_name=cname,
-                    assignment_name=a.get("name", ""),
-                    due_at=due_at,
-                    points_possible=a.get("points_possible"),
-                    html_url=a.get("html_url"),
-                ))
+            # Cached entries outlive "now", so the past-due filter runs per call.
+            tasks.extend(t for t in course_tasks if t.due_at is None or t.due_at >= now)
 
     tasks.sort(key=lambda t: t.due_at or datetime.max.replace(tzinfo=timezone.utc))
     return tasks
@@ -0,0 +1,79 @@
+"""
+Background assessment of check-ins.
+
+POST /checkins persists the check-in as pending and returns at once; the
+Gemini assessment runs on the check-in job queue, whose worker count caps
+LLM concurrency regardless of how many check-ins arrive. Check-ins still
+pending when the process stopped (queued, or mid-assessment) are
+re-submitted by resume_pending() at startup.
+"""
+
+from __future__ import annotations
+import logging
+
+from app.config import get_settings
+from app.models.schemas import CheckIn, CheckInStatus
+from app.services.checkin_store import checkin_store
+from app.services.gemini_service import process_checkin
+from app.services.job_queue import Job, JobQueue, PermanentJobError
+from app.services.push import bus
+
+log = logging.getLogger(__name__)
+
+_s = get_settings()
+checkin_jobs = JobQueue(
+    "checkin",
+    concurrency=_s.checkin_worker_concurrency,
+    max_attempts=_s.checkin_max_attempts,
+    retry_backoff_seconds=_s.checkin_retry_backoff_seconds,
+)
+
+
+class AssessmentUnavailable(Exception):
+    """Gemini returned nothing usable; worth retrying."""
+
+
+def submit_assessment(user_id: str, check_in: CheckIn, recent_summaries: list[str]) -> Job:
+    async def run() -> tuple[str, str]:
+        if not get_settings().gemini_api_key:
+            raise PermanentJobError("Gemini is not configured")
+        result = await process_checkin(
+            planned_goal_name=check_in.planned_goal_name,
+            start=check_in.start,
+            end=check_in.end,
+            what_user_did=check_in.what_i_did,
+            recent_summaries=recent_summaries,
+        )
+        if not result:
+            raise AssessmentUnavailable("Gemini assessment failed")
+        assessment, motivational_message = result
+        await checkin_store.aio.set_assessment(user_id, check_in.id, assessment, motivational_message)
+        bus.publish(user_id, "checkin", {"check_in_id": check_in.id, "status": CheckInStatus.assessed.value})
+        return result
+
+    async def mark_failed(job: Job) -> None:
+        await checkin_store.aio.set_assessment(user_id, check_in.id, "", "", status=CheckInStatus.failed)
+        bus.publish(user_id, "checkin", {"check_in_id": check_in.id, "status": CheckInStatus.failed.value})
+
+    return checkin_jobs.submit(user_id, run, ref=check_in.id, on_failure=mark_failed)
+
+
+RESUME_LEASE_SECONDS = 600.0
+
+
+async def resume_pending() -> int:
+    """
+    Re-submit check-ins a previous process left pending; returns how many.
+    With several workers on one database only the lease holder does it; the
+    lease is released at shutdown, so a restarted single worker gets it back.
+    """
+    if not await checkin_store.aio.lease("checkin-resume", RESUME_LEASE_SECONDS):
+        return 0
+    pending = await checkin_store.aio.pending()
+    for user_id, check_in in pending:
+        own = f"{check_in.planned_goal_name}: {check_in.what_i_did}"
+        recent = [r for r in await checkin_store.aio.recent_summaries(user_id) if r != own]
+        submit_assessment(user_id, check_in, recent)
+    if pending:
+        log.info("re-submitted %d pending check-in assessments", len(pending))
+    return len(pending)
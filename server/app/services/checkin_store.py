@@ -1,26 +1,76 @@
-"""In-memory check-in store for MVP."""
+"""Check-in store: in-memory for development, SQLite when STORAGE_BACKEND=sqlite."""
 
 from __future__ import annotations
 import uuid
+from collections import deque
 from datetime import datetime, timezone
-from app.models.schemas import CheckIn, CheckInCreate, CheckInResponse
+from app.config import get_settings
+from app.models.schemas import CheckIn, CheckInCreate, CheckInStatus
+from app.services.database import Database, database
+from app.services.store_async import AsyncAccess
 
 
-class CheckInStore:
+class InvalidCursor(ValueError):
+    """A pagination cursor that this store did not issue."""
+
+
+class _UserHistory:
+    """
+    One user's check-ins, oldest to newest, with id and block_id indexes.
+    Position i holds sequence number ``first_seq + i``; sequence numbers are
+    the pagination cursors, so they stay valid as old entries are evicted.
+    """
+
     def __init__(self) -> None:
-        self._by_user: dict[str, list[CheckIn]] = {}
+        self.items: deque[CheckIn] = deque()
+        self.first_seq = 0
+        self.by_id: dict[str, CheckIn] = {}
+        self.by_block: dict[str, CheckIn] = {}
+
+    def append(self, check_in: CheckIn, retention: int) -> None:
+        while len(self.items) >= retention:
+            old = self.items.popleft()
+            self.first_seq += 1
+            del self.by_id[old.id]
+            if self.by_block.get(old.block_id) is old:
+                del self.by_block[old.block_id]
+        self.items.append(check_in)
+        self.by_id[check_in.id] = check_in
+        self.by_block.setdefault(check_in.block_id, check_in)
+
+    def page(self, limit: int, before_seq: int | None) -> tuple[list[CheckIn], str | None]:
+        """Up to ``limit`` check-ins older than ``before_seq``, newest first."""
+        end = len(self.items) if before_seq is None else min(before_seq - self.first_seq, len(self.items))
+        start = max(end - max(limit, 0), 0)
+        page = [self.items[i] for i in range(end - 1, start - 1, -1)]
+        next_cursor = str(self.first_seq + start) if start > 0 and page else None
+        return page, next_cursor
+
+
+class CheckInStore(AsyncAccess):
+    """
+    Per-user, append-only history capped at ``retention`` entries; the
+    oldest check-ins are dropped first. Recent-first reads cost O(limit)
+    and lookups by id or block_id are dictionary hits.
+    """
 
-    def _list(self, user_id: str) -> list[CheckIn]:
-        if user_id not in self._by_user:
-            self._by_user[user_id] = []
-        return self._by_user[user_id]
+    def __init__(self, retention: int = 1000) -> None:
+        self.retention = max(1, retention)
+        self._by_user: dict[str, _UserHistory] = {}
+
+    def _history(self, user_id: str) -> _UserHistory:
+        history = self._by_user.get(user_id)
+        if history is None:
+            history = self._by_user[user_id] = _UserHistory()
+        return history
 
     def add(
         self,
         user_id: str,
         create: CheckInCreate,
-        assessment: str,
-        motivational_message: str,
+        assessment: str = "",
+        motivational_message: str = "",
+        status: CheckInStatus = CheckInStatus.assessed,
     ) -> CheckIn:
         check_in = CheckIn(
             id=str(uuid.uuid4()),
@@ -32,24 +82,179 @@ class CheckInStore:
             what_i_did=create.what_i_did,
             assessment=assessment,
             motivational_message=motivational_message,
+            status=status,
+            created_at=datetime.now(timezone.utc),
+        )
+        self._history(user_id).append(check_in, self.retention)
+        return check_in
+
+    def get(self, user_id: str, check_in_id: str) -> CheckIn | None:
+        return self._history(user_id).by_id.get(check_in_id)
+
+    def set_assessment(
+        self,
+        user_id: str,
+        check_in_id: str,
+        assessment: str,
+        motivational_message: str,
+        status: CheckInStatus = CheckInStatus.assessed,
+    ) -> CheckIn | None:
+        check_in = self.get(user_id, check_in_id)
+        if check_in:
+            check_in.assessment = assessment
+            check_in.motivational_message = motivational_message
+            check_in.status = status
+        return check_in
+
+    def list_recent(self, user_id: str, limit: int = 50) -> list[CheckIn]:
+        return self.list_page(user_id, limit)[0]
+
+    def list_page(
+        self, user_id: str, limit: int = 50, cursor: str | None = None,
+    ) -> tuple[list[CheckIn], str | None]:
+        """A page of check-ins, newest first, and the cursor for the next (older) page."""
+        before_seq = None
+        if cursor is not None:
+            if not cursor.isdigit():
+                raise InvalidCursor(cursor)
+            before_seq = int(cursor)
+        return self._history(user_id).page(limit, before_seq)
+
+    def get_by_block(self, user_id: str, block_id: str) -> CheckIn | None:
+        return self._history(user_id).by_block.get(block_id)
+
+    def recent_summaries(self, user_id: str, limit: int = 10) -> list[str]:
+        recent = self.list_recent(user_id, limit=limit)
+        return [f"{c.planned_goal_name}: {c.what_i_did}" for c in recent]
+
+    def pending(self) -> list[tuple[str, CheckIn]]:
+        """(user_id, check-in) for every check-in still awaiting assessment."""
+        return [
+            (user_id, c) for user_id, history in self._by_user.items()
+            for c in history.items if c.status == CheckInStatus.pending
+        ]
+
+    def lease(self, name: str, ttl_seconds: float) -> bool:
+        return True  # in-memory check-ins are never shared between workers
+
+
+class SQLiteCheckInStore(AsyncAccess):
+    blocking = True
+
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    def add(
+        self,
+        user_id: str,
+        create: CheckInCreate,
+        assessment: str = "",
+        motivational_message: str = "",
+        status: CheckInStatus = CheckInStatus.assessed,
+    ) -> CheckIn:
+        check_in = CheckIn(
+            id=str(uuid.uuid4()),
+            assessment=assessment,
+            motivational_message=motivational_message,
+            status=status,
             created_at=datetime.now(timezone.utc),
+            **create.model_dump(),
         )
-        self._list(user_id).append(check_in)
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT INTO checkins (id, user_id, block_id, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                (check_in.id, user_id, check_in.block_id, check_in.created_at.isoformat(),
+                 check_in.model_dump_json()),
+            )
+        return check_in
+
+    def get(self, user_id: str, check_in_id: str) -> CheckIn | None:
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM checkins WHERE user_id = ? AND id = ?", (user_id, check_in_id),
+            ).fetchone()
+        return CheckIn.model_validate_json(row[0]) if row else None
+
+    def set_assessment(
+        self,
+        user_id: str,
+        check_in_id: str,
+        assessment: str,
+        motivational_message: str,
+        status: CheckInStatus = CheckInStatus.assessed,
+    ) -> CheckIn | None:
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM checkins WHERE user_id = ? AND id = ?", (user_id, check_in_id),
+            ).fetchone()
+            if not row:
+                return None
+            check_in = CheckIn.model_validate_json(row[0])
+            check_in.assessment = assessment
+            check_in.motivational_message = motivational_message
+            check_in.status = status
+            conn.execute(
+                "UPDATE checkins SET data = ? WHERE id = ?", (check_in.model_dump_json(), check_in_id),
+            )
         return check_in
 
     def list_recent(self, user_id: str, limit: int = 50) -> list[CheckIn]:
-        all_ = sorted(self._list(user_id), key=lambda c: c.created_at, reverse=True)
-        return all_[:limit]
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT data FROM checkins WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+                (user_id, limit),
+            ).fetchall()
+        return [CheckIn.model_validate_json(r[0]) for r in rows]
+
+    def list_page(
+        self, user_id: str, limit: int = 50, cursor: str | None = None,
+    ) -> tuple[list[CheckIn], str | None]:
+        """Keyset pagination on (created_at, rowid); the cursor is the last row's key."""
+        limit = max(limit, 0)
+        if cursor is None:
+            where, params = "", ()
+        else:
+            created_at, _, rowid = cursor.rpartition("/")
+            if not created_at or not rowid.isdigit():
+                raise InvalidCursor(cursor)
+            where, params = " AND (created_at, rowid) < (?, ?)", (created_at, int(rowid))
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT created_at, rowid, data FROM checkins WHERE user_id = ?" + where
+                + " ORDER BY created_at DESC, rowid DESC LIMIT ?",
+                (user_id, *params, limit + 1),
+            ).fetchall()
+        page = [CheckIn.model_validate_json(r[2]) for r in rows[:limit]]
+        next_cursor = f"{rows[limit - 1][0]}/{rows[limit - 1][1]}" if len(rows) > limit and page else None
+        return page, next_cursor
 
     def get_by_block(self, user_id: str, block_id: str) -> CheckIn | None:
-        for c in self._list(user_id):
-            if c.block_id == block_id:
-                return c
-        return None
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM checkins WHERE user_id = ? AND block_id = ? ORDER BY created_at LIMIT 1",
+                (user_id, block_id),
+            ).fetchone()
+        return CheckIn.model_validate_json(row[0]) if row else None
 
     def recent_summaries(self, user_id: str, limit: int = 10) -> list[str]:
         recent = self.list_recent(user_id, limit=limit)
         return [f"{c.planned_goal_name}: {c.what_i_did}" for c in recent]
 
+    def pending(self) -> list[tuple[str, CheckIn]]:
+        """(user_id, check-in) for every check-in still awaiting assessment."""
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT user_id, data FROM checkins WHERE json_extract(data, '$.status') = ? ORDER BY created_at",
+                (CheckInStatus.pending.value,),
+            ).fetchall()
+        return [(user_id, CheckIn.model_validate_json(data)) for user_id, data in rows]
+
+    def lease(self, name: str, ttl_seconds: float) -> bool:
+        return self.db.try_lease(name, ttl_seconds)
+
 
-checkin_store = CheckInStore()
+_s = get_settings()
+checkin_store = (
+    SQLiteCheckInStore(database()) if _s.storage_backend == "sqlite"
+    else CheckInStore(retention=_s.checkin_retention_per_user)
+)
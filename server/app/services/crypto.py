@@ -1,14 +1,40 @@
-"""Encrypt / decrypt refresh tokens at rest using Fernet symmetric encryption."""
+"""
+Encrypt / decrypt OAuth tokens at rest using Fernet symmetric encryption.
+
+TOKEN_ENCRYPTION_KEY may hold several comma-separated keys for rotation:
+the first encrypts, all of them decrypt. To rotate, prepend a new key,
+run token_store.reencrypt_all(), then drop the old key.
+"""
+
+from __future__ import annotations
+import logging
+from functools import lru_cache
 
-from cryptography.fernet import Fernet
 from app.config import get_settings
+from app.services.lazy import lazy_import, on_warm_up
+
+fernet = lazy_import("cryptography.fernet")
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _ephemeral_key() -> str:
+    log.warning("TOKEN_ENCRYPTION_KEY is not set; encrypted tokens will not survive a restart")
+    return fernet.Fernet.generate_key().decode()
 
 
-def _get_fernet() -> Fernet:
-    key = get_settings().token_encryption_key
-    if not key:
-        key = Fernet.generate_key().decode()
-    return Fernet(key.encode() if isinstance(key, str) else key)
+@lru_cache(maxsize=4)
+def _build(keys: str) -> fernet.MultiFernet:
+    return fernet.MultiFernet([fernet.Fernet(k.strip().encode()) for k in keys.split(",") if k.strip()])
+
+
+def _get_fernet() -> fernet.MultiFernet:
+    # Keyed on the settings value, so the cipher is built once per key set.
+    return _build(get_settings().token_encryption_key or _ephemeral_key())
+
+
+on_warm_up(_get_fernet)
 
 
 def encrypt_token(plaintext: str) -> str:
@@ -17,3 +43,8 @@ def encrypt_token(plaintext: str) -> str:
 
 def decrypt_token(ciphertext: str) -> str:
     return _get_fernet().decrypt(ciphertext.encode()).decode()
+
+
+def rotate_token(ciphertext: str) -> str:
+    """Re-encrypt under the primary key; raises InvalidToken if no key can read it."""
+    return _get_fernet().rotate(ciphertext.encode()).decode()
@@ -0,0 +1,149 @@
+"""
+Embedded SQLite database behind the goal, check-in and token stores.
+
+Used when STORAGE_BACKEND=sqlite. The file runs in WAL mode, so readers never
+block the writer and several workers can share it. Connections come from a
+small pool and keep sqlite3's per-connection statement cache, so the stores'
+fixed SQL is parsed once per connection and reused after that.
+"""
+
+from __future__ import annotations
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+from app.config import get_settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS goal_users (
+    user_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS goals (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS goals_user_created ON goals (user_id, created_at);
+CREATE TABLE IF NOT EXISTS checkins (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkins_user_created ON checkins (user_id, created_at);
+CREATE INDEX IF NOT EXISTS checkins_user_block ON checkins (user_id, block_id);
+CREATE TABLE IF NOT EXISTS tokens (
+    user_id TEXT PRIMARY KEY,
+    google_access_token_enc TEXT,
+    google_refresh_token_enc TEXT,
+    canvas_access_token_enc TEXT,
+    email TEXT
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Identifies this worker process among those sharing the file.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+STATEMENT_CACHE_SIZE = 128
+
+
+class Database:
+    """A fixed-size pool of connections to one SQLite file in WAL mode."""
+
+    def __init__(self, path: str, pool_size: int = 4, timeout_seconds: float = 5.0) -> None:
+        self.path = path
+        self.timeout_seconds = timeout_seconds
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._max_size = max(1, pool_size)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout_seconds,
+            isolation_level=None,  # autocommit; multi-statement writes use transaction()
+            check_same_thread=False,  # pooled connections move between worker threads
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout_seconds * 1000)}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._size < self._max_size
+                if grow:
+                    self._size += 1
+            conn = self._connect() if grow else self._pool.get(timeout=self.timeout_seconds)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def try_lease(self, name: str, ttl_seconds: float) -> bool:
+        """
+        Claim ``name`` for this worker until ``ttl_seconds`` from now; False
+        while another worker holds an unexpired lease. Used to run one-off
+        startup jobs in a single worker.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != WORKER_ID and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                (name, WORKER_ID, now + ttl_seconds),
+            )
+        return True
+
+    def release_leases(self) -> None:
+        """Drop every lease this worker holds, so a restart (new pid) can claim them at once."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE holder = ?", (WORKER_ID,))
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._size = 0
+
+
+@lru_cache
+def database() -> Database:
+    s = get_settings()
+    return Database(s.sqlite_path, pool_size=s.sqlite_pool_size)
@@ -0,0 +1,79 @@
+"""
+Per-request deadlines propagated to upstream calls.
+
+The HTTP middleware opens a deadline scope for each incoming request; every
+upstream call asks upstream_timeout() for its httpx timeout, which is the
+per-call cap clipped to whatever is left of the request's budget.
+run_until_disconnect() additionally cancels work whose client has gone away.
+"""
+
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, TypeVar
+
+from fastapi import HTTPException, Request
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The incoming request's time budget ran out before an upstream call."""
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Bound everything inside to ``seconds``; nested scopes can only shrink it."""
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left in the current scope, or None outside any scope."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def clip(seconds: float) -> float:
+    """``seconds`` bounded by what is left of the request budget."""
+    left = remaining()
+    if left is None:
+        return seconds
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return min(seconds, left)
+
+
+def upstream_timeout() -> float:
+    return clip(get_settings().upstream_timeout_seconds)
+
+
+async def run_until_disconnect(request: Request, aw: Awaitable[T], poll_seconds: float = 0.25) -> T:
+    """
+    Await ``aw`` but cancel it if the client goes away in the meantime, so a
+    closed app screen does not keep a slow LLM call alive.
+    """
+    task = asyncio.ensure_future(aw)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(499, "Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
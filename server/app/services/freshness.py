@@ -0,0 +1,241 @@
+"""
+Freshness layer between the routers and the upstream integrations.
+
+Each upstream (Google, Canvas) gets a circuit breaker so a failing API is
+not hammered, and per-user snapshots of the last good response are served
+stale-while-revalidate: fresh snapshots are returned as-is, snapshots within
+the staleness bound are returned immediately while a background refresh runs,
+and older ones are only used if the upstream call fails.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config import get_settings
+from app.models.schemas import BusyInterval, CalendarEvent, CanvasTask
+from app.services.cache import LRUCache
+from app.services.canvas_service import fetch_tasks
+from app.services.google_service import FreeBusyError, fetch_busy_intervals, fetch_calendar_events
+from app.services.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_seconds``; then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self._admit() is not None
+
+    def _admit(self) -> str | None:
+        """"call", "trial" (the single half-open probe, which holds the slot) or None."""
+        state = self.state
+        if state == "closed":
+            return "call"
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return "trial"
+        return None
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        admitted = self._admit()
+        if admitted is None:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = await fn()
+        except Exception as e:
+            if _is_upstream_fault(e):
+                self.record_failure()
+            raise  # anything else (a deadline, a user's 4xx, a bug here) leaves the state alone
+        finally:
+            if admitted == "trial":  # also when cancelled, so the next call can probe
+                self._trial_in_flight = False
+        self.record_success()
+        return result
+
+
+def _is_upstream_fault(exc: Exception) -> bool:
+    """
+    Unreachable, timing out, 5xx/429 or FreeBusy errors. A user's revoked
+    token (4xx) or our own deadline says nothing about the upstream's health.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code >= 500 or code == 429
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, FreeBusyError))
+
+
+@dataclass
+class Snapshot:
+    value: Any
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class SnapshotStore:
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        fresh_seconds: float,
+        max_staleness_seconds: float,
+        max_entries: int = 4096,
+    ) -> None:
+        self.breaker = breaker
+        self.fresh_seconds = fresh_seconds
+        self.max_staleness_seconds = max_staleness_seconds
+        self._snapshots: LRUCache[Snapshot] = LRUCache(max_entries)
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.stale_served = 0
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            **self._snapshots.stats.as_dict(),
+            "stale_served": self.stale_served,
+            "entries": len(self._snapshots),
+        }
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+        self._in_flight.clear()
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._in_flight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await self.breaker.call(loader)
+            self._snapshots.set(key, Snapshot(value, time.monotonic()))
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("background refresh failed: %r", task.exception())
+
+    async def sync(self, key: Hashable, loader: Callable[[], Awaitable[Any]], max_age: float) -> tuple[Any, bool]:
+        """
+        Reload unless the snapshot is at most ``max_age`` old, for background
+        pre-sync (no hit/miss accounting). Returns (value, changed).
+        """
+        snap = self._snapshots.peek(key)
+        if snap is not None and snap.age <= max_age:
+            return snap.value, False
+        value = await asyncio.shield(self._refresh(key, loader))
+        return value, snap is None or value != snap.value
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        snap = self._snapshots.get(key)
+        if snap is not None:
+            if snap.age <= self.fresh_seconds:
+                return snap.value
+            if snap.age <= self.max_staleness_seconds:
+                if key not in self._in_flight:
+                    self._refresh(key, loader).add_done_callback(self._log_background_failure)
+                self.stale_served += 1
+                return snap.value
+        try:
+            return await asyncio.shield(self._refresh(key, loader))
+        except Exception:
+            if snap is not None:
+                self.stale_served += 1
+                return snap.value
+            raise
+
+
+_s = get_settings()
+google_breaker = CircuitBreaker("google", _s.upstream_failure_threshold, _s.upstream_circuit_reset_seconds)
+canvas_breaker = CircuitBreaker("canvas", _s.upstream_failure_threshold, _s.upstream_circuit_reset_seconds)
+calendar_snapshots = SnapshotStore(google_breaker, _s.upstream_fresh_seconds, _s.upstream_max_staleness_seconds)
+busy_snapshots = SnapshotStore(google_breaker, _s.upstream_fresh_seconds, _s.upstream_max_staleness_seconds)
+canvas_snapshots = SnapshotStore(canvas_breaker, _s.upstream_fresh_seconds, _s.upstream_max_staleness_seconds)
+
+
+async def get_calendar_events(
+    user_id: str,
+    access_token: str,
+    time_min: datetime | None = None,
+    time_max: datetime | None = None,
+) -> list[CalendarEvent]:
+    events = await calendar_snapshots.get(
+        (user_id, time_min, time_max),
+        lambda: fetch_calendar_events(user_id, access_token, time_min, time_max),
+    )
+    return list(events)
+
+
+async def get_busy_intervals(user_id: str, access_token: str) -> list[BusyInterval]:
+    intervals = await busy_snapshots.get(user_id, lambda: fetch_busy_intervals(user_id, access_token))
+    return list(intervals)
+
+
+async def get_canvas_tasks(user_id: str, access_token: str) -> list[CanvasTask]:
+    tasks = await canvas_snapshots.get(user_id, lambda: fetch_tasks(user_id, access_token))
+    return list(tasks)
+
+
+async def sync_calendar(user_id: str, access_token: str, max_age: float) -> tuple[list[BusyInterval], bool]:
+    """
+    Pre-sync the snapshots the default calendar views read: the event list
+    and the FreeBusy intervals plans are built from. Returns the busy
+    intervals and whether either snapshot changed.
+    """
+    (_, events_changed), (busy, busy_changed) = await asyncio.gather(
+        calendar_snapshots.sync(
+            (user_id, None, None), lambda: fetch_calendar_events(user_id, access_token), max_age,
+        ),
+        busy_snapshots.sync(user_id, lambda: fetch_busy_intervals(user_id, access_token), max_age),
+    )
+    return list(busy), events_changed or busy_changed
+
+
+async def sync_canvas_tasks(user_id: str, access_token: str, max_age: float) -> bool:
+    _, changed = await canvas_snapshots.sync(user_id, lambda: fetch_tasks(user_id, access_token), max_age)
+    return changed
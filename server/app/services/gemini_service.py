@@ -4,27 +4,96 @@ All prompts keep the 'ruthless coach' tone.
 """
 
 from __future__ import annotations
+import asyncio
 import json
 import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 from app.config import get_settings
-from app.models.schemas import PlanResponse, Goal, PlannedBlock, DayCapacity
+from app.models.schemas import PlanResponse, Goal
+from app.services.deadline import clip
+from app.services.lazy import on_warm_up
+from app.services.metrics import upstream
+from app.services.prompt_builder import build_insights_prompt
 
 
 def _client():
+    s = get_settings()
+    if not s.gemini_api_key:
+        return None
+    return _model(s.gemini_api_key, s.gemini_api_base_url)
+
+
+@lru_cache(maxsize=2)
+def _model(api_key: str, base_url: str):
+    """Import and configure the SDK once per key and endpoint; configure() is process-global."""
     try:
         import google.generativeai as genai
-        key = get_settings().gemini_api_key
-        if not key:
-            return None
-        genai.configure(api_key=key)
+        if base_url:
+            genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": base_url})
+        else:
+            genai.configure(api_key=api_key)
         return genai.GenerativeModel("gemini-1.5-flash")
     except Exception:
         return None
 
 
-def get_plan_insights(plan: PlanResponse, goals: list[Goal]) -> dict[str, str] | None:
+on_warm_up(_client)
+
+
+@lru_cache
+def _executor() -> ThreadPoolExecutor:
+    """Dedicated pool so blocking SDK calls never occupy the default executor."""
+    n = get_settings().gemini_max_concurrency
+    return ThreadPoolExecutor(max_workers=n, thread_name_prefix="gemini")
+
+
+_loop_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def _slots() -> asyncio.Semaphore:
+    """One semaphore per event loop: a semaphore binds to the loop that first waits on it."""
+    loop = asyncio.get_running_loop()
+    slots = _loop_slots.get(loop)
+    if slots is None:
+        slots = _loop_slots[loop] = asyncio.Semaphore(get_settings().gemini_max_concurrency)
+    return slots
+
+
+async def _generate(model, prompt: str, function: str = "generate") -> str:
+    """
+    Run one generate_content round trip without blocking the event loop,
+    bounded by GEMINI_TIMEOUT_SECONDS and the caller's request deadline.
+    Cancelling the awaiting task abandons the call. A thread cannot be
+    interrupted, so on the executor path the SDK's own request timeout ends
+    the abandoned HTTP call too; until then it holds one of the pool's
+    GEMINI_MAX_CONCURRENCY threads.
+    """
+    s = get_settings()
+    async with _slots():
+        timeout = clip(s.gemini_timeout_seconds)
+        with upstream("gemini", function):
+            options = {"timeout": timeout}
+            if s.gemini_native_async:
+                call = model.generate_content_async(prompt, request_options=options)
+            else:
+                loop = asyncio.get_running_loop()
+                call = loop.run_in_executor(
+                    _executor(), lambda: model.generate_content(prompt, request_options=options),
+                )
+            response = await asyncio.wait_for(call, timeout=timeout)
+    text = (response.text or "").strip()
+    # Strip markdown code block if present
+    if text.startswith("```"):
+        text = re.sub(r"^```\w*\n?", "", text)
+        text = re.sub(r"\n?```\s*$", "", text)
+    return text
+
+
+async def get_plan_insights(plan: PlanResponse, goals: list[Goal]) -> dict[str, str] | None:
     """
     Ask Gemini for a short summary, time breakdown, and where the user can add more.
     Returns None if Gemini is not configured.
@@ -33,50 +102,10 @@ def get_plan_insights(plan: PlanResponse, goals: list[Goal]) -> dict[str, str] |
     if not model:
         return None
 
-    blocks_text = "\n".join(
-        f"- {b.start.strftime('%H:%M')}–{b.end.strftime('%H:%M')}: {b.goal_name}"
-        + (" (fixed)" if b.is_fixed else "")
-        for b in plan.blocks[:50]
-    )
-    capacity_text = "\n".join(
-        f"- {c.date}: {c.allocated_hours:.1f}h allocated, {c.spare_hours:.1f}h spare"
-        for c in plan.capacity_by_day[:14]
-    )
-    goals_text = "\n".join(
-        f"- {g.name}: {g.weekly_target_hours}h/week, priority {g.priority_weight}"
-        for g in goals
-    )
-    unmet_text = "\n".join(
-        f"- {u.goal_name}: {u.deficit_hours:.1f}h short"
-        for u in plan.unmet
-    ) if plan.unmet else "None"
-
-    prompt = f"""You are a ruthless schedule coach. Given this user's plan and goals, reply in JSON only with exactly these three keys (no markdown, no code block):
-- "summary": 2–3 sentences on how their time is split and whether they're on track.
-- "time_breakdown": A short bullet list of where their hours go (by category/goal).
-- "where_to_add_more": 1–2 sentences on where they still have room (spare hours, underused days) and what to prioritize. Be direct.
-
-Plan blocks (next 14 days):
-{blocks_text}
-
-Daily capacity:
-{capacity_text}
-
-Goals:
-{goals_text}
-
-Unmet goals (deficit):
-{unmet_text}
-"""
+    prompt = build_insights_prompt(plan, goals, get_settings().gemini_prompt_token_budget)
 
     try:
-        response = model.generate_content(prompt)
-        text = (response.text or "").strip()
-        # Strip markdown code block if present
-        if text.startswith("```"):
-            text = re.sub(r"^```\w*\n?", "", text)
-            text = re.sub(r"\n?```\s*$", "", text)
-        data = json.loads(text)
+        data = json.loads(await _generate(model, prompt, "get_plan_insights"))
         return {
             "summary": data.get("summary", ""),
             "time_breakdown": data.get("time_breakdown", ""),
@@ -86,7 +115,7 @@ Unmet goals (deficit):
         return None
 
 
-def process_checkin(
+async def process_checkin(
     planned_goal_name: str,
     start: datetime,
     end: datetime,
@@ -115,12 +144,7 @@ Recent check-ins (for context):
 """
 
     try:
-        response = model.generate_content(prompt)
-        text = (response.text or "").strip()
-        if text.startswith("```"):
-            text = re.sub(r"^```\w*\n?", "", text)
-            text = re.sub(r"\n?```\s*$", "", text)
-        data = json.loads(text)
+        data = json.loads(await _generate(model, prompt, "process_checkin"))
         return (
             data.get("assessment", "No assessment."),
             data.get("motivational_message", "Keep going."),
@@ -1,9 +1,13 @@
-"""In-memory goal store for MVP."""
+"""Goal store: in-memory for development, SQLite when STORAGE_BACKEND=sqlite."""
 
 from __future__ import annotations
+import sqlite3
 import uuid
 from datetime import datetime, timezone
+from app.config import get_settings
 from app.models.schemas import Goal, GoalCreate, GoalCategory
+from app.services.database import Database, database
+from app.services.store_async import AsyncAccess
 
 
 def _default_study_goal() -> Goal:
@@ -19,7 +23,7 @@ def _default_study_goal() -> Goal:
     )
 
 
-class GoalStore:
+class GoalStore(AsyncAccess):
     def __init__(self) -> None:
         self._goals: dict[str, dict[str, Goal]] = {}
 
@@ -45,5 +49,65 @@ class GoalStore:
     def get_goal(self, user_id: str, goal_id: str) -> Goal | None:
         return self._ensure_user(user_id).get(goal_id)
 
+    def user_ids(self) -> list[str]:
+        return list(self._goals)
 
-goal_store = GoalStore()
+
+class SQLiteGoalStore(AsyncAccess):
+    blocking = True
+
+    def __init__(self, db: Database) -> None:
+        self.db = db
+        self._seen: set[str] = set()
+
+    def _ensure_user(self, user_id: str) -> None:
+        # Seeding is a write; skip it once this process knows the user exists.
+        if user_id in self._seen:
+            return
+        with self.db.transaction() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO goal_users (user_id) VALUES (?)", (user_id,))
+            if cur.rowcount:
+                self._insert(conn, user_id, _default_study_goal())
+        self._seen.add(user_id)
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, user_id: str, goal: Goal) -> None:
+        conn.execute(
+            "INSERT INTO goals (id, user_id, created_at, data) VALUES (?, ?, ?, ?)",
+            (goal.id, user_id, goal.created_at.isoformat(), goal.model_dump_json()),
+        )
+
+    def list_goals(self, user_id: str) -> list[Goal]:
+        self._ensure_user(user_id)
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT data FROM goals WHERE user_id = ? ORDER BY created_at, rowid",
+                (user_id,),
+            ).fetchall()
+        return [Goal.model_validate_json(r[0]) for r in rows]
+
+    def create_goal(self, user_id: str, data: GoalCreate) -> Goal:
+        self._ensure_user(user_id)
+        goal = Goal(
+            id=str(uuid.uuid4()),
+            created_at=datetime.now(timezone.utc),
+            **data.model_dump(),
+        )
+        with self.db.connection() as conn:
+            self._insert(conn, user_id, goal)
+        return goal
+
+    def get_goal(self, user_id: str, goal_id: str) -> Goal | None:
+        self._ensure_user(user_id)
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM goals WHERE user_id = ? AND id = ?", (user_id, goal_id),
+            ).fetchone()
+        return Goal.model_validate_json(row[0]) if row else None
+
+    def user_ids(self) -> list[str]:
+        with self.db.connection() as conn:
+            return [r[0] for r in conn.execute("SELECT user_id FROM goal_users")]
+
+
+goal_store = SQLiteGoalStore(database()) if get_settings().storage_backend == "sqlite" else GoalStore()
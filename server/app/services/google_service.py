@@ -1,16 +1,24 @@
 """Google OAuth + Calendar + Gmail integration."""
 
 from __future__ import annotations
+import asyncio
 import urllib.parse
 from datetime import datetime, timedelta, timezone
-from dateutil.parser import isoparse  # type: ignore[import-untyped]
-
-import httpx
 
 from app.config import get_settings
 from app.models.schemas import (
-    CalendarEvent, GmailSignal, SignalType,
+    BusyInterval, CalendarEvent, GmailSignal, SignalType,
 )
+from app.services import ingest
+from app.services.deadline import upstream_timeout
+from app.services.http_cache import cached_get
+from app.services.hedging import hedged_get
+from app.services.lazy import lazy_import
+from app.services.metrics import instrumented
+
+httpx = lazy_import("httpx")
+
+FREEBUSY_MAX_CALENDARS = 50  # calendarExpansionMax: calendars per FreeBusy query
 
 SCOPES = [
     "openid",
@@ -33,6 +41,10 @@ SIGNAL_KEYWORDS: dict[str, SignalType] = {
 }
 
 
+class FreeBusyError(Exception):
+    """FreeBusy answered 200 but reported errors for some calendars."""
+
+
 def build_auth_url() -> str:
     s = get_settings()
     params = {
@@ -46,11 +58,12 @@ def build_auth_url() -> str:
     return "https://accounts.google.com/o/oauth2/v2/auth?" + urllib.parse.urlencode(params)
 
 
+@instrumented("google")
 async def exchange_code(code: str) -> dict:
     s = get_settings()
     async with httpx.AsyncClient() as client:
         resp = await client.post(
-            "https://oauth2.googleapis.com/token",
+            f"{s.google_oauth_base_url}/token",
             data={
                 "code": code,
                 "client_id": s.google_client_id,
@@ -58,43 +71,51 @@ async def exchange_code(code: str) -> dict:
                 "redirect_uri": s.google_redirect_uri,
                 "grant_type": "authorization_code",
             },
+            timeout=upstream_timeout(),
         )
         resp.raise_for_status()
         return resp.json()
 
 
+@instrumented("google")
 async def refresh_access_token(refresh_token: str) -> dict:
     s = get_settings()
     async with httpx.AsyncClient() as client:
         resp = await client.post(
-            "https://oauth2.googleapis.com/token",
+            f"{s.google_oauth_base_url}/token",
             data={
                 "refresh_token": refresh_token,
                 "client_id": s.google_client_id,
                 "client_secret": s.google_client_secret,
                 "grant_type": "refresh_token",
             },
+            timeout=upstream_timeout(),
         )
         resp.raise_for_status()
         return resp.json()
 
 
+@instrumented("google")
 async def get_user_email(access_token: str) -> str:
     async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
+        resp = await hedged_get(
+            client,
+            f"{get_settings().google_api_base_url}/oauth2/v2/userinfo",
             headers={"Authorization": f"Bearer {access_token}"},
         )
         resp.raise_for_status()
         return resp.json().get("email", "unknown")
 
 
+@instrumented("google")
 async def fetch_calendar_events(
+    user_id: str,
     access_token: str,
     time_min: datetime | None = None,
     time_max: datetime | None = None,
 ) -> list[CalendarEvent]:
-    now = datetime.now(timezone.utc)
+    # Default window starts on the hour so repeated polls share one cache key.
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
     if time_min is None:
         time_min = now
     if time_max is None:
@@ -108,77 +129,160 @@ async def fetch_calendar_events(
         "maxResults": "250",
     }
     async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://www.googleapis.com/calendar/v3/calendars/primary/events",
-            headers={"Authorization": f"Bearer {access_token}"},
+        events = await cached_get(
+            client,
+            f"{get_settings().google_api_base_url}/calendar/v3/calendars/primary/events",
+            user_id=user_id,
+            access_token=access_token,
             params=params,
+            parse=lambda data: ingest.calendar_events(data.get("items", [])),
         )
-        resp.raise_for_status()
-        data = resp.json()
-
-    events: list[CalendarEvent] = []
-    for item in data.get("items", []):
-        start_raw = item.get("start", {})
-        end_raw = item.get("end", {})
-        is_all_day = "date" in start_raw and "dateTime" not in start_raw
-        start_str = start_raw.get("dateTime") or start_raw.get("date", "")
-        end_str = end_raw.get("dateTime") or end_raw.get("date", "")
-        if not start_str or not end_str:
-            continue
-        events.append(CalendarEvent(
-            id=item.get("id", ""),
-            title=item.get("summary", "(No title)"),
-            start=isoparse(start_str),
-            end=isoparse(end_str),
-            is_all_day=is_all_day,
+    return list(events)
+
+
+def merge_intervals(intervals: list[BusyInterval]) -> list[BusyInterval]:
+    """Sort and coalesce overlapping or touching intervals."""
+    merged: list[BusyInterval] = []
+    for iv in sorted(intervals, key=lambda iv: iv.start):
+        if merged and iv.start <= merged[-1].end:
+            if iv.end > merged[-1].end:
+                merged[-1] = BusyInterval(start=merged[-1].start, end=iv.end)
+        else:
+            merged.append(iv)
+    return merged
+
+
+async def _calendar_ids(client: httpx.AsyncClient, base: str, user_id: str, access_token: str) -> list[str]:
+    """Visible calendars the user can read free/busy for, following every calendarList page."""
+    ids: list[str] = []
+    page_token: str | None = None
+    while True:
+        params = {"minAccessRole": "freeBusyReader"}
+        if page_token:
+            params["pageToken"] = page_token
+        page, page_token = await cached_get(
+            client,
+            f"{base}/calendar/v3/users/me/calendarList",
+            user_id=user_id,
+            access_token=access_token,
+            params=params,
+            parse=lambda data: (
+                [c["id"] for c in data.get("items", []) if not c.get("hidden")],
+                data.get("nextPageToken"),
+            ),
+        )
+        ids.extend(page)
+        if not page_token:
+            return ids
+
+
+@instrumented("google")
+async def fetch_busy_intervals(
+    user_id: str,
+    access_token: str,
+    time_min: datetime | None = None,
+    time_max: datetime | None = None,
+) -> list[BusyInterval]:
+    """
+    Busy time across all of the user's visible calendars via FreeBusy, one
+    query per FREEBUSY_MAX_CALENDARS calendars. Only intervals come back — no
+    titles — so this is what the scheduler uses; full event bodies are for
+    display endpoints. A calendar FreeBusy reports an error for fails the
+    whole call rather than silently counting as free time.
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if time_min is None:
+        time_min = now
+    if time_max is None:
+        time_max = now + timedelta(days=14)
+
+    base = get_settings().google_api_base_url
+    async with httpx.AsyncClient() as client:
+        calendar_ids = await _calendar_ids(client, base, user_id, access_token) or ["primary"]
+
+        async def query(ids: list[str]) -> dict[str, dict]:
+            resp = await client.post(
+                f"{base}/calendar/v3/freeBusy",
+                headers={"Authorization": f"Bearer {access_token}"},
+                json={
+                    "timeMin": time_min.isoformat(),
+                    "timeMax": time_max.isoformat(),
+                    "calendarExpansionMax": len(ids),
+                    "items": [{"id": cid} for cid in ids],
+                },
+                timeout=upstream_timeout(),
+            )
+            resp.raise_for_status()
+            return resp.json().get("calendars", {})
+
+        replies = await asyncio.gather(*(
+            query(calendar_ids[i:i + FREEBUSY_MAX_CALENDARS])
+            for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS)
         ))
-    return events
+
+    calendars = {cid: cal for reply in replies for cid, cal in reply.items()}
+    failed = {cid: [e.get("reason") for e in cal["errors"]] for cid, cal in calendars.items() if cal.get("errors")}
+    if failed:
+        raise FreeBusyError(f"FreeBusy errors for {len(failed)} calendar(s): {failed}")
+    return merge_intervals(ingest.busy_intervals(calendars))
 
 
-async def fetch_gmail_signals(access_token: str) -> list[GmailSignal]:
+def _parse_signal(msg: dict) -> GmailSignal | None:
+    headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
+    subject = headers.get("subject", "")
+    snippet = msg.get("snippet", "")
+    text = (subject + " " + snippet).lower()
+
+    matched: list[SignalType] = []
+    for kw, st in SIGNAL_KEYWORDS.items():
+        if kw in text:
+            matched.append(st)
+    if not matched:
+        return None
+
+    date_str = headers.get("date", "")
+    try:
+        date = ingest.parse_email_date(date_str)
+    except Exception:
+        date = datetime.now(timezone.utc)
+
+    return GmailSignal(
+        id=msg.get("id", ""),
+        subject=subject,
+        snippet=snippet[:200],
+        sender=headers.get("from", ""),
+        date=date,
+        signal_types=matched,
+    )
+
+
+@instrumented("google")
+async def fetch_gmail_signals(user_id: str, access_token: str) -> list[GmailSignal]:
+    base = get_settings().google_api_base_url
     async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://www.googleapis.com/gmail/v1/users/me/messages",
-            headers={"Authorization": f"Bearer {access_token}"},
+        message_ids = await cached_get(
+            client,
+            f"{base}/gmail/v1/users/me/messages",
+            user_id=user_id,
+            access_token=access_token,
             params={"maxResults": "50", "q": "is:inbox"},
+            parse=lambda data: [m["id"] for m in data.get("messages", [])],
         )
-        resp.raise_for_status()
-        message_ids = [m["id"] for m in resp.json().get("messages", [])]
 
     signals: list[GmailSignal] = []
     async with httpx.AsyncClient() as client:
         for mid in message_ids:
-            resp = await client.get(
-                f"https://www.googleapis.com/gmail/v1/users/me/messages/{mid}",
-                headers={"Authorization": f"Bearer {access_token}"},
-                params={"format": "metadata", "metadataHeaders": "Subject,From,Date"},
-            )
-            if resp.status_code != 200:
+            try:
+                signal = await cached_get(
+                    client,
+                    f"{base}/gmail/v1/users/me/messages/{mid}",
+                    user_id=user_id,
+                    access_token=access_token,
+                    params={"format": "metadata", "metadataHeaders": "Subject,From,Date"},
+                    parse=_parse_signal,
+                )
+            except httpx.HTTPStatusError:
                 continue
-            msg = resp.json()
-            headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
-            subject = headers.get("subject", "")
-            snippet = msg.get("snippet", "")
-            text = (subject + " " + snippet).lower()
-
-            matched: list[SignalType] = []
-            for kw, st in SIGNAL_KEYWORDS.items():
-                if kw in text:
-                    matched.append(st)
-
-            if matched:
-                date_str = headers.get("date", "")
-                try:
-                    date = isoparse(date_str)
-                except Exception:
-                    date = datetime.now(timezone.utc)
-
-                signals.append(GmailSignal(
-                    id=mid,
-                    subject=subject,
-                    snippet=snippet[:200],
-                    sender=headers.get("from", ""),
-                    date=date,
-                    signal_types=matched,
-                ))
+            if signal:
+                signals.append(signal)
     return signals
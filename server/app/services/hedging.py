@@ -0,0 +1,132 @@
+"""
+Hedged GETs for idempotent upstream reads.
+
+If a request has not answered after the host's observed p95 latency, a
+duplicate is fired and whichever usable (non-5xx) response arrives first
+wins. Hedges are capped at ``hedge_max_ratio`` of requests per host so a
+slow upstream never sees more than that fraction of extra load.
+"""
+
+from __future__ import annotations
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Any
+
+from app.config import get_settings
+from app.services.deadline import upstream_timeout
+from app.services.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+
+
+class HostStats:
+    def __init__(self, window: int = 200) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def p95(self, min_samples: int) -> float | None:
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def may_hedge(self, max_ratio: float) -> bool:
+        return self.hedges < max_ratio * self.requests
+
+    def as_dict(self, min_samples: int) -> dict[str, float]:
+        p95 = self.p95(min_samples)
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "p95_seconds": round(p95, 4) if p95 is not None else 0.0,
+        }
+
+
+_hosts: dict[str, HostStats] = {}
+
+
+def _stats_for(url: str) -> HostStats:
+    host = httpx.URL(url).host
+    if host not in _hosts:
+        _hosts[host] = HostStats()
+    return _hosts[host]
+
+
+def metrics() -> dict[str, float]:
+    """Per-host stats flattened to ``<host>_<stat>`` keys, e.g. ``www_googleapis_com_hedge_rate``."""
+    min_samples = get_settings().hedge_min_samples
+    return {
+        f"{re.sub(r'[^A-Za-z0-9]', '_', host)}_{key}": value
+        for host, s in _hosts.items()
+        for key, value in s.as_dict(min_samples).items()
+    }
+
+
+def reset() -> None:
+    _hosts.clear()
+
+
+async def _timed_get(client: httpx.AsyncClient, url: str, **kwargs: Any) -> tuple[httpx.Response, float]:
+    started = time.monotonic()
+    resp = await client.get(url, **kwargs)
+    return resp, time.monotonic() - started
+
+
+async def hedged_get(client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+    """GET with the propagated deadline as timeout, hedged when enabled."""
+    s = get_settings()
+    stats = _stats_for(url)
+    stats.requests += 1
+    kwargs["timeout"] = upstream_timeout()
+
+    delay = stats.p95(s.hedge_min_samples) if s.hedge_enabled else None
+    primary = asyncio.create_task(_timed_get(client, url, **kwargs))
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=max(delay, s.hedge_min_delay_seconds))
+            if not done and stats.may_hedge(s.hedge_max_ratio):
+                stats.hedges += 1
+                hedge = asyncio.create_task(_timed_get(client, url, **kwargs))
+                resp, elapsed, winner = await _first_success(primary, hedge)
+                if winner is hedge:
+                    stats.hedge_wins += 1
+                stats.latencies.append(elapsed)
+                return resp
+
+        resp, elapsed = await primary
+        stats.latencies.append(elapsed)
+        return resp
+    finally:
+        if not primary.done():
+            primary.cancel()
+
+
+async def _first_success(*tasks: asyncio.Task) -> tuple[httpx.Response, float, asyncio.Task]:
+    """The first response below 500; a 5xx only if every attempt got one, else the last error."""
+    pending = set(tasks)
+    error: BaseException | None = None
+    server_error: tuple[httpx.Response, float, asyncio.Task] | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                resp, elapsed = task.result()
+                if resp.status_code < 500:
+                    return resp, elapsed, task
+                server_error = (resp, elapsed, task)
+        if server_error is not None:
+            return server_error
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
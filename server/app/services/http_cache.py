@@ -0,0 +1,98 @@
+"""
+Conditional-request cache for upstream GETs (Google, Canvas).
+
+Remembers ETag / Last-Modified per (user, URL, params) together with the
+already-parsed result, sends If-None-Match / If-Modified-Since on the next
+call and reuses the parsed objects on 304 Not Modified. Entries are keyed by
+our user id, not the access token, so they survive hourly token refreshes.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from app.config import get_settings
+from app.services.cache import CacheStats, LRUCache
+from app.services.hedging import hedged_get
+from app.services.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+
+T = TypeVar("T")
+
+
+@dataclass
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    value: Any
+
+
+class ConditionalCache:
+    """
+    A hit is a 304 that let us reuse a parsed value; a miss is a full
+    download. Evictions come from the underlying LRU.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._entries: LRUCache[CachedResponse] = LRUCache(max_entries)
+        self.stats = CacheStats()
+
+    def metrics(self) -> dict[str, float]:
+        self.stats.evictions = self._entries.stats.evictions
+        return {**self.stats.as_dict(), "entries": len(self._entries)}
+
+    @staticmethod
+    def key(user_id: str, url: str, params: dict[str, str] | None) -> tuple:
+        return user_id, url, tuple(sorted((params or {}).items()))
+
+    def lookup(self, key: tuple) -> CachedResponse | None:
+        return self._entries.get(key)
+
+    def store(self, key: tuple, resp: httpx.Response, value: Any) -> None:
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._entries.set(key, CachedResponse(etag, last_modified, value))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._entries.stats = CacheStats()
+        self.stats = CacheStats()
+
+
+http_cache = ConditionalCache(get_settings().http_cache_max_entries)
+
+
+async def cached_get(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    user_id: str,
+    access_token: str,
+    parse: Callable[[Any], T],
+    params: dict[str, str] | None = None,
+) -> T:
+    """
+    GET ``url`` with the user's bearer token and return ``parse(resp.json())``.
+    On 304 the previously parsed value is returned without re-downloading or
+    re-parsing. Raises httpx.HTTPStatusError on any other non-2xx status.
+    """
+    key = http_cache.key(user_id, url, params)
+    cached = http_cache.lookup(key)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    resp = await hedged_get(client, url, headers=headers, params=params)
+    if resp.status_code == 304 and cached:
+        http_cache.stats.hits += 1
+        return cached.value
+    resp.raise_for_status()
+    http_cache.stats.misses += 1
+    value = parse(resp.json())
+    http_cache.store(key, resp, value)
+    return value
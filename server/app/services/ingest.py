@@ -0,0 +1,90 @@
+"""
+Bulk ingestion of upstream payloads.
+
+Dates go through the C-level datetime.fromisoformat, which covers the
+RFC 3339 timestamps Google and Canvas send; dateutil is only consulted for
+anything it rejects. Parsed rows are validated as one list through a
+Pydantic TypeAdapter instead of one model construction per item.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from pydantic import TypeAdapter
+
+from app.models.schemas import BusyInterval, CalendarEvent, CanvasTask
+
+_calendar_events = TypeAdapter(list[CalendarEvent])
+_canvas_tasks = TypeAdapter(list[CanvasTask])
+_busy_intervals = TypeAdapter(list[BusyInterval])
+
+
+def parse_datetime(value: str) -> datetime:
+    """RFC 3339 / ISO-8601 timestamp or date. Raises ValueError if unparseable."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        from dateutil.parser import isoparse  # type: ignore[import-untyped]
+        return isoparse(value)
+
+
+def parse_email_date(value: str) -> datetime:
+    """RFC 2822 Date header as sent by Gmail, with ISO-8601 as a fallback."""
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return parse_datetime(value)
+
+
+def calendar_events(items: list[dict]) -> list[CalendarEvent]:
+    """Google Calendar ``events.list`` items -> CalendarEvent list."""
+    rows: list[dict] = []
+    for item in items:
+        start_raw = item.get("start", {})
+        end_raw = item.get("end", {})
+        is_all_day = "date" in start_raw and "dateTime" not in start_raw
+        start_str = start_raw.get("dateTime") or start_raw.get("date", "")
+        end_str = end_raw.get("dateTime") or end_raw.get("date", "")
+        if not start_str or not end_str:
+            continue
+        rows.append({
+            "id": item.get("id", ""),
+            "title": item.get("summary", "(No title)"),
+            "start": parse_datetime(start_str),
+            "end": parse_datetime(end_str),
+            "is_all_day": is_all_day,
+        })
+    return _calendar_events.validate_python(rows)
+
+
+def canvas_tasks(assignments: list[dict], course_name: str) -> list[CanvasTask]:
+    """Canvas assignments -> CanvasTask list; rows with garbled due dates are dropped."""
+    rows: list[dict] = []
+    for a in assignments:
+        due_str = a.get("due_at")
+        due_at = None
+        if due_str:
+            try:
+                due_at = parse_datetime(due_str)
+            except (ValueError, OverflowError):
+                continue
+        rows.append({
+            "id": str(a.get("id", "")),
+            "course_name": course_name,
+            "assignment_name": a.get("name", ""),
+            "due_at": due_at,
+            "points_possible": a.get("points_possible"),
+            "html_url": a.get("html_url"),
+        })
+    return _canvas_tasks.validate_python(rows)
+
+
+def busy_intervals(calendars: dict[str, dict]) -> list[BusyInterval]:
+    """FreeBusy ``calendars`` map -> flat, unmerged BusyInterval list."""
+    rows = [
+        {"start": parse_datetime(b["start"]), "end": parse_datetime(b["end"])}
+        for cal in calendars.values()
+        for b in cal.get("busy", [])
+    ]
+    return _busy_intervals.validate_python(rows)
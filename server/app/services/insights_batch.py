@@ -0,0 +1,133 @@
+"""
+Nightly batch pre-generation of plan insights.
+
+Walks the users who opened the app in the last INSIGHTS_BATCH_ACTIVE_DAYS,
+rebuilds their plan, and asks Gemini for insights through a
+bounded-concurrency pipeline behind a global requests-per-minute limiter,
+so quota use is spread evenly over the run instead of spiking when everyone
+opens the dashboard. Results land in the plan cache and the insights cache
+(shared between workers when SHARED_STATE_URL is set) with a TTL long
+enough to survive until the morning. With several workers on one database,
+only the one holding the batch lease runs it.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from app.config import get_settings
+from app.services.gemini_service import get_plan_insights
+from app.services.goal_store import goal_store
+from app.services.insights_cache import fingerprint, insights_cache
+from app.services.planning import build_plan, cache_plan
+from app.services.presync import open_times
+from app.services.shared_state import SharedStateError
+from app.services.token_store import store
+
+log = logging.getLogger(__name__)
+
+BATCH_LEASE_SECONDS = 12 * 3600.0  # longer than a run, shorter than the gap to the next night
+
+
+class RateLimiter:
+    """Spaces acquisitions evenly at ``per_minute`` per minute, no bursts."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class BatchReport:
+    users: int = 0
+    generated: int = 0
+    already_cached: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+async def active_users(today: date | None = None) -> list[str]:
+    """Known users whose last app open (on any worker) is within INSIGHTS_BATCH_ACTIVE_DAYS."""
+    cutoff = (today or datetime.now(timezone.utc).date()) - timedelta(days=get_settings().insights_batch_active_days)
+    active = []
+    for user_id in sorted(set(await store.aio.user_ids()) | set(await goal_store.aio.user_ids())):
+        try:
+            last = await open_times.last_open_day(user_id)
+        except SharedStateError as e:
+            log.warning("open history unavailable for %s: %s", user_id, e)
+            continue
+        if last is not None and last >= cutoff:
+            active.append(user_id)
+    return active
+
+
+async def run_batch(
+    user_ids: list[str] | None = None,
+    concurrency: int | None = None,
+    per_minute: float | None = None,
+) -> BatchReport:
+    s = get_settings()
+    users = await active_users() if user_ids is None else user_ids
+    limiter = RateLimiter(per_minute if per_minute is not None else s.insights_batch_rpm)
+    slots = asyncio.Semaphore(concurrency or s.insights_batch_concurrency)
+    report = BatchReport(users=len(users))
+    started = time.monotonic()
+
+    async def one(user_id: str) -> None:
+        async with slots:
+            try:
+                plan = await build_plan(user_id)
+                await cache_plan(user_id, plan, reason="nightly")
+                goals = await goal_store.aio.list_goals(user_id)
+                key = fingerprint(plan, goals)
+                if await insights_cache.get(key):
+                    report.already_cached += 1
+                    return
+                await limiter.acquire()
+                insights = await get_plan_insights(plan, goals)
+            except Exception:
+                log.exception("insights batch failed for %s", user_id)
+                insights = None
+            if insights:
+                await insights_cache.put(key, insights, ttl_seconds=s.insights_batch_ttl_seconds)
+                report.generated += 1
+            else:
+                report.failed += 1
+
+    await asyncio.gather(*(one(u) for u in users))
+    report.seconds = round(time.monotonic() - started, 2)
+    log.info("insights batch: %s", report)
+    return report
+
+
+def _seconds_until(hour_utc: int) -> float:
+    now = datetime.now(timezone.utc)
+    target = now.replace(hour=hour_utc % 24, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def nightly_loop() -> None:
+    """Run the batch once a day at INSIGHTS_BATCH_HOUR_UTC; started from the app lifespan."""
+    while True:
+        await asyncio.sleep(_seconds_until(get_settings().insights_batch_hour_utc))
+        try:
+            if await store.aio.lease("insights-batch", BATCH_LEASE_SECONDS):
+                await run_batch()
+            else:
+                log.info("insights batch is running in another worker")
+        except Exception:
+            log.exception("insights batch crashed")
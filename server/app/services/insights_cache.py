@@ -0,0 +1,131 @@
+"""
+Plan-insights cache keyed by a fingerprint of the plan and goal set.
+
+Identical (plan, goals) pairs reuse the last generated insights until the TTL
+expires, and concurrent requests for the same fingerprint share a single
+in-flight Gemini call. With SHARED_STATE_URL set, insights are also written
+to shared state, so what the nightly batch (or another worker) generated is
+found by every worker; the per-process LRU stays in front of it.
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Awaitable, Callable
+
+from app.config import get_settings
+from app.models.schemas import Goal, PlanResponse
+from app.services.cache import LRUCache
+from app.services.shared_state import InProcessState, SharedState, SharedStateError, shared_state
+
+log = logging.getLogger(__name__)
+
+Insights = dict[str, str]
+
+
+def fingerprint(plan: PlanResponse, goals: list[Goal]) -> str:
+    h = hashlib.sha256(plan.model_dump_json().encode())
+    for g in sorted(goals, key=lambda g: g.id):
+        h.update(g.model_dump_json().encode())
+    return h.hexdigest()
+
+
+class InsightsCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, shared: SharedState | None = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._entries: LRUCache[Insights] = LRUCache(max_entries, ttl_seconds)
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    @property
+    def stats(self):
+        return self._entries.stats
+
+    def metrics(self) -> dict[str, float]:
+        return {**self.stats.as_dict(), "coalesced": self.coalesced, "entries": len(self._entries)}
+
+    @staticmethod
+    def _shared_key(key: str) -> str:
+        return f"chronoforge:insights:{key}"
+
+    async def get(self, key: str) -> Insights | None:
+        insights = self._entries.get(key)
+        if insights is None and self.shared is not None:
+            try:
+                insights = await self.shared.aio.get_value(self._shared_key(key), json.loads)
+            except SharedStateError as e:
+                log.warning("shared insights read failed: %s", e)
+                return None
+            if insights is not None:
+                self._entries.set(key, insights)
+        return insights
+
+    async def put(self, key: str, insights: Insights, ttl_seconds: float | None = None) -> None:
+        self._entries.set(key, insights, ttl_seconds)
+        if self.shared is not None:
+            try:
+                await self.shared.aio.set_value(
+                    self._shared_key(key), insights, lambda v: json.dumps(v).encode(),
+                    ttl_seconds or self.ttl_seconds,
+                )
+            except SharedStateError as e:
+                log.warning("shared insights write failed: %s", e)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._in_flight.clear()
+
+    async def _run(self, key: str, generate: Callable[[], Awaitable[Insights | None]]) -> Insights | None:
+        try:
+            insights = await generate()
+            if insights:
+                await self.put(key, insights)
+            return insights
+        finally:
+            self._in_flight.pop(key, None)
+
+    def refresh_in_background(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Insights | None]],
+    ) -> None:
+        """Start generating ``key`` unless it is cached or already in flight."""
+        if key in self._entries or key in self._in_flight:
+            return
+        self._in_flight[key] = asyncio.create_task(self._run(key, generate))
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Insights | None]],
+    ) -> Insights | None:
+        """
+        Cached insights for ``key``, or the result of ``generate()``.
+        Failed generations (None) are not cached.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+            task = self._in_flight.get(key)  # may have started while the shared tier was read
+        if task is None:
+            task = asyncio.create_task(self._run(key, generate))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        # One caller disconnecting must not cancel the call the others wait on.
+        return await asyncio.shield(task)
+
+
+_s = get_settings()
+_state = shared_state()
+insights_cache = InsightsCache(
+    _s.insights_cache_max_entries,
+    _s.insights_cache_ttl_seconds,
+    # An in-process backend would only duplicate the LRU.
+    shared=None if isinstance(_state, InProcessState) else _state,
+)
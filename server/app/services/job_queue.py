@@ -0,0 +1,149 @@
+"""
+In-process background job queue with bounded concurrency and retries.
+
+Jobs are coroutine factories run by a fixed pool of worker tasks, so work
+such as LLM calls is throttled independently of request load. Workers start
+lazily on the first submit and are stopped from the app lifespan. A job
+cancelled by stop() ends as failed without running on_failure, leaving
+whatever it worked on untouched for a restarted process to pick up.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from app.models.schemas import JobStatus
+from app.services.cache import LRUCache
+
+log = logging.getLogger(__name__)
+
+
+class PermanentJobError(Exception):
+    """Raised by a job that should fail immediately instead of being retried."""
+
+
+@dataclass
+class Job:
+    id: str
+    user_id: str
+    run: Callable[[], Awaitable[Any]] = field(repr=False)
+    ref: str | None = None  # id of the object the job works on
+    on_failure: Callable[[Job], Awaitable[None]] | None = field(default=None, repr=False)
+    status: JobStatus = JobStatus.queued
+    attempts: int = 0
+    error: str | None = None
+    result: Any = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+
+
+class JobQueue:
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        max_retained: int = 10_000,
+    ) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._jobs: LRUCache[Job] = LRUCache(max_retained)
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers),
+        }
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.peek(job_id)
+
+    def submit(
+        self,
+        user_id: str,
+        run: Callable[[], Awaitable[Any]],
+        ref: str | None = None,
+        on_failure: Callable[[Job], Awaitable[None]] | None = None,
+    ) -> Job:
+        self._ensure_workers()
+        job = Job(id=str(uuid.uuid4()), user_id=user_id, run=run, ref=ref, on_failure=on_failure)
+        self._jobs.set(job.id, job)
+        assert self._queue is not None
+        self._queue.put_nowait(job)
+        return job
+
+    def _ensure_workers(self) -> None:
+        if any(not w.done() for w in self._workers):
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def drain(self) -> None:
+        """Wait until every submitted job has finished (used by tests)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                queue.task_done()
+
+    async def _fail(self, job: Job) -> None:
+        job.status = JobStatus.failed
+        job.finished_at = datetime.now(timezone.utc)
+        log.warning("%s job %s failed: %s", self.name, job.id, job.error)
+        if job.on_failure:
+            try:
+                await job.on_failure(job)
+            except Exception:
+                log.exception("%s job %s: on_failure raised", self.name, job.id)
+
+    async def _execute(self, job: Job) -> None:
+        job.status = JobStatus.running
+        try:
+            while True:
+                job.attempts += 1
+                try:
+                    job.result = await job.run()
+                except Exception as e:
+                    job.error = str(e) or type(e).__name__
+                    if isinstance(e, PermanentJobError) or job.attempts >= self.max_attempts:
+                        await self._fail(job)
+                        return
+                    await asyncio.sleep(self.retry_backoff_seconds * 2 ** (job.attempts - 1))
+                    continue
+                job.status = JobStatus.done
+                job.error = None
+                break
+        except asyncio.CancelledError:
+            # Stopped mid-run or mid-backoff (shutdown): interrupted, not a failure of the work itself.
+            if job.status != JobStatus.failed:
+                job.status = JobStatus.failed
+                job.error = "cancelled"
+                job.finished_at = datetime.now(timezone.utc)
+            raise
+        job.finished_at = datetime.now(timezone.utc)
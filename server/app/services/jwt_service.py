@@ -1,11 +1,55 @@
+"""
+JWT issue and verification.
+
+Verified tokens are cached by digest until they expire, so the bearer token
+the app repeats on every request is HMAC-checked once. JWT_PREVIOUS_SECRETS
+keeps tokens signed before a secret rotation valid; revoke_token() rejects a
+token before its exp. Revocations live in shared state with a TTL that ends
+at the token's exp, so a logout on one worker holds on all of them; they are
+checked before the (per-process) verified cache.
+"""
+
+import hashlib
+import logging
+import time
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
+from functools import lru_cache
+
+from jose.exceptions import ExpiredSignatureError, JWTError
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import get_settings
+from app.services.cache import LRUCache
+from app.services.lazy import lazy_import
+from app.services.shared_state import SharedStateError, shared_state
+
+jwt = lazy_import("jose.jwt")  # pulls in cryptography; loaded on first use
+
+log = logging.getLogger(__name__)
 
 _bearer = HTTPBearer(auto_error=False)
 
+_verified: LRUCache[str] = LRUCache(get_settings().jwt_cache_max_entries)
+revocations = shared_state()
+_revoked_here = 0
+
+AUTH_UNAVAILABLE = "Authentication temporarily unavailable"
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _revoked_key(digest: str) -> str:
+    return f"chronoforge:revoked:{digest}"
+
+
+@lru_cache(maxsize=4)
+def _secrets(current: str, previous: str) -> tuple[tuple[str, ...], str]:
+    """Secrets to try, newest first, and a fingerprint of the set for cache keys."""
+    secrets = (current, *(p.strip() for p in previous.split(",") if p.strip()))
+    return secrets, hashlib.sha256("\0".join(secrets).encode()).hexdigest()[:16]
+
 
 def create_token(user_id: str) -> str:
     s = get_settings()
@@ -16,21 +60,82 @@ def create_token(user_id: str) -> str:
     return jwt.encode(payload, s.jwt_secret, algorithm=s.jwt_algorithm)
 
 
-def decode_token(token: str) -> str:
+def _verify(token: str, secrets: tuple[str, ...], algorithm: str) -> dict:
+    for secret in secrets[:-1]:
+        try:
+            return jwt.decode(token, secret, algorithms=[algorithm])
+        except ExpiredSignatureError:
+            raise
+        except JWTError:
+            continue
+    return jwt.decode(token, secrets[-1], algorithms=[algorithm])
+
+
+async def decode_token(token: str) -> str:
     s = get_settings()
+    digest = _digest(token)
     try:
-        payload = jwt.decode(token, s.jwt_secret, algorithms=[s.jwt_algorithm])
-        user_id: str = payload.get("sub", "")
-        if not user_id:
-            raise HTTPException(401, "Invalid token")
+        revoked = await revocations.aio.get(_revoked_key(digest))
+    except SharedStateError as e:
+        # Fail closed: without the list a logged-out token would pass.
+        log.warning("revocation check failed: %s", e)
+        raise HTTPException(503, AUTH_UNAVAILABLE, headers={"Retry-After": "5"}) from e
+    if revoked is not None:
+        raise HTTPException(401, "Token revoked")
+    secrets, keyset = _secrets(s.jwt_secret, s.jwt_previous_secrets)
+    # Keyed by the secret set too: removing a secret invalidates what it verified.
+    key = f"{keyset}:{digest}"
+    user_id = _verified.get(key)
+    if user_id:
         return user_id
+    try:
+        payload = _verify(token, secrets, s.jwt_algorithm)
     except JWTError:
         raise HTTPException(401, "Invalid or expired token")
+    user_id = payload.get("sub", "")
+    if not user_id:
+        raise HTTPException(401, "Invalid token")
+    exp = payload.get("exp")
+    _verified.set(key, user_id, ttl_seconds=None if exp is None else max(exp - time.time(), 0.0))
+    return user_id
 
 
-async def get_current_user(
+async def revoke_token(token: str) -> None:
+    """
+    Reject ``token`` from now until its exp, on every worker. Only tokens
+    that verify can be revoked, and each entry expires with its token, so
+    the list never outgrows the set of live tokens we issued.
+    """
+    global _revoked_here
+    s = get_settings()
+    secrets, _ = _secrets(s.jwt_secret, s.jwt_previous_secrets)
+    try:
+        payload = _verify(token, secrets, s.jwt_algorithm)
+    except JWTError:
+        raise HTTPException(401, "Invalid or expired token")
+    now = time.time()
+    exp = float(payload.get("exp") or now + s.jwt_expire_hours * 3600)
+    try:
+        await revocations.aio.set(_revoked_key(_digest(token)), b"1", ttl_seconds=max(exp - now, 1.0))
+    except SharedStateError as e:
+        log.warning("revocation write failed: %s", e)
+        raise HTTPException(503, AUTH_UNAVAILABLE, headers={"Retry-After": "5"}) from e
+    _revoked_here += 1
+
+
+def metrics() -> dict[str, float]:
+    return {**_verified.stats.as_dict(), "entries": len(_verified), "revoked": _revoked_here}
+
+
+async def get_bearer_token(
     creds: HTTPAuthorizationCredentials | None = Security(_bearer),
 ) -> str:
     if creds is None:
         raise HTTPException(401, "Missing authorization header")
-    return decode_token(creds.credentials)
+    return creds.credentials
+
+
+async def get_current_user(
+    creds: HTTPAuthorizationCredentials | None = Security(_bearer),
+) -> str:
+    return await decode_token(await get_bearer_token(creds))
@@ -0,0 +1,92 @@
+"""
+Deferred imports for heavy dependencies off the startup path.
+
+``httpx = lazy_import("httpx")`` binds a module whose body only runs on
+first attribute access, so importing app.main no longer pays for httpx,
+jose and cryptography. The lifespan calls warm_up() in a worker thread right
+after startup, so the first real request usually finds them loaded.
+
+importlib's LazyLoader is not used: on 3.11 it does not lock the first
+access, so the warm-up thread and a request could both execute a module's
+body. Loads here hold a module lock, and other threads see the module only
+once its body has finished; after that, attribute access skips the lock.
+"""
+
+from __future__ import annotations
+import asyncio
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_load_lock = threading.RLock()  # reentrant: loading one module may load another
+_deferred: list[ModuleType] = []
+_warmers: list[Callable[[], object]] = []
+
+
+class _LoadingModule(ModuleType):
+    """Being executed: other threads wait for the loading one to finish."""
+
+    def __getattribute__(self, attr):
+        with _load_lock:
+            return ModuleType.__getattribute__(self, attr)
+
+
+class _LazyModule(ModuleType):
+    def __getattribute__(self, attr):
+        with _load_lock:
+            if type(self) is _LazyModule:  # else whoever held the lock before us loaded it
+                self.__class__ = _LoadingModule
+                try:
+                    spec = ModuleType.__getattribute__(self, "__spec__")
+                    spec.loader.exec_module(self)
+                finally:
+                    self.__class__ = ModuleType
+        return ModuleType.__getattribute__(self, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """``name`` as a module that is executed on first attribute access."""
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        module = importlib.util.module_from_spec(spec)
+        module.__class__ = _LazyModule
+        sys.modules[name] = module
+        _deferred.append(module)
+        return module
+
+
+def on_warm_up(fn: Callable[[], object]) -> Callable[[], object]:
+    """Register ``fn`` (e.g. a cached client factory) to run during warm_up()."""
+    _warmers.append(fn)
+    return fn
+
+
+def warm_up() -> float:
+    """Load every deferred module and run warmers; returns seconds taken. Blocking."""
+    started = time.perf_counter()
+    for module in list(_deferred):
+        getattr(module, "__name__")  # any attribute access executes the module
+    for fn in list(_warmers):
+        try:
+            fn()
+        except Exception:
+            log.exception("warm-up step %s failed", getattr(fn, "__qualname__", fn))
+    return time.perf_counter() - started
+
+
+async def warm_up_in_background() -> None:
+    """Lifespan task: warm_up() on a worker thread so startup isn't held for it."""
+    seconds = await asyncio.to_thread(warm_up)
+    log.info("deferred warm-up finished in %.0f ms", seconds * 1000)
@@ -0,0 +1,65 @@
+"""
+Rule-based plan insights computed straight from PlanResponse.
+
+Same three fields as the Gemini insights, same ruthless-coach tone as the
+scheduler's coaching messages, answered in milliseconds. Used when Gemini is
+unavailable and as the instant first response while Gemini catches up.
+"""
+
+from __future__ import annotations
+
+from app.models.schemas import Goal, PlanResponse
+from app.services.prompt_builder import summarize_plan
+
+TOP_DAYS = 3
+TOP_DEFICITS = 2
+
+
+def generate_insights(plan: PlanResponse, goals: list[Goal]) -> dict[str, str]:
+    s = summarize_plan(plan, goals)
+
+    summary = (
+        f"You have {s.planned_hours:.0f}h of goal work planned over the next {s.days} days, "
+        f"around {s.fixed_hours:.0f}h of fixed commitments."
+    )
+    if plan.unmet:
+        deficit = sum(u.deficit_hours for u in plan.unmet)
+        summary += (
+            f" You're {deficit:.0f}h short across {len(plan.unmet)} "
+            f"goal{'s' if len(plan.unmet) != 1 else ''}. You're not on track."
+        )
+    elif s.planned_hours:
+        summary += " Every goal is covered. Don't get comfortable — maintain the pace."
+    else:
+        summary += " Nothing is scheduled. Set a goal or you're just drifting."
+
+    total = s.planned_hours + s.fixed_hours
+    lines = [
+        f"- {category}: {hours:.1f}h ({hours / total:.0%})"
+        for category, hours in s.by_category.items()
+    ]
+    if s.fixed_hours:
+        lines.append(f"- fixed calendar: {s.fixed_hours:.1f}h ({s.fixed_hours / total:.0%})")
+    time_breakdown = "\n".join(lines) if lines else "- Nothing planned yet."
+
+    open_days = sorted(
+        (d for d in s.by_day if d.spare_hours >= 0.5),
+        key=lambda d: -d.spare_hours,
+    )[:TOP_DAYS]
+    deficits = sorted(plan.unmet, key=lambda u: -u.deficit_hours)[:TOP_DEFICITS]
+    if not open_days:
+        where_to_add_more = "There's no room left in your plan. Cut something or accept the deficit."
+    else:
+        days_text = ", ".join(f"{d.weekday} {d.date} ({d.spare_hours:.1f}h spare)" for d in open_days)
+        where_to_add_more = f"Most room: {days_text}."
+        if deficits:
+            goals_text = " and ".join(f"'{u.goal_name}' ({u.deficit_hours:.1f}h short)" for u in deficits)
+            where_to_add_more += f" Put it toward {goals_text} first."
+        else:
+            where_to_add_more += " Use it to get ahead, not to coast."
+
+    return {
+        "summary": summary,
+        "time_breakdown": time_breakdown,
+        "where_to_add_more": where_to_add_more,
+    }
@@ -0,0 +1,224 @@
+"""
+In-process instrumentation exposed as Prometheus text at GET /metrics.
+
+Counters and histograms are plain dicts keyed by label values, updated under
+a lock; recording one observation is a dict lookup and a bisect. Caches
+register a ``metrics()`` callable and are read only when /metrics is scraped.
+Recording is skipped entirely unless METRICS_ENABLED is set.
+"""
+
+from __future__ import annotations
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from app.config import get_settings
+from app.services.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return get_settings().metrics_enabled
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = buckets
+        # per label set: [count per bucket (+Inf last)], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with _lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                le = 'le="%s"' % (bound if isinstance(bound, str) else f"{bound:g}")
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total[0]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+http_requests = Counter(
+    "chronoforge_http_requests_total", "HTTP requests by route and status.",
+    ("method", "route", "status"),
+)
+http_latency = Histogram(
+    "chronoforge_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"),
+)
+upstream_calls = Counter(
+    "chronoforge_upstream_calls_total", "Integration calls by outcome.",
+    ("service", "function", "status"),
+)
+upstream_latency = Histogram(
+    "chronoforge_upstream_call_duration_seconds", "Integration call latency.",
+    ("service", "function"),
+)
+scheduler_phase = Histogram(
+    "chronoforge_scheduler_phase_seconds", "Time spent per generate_plan phase.",
+    ("phase",), buckets=FAST_BUCKETS,
+)
+
+_instruments: list[Counter | Histogram] = [
+    http_requests, http_latency, upstream_calls, upstream_latency, scheduler_phase,
+]
+_caches: dict[str, Callable[[], dict[str, float]]] = {}
+
+
+def register_cache(name: str, source: Callable[[], dict[str, float]]) -> None:
+    """Export ``source()`` (a cache's metrics() dict) as chronoforge_cache_* gauges."""
+    _caches[name] = source
+
+
+def _status(exc: BaseException | None) -> str:
+    if exc is None:
+        return "ok"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return str(exc.response.status_code)
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    return type(exc).__name__
+
+
+@contextmanager
+def upstream(service: str, function: str) -> Iterator[None]:
+    """Time one integration call and count it by outcome."""
+    if not enabled():
+        yield
+        return
+    started = time.perf_counter()
+    exc: BaseException | None = None
+    try:
+        yield
+    except BaseException as e:
+        exc = e
+        raise
+    finally:
+        upstream_latency.observe(time.perf_counter() - started, service, function)
+        upstream_calls.inc(service, function, _status(exc))
+
+
+def instrumented(service: str):
+    """Decorator form of upstream() for async integration functions."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        async def call(*args, **kwargs):
+            with upstream(service, fn.__name__):
+                return await fn(*args, **kwargs)
+        return call
+    return wrap
+
+
+class PhaseTimer:
+    """
+    Splits a function's wall time into named phases: each lap() charges the
+    time since the previous lap to ``name``, so loops accumulate per phase.
+    record() then observes each total once.
+    """
+
+    def __init__(self) -> None:
+        self.on = enabled()
+        self.totals: dict[str, float] = {}
+        self._last = time.perf_counter() if self.on else 0.0
+
+    def lap(self, name: str) -> None:
+        if not self.on:
+            return
+        now = time.perf_counter()
+        self.totals[name] = self.totals.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def record(self) -> None:
+        for name, seconds in self.totals.items():
+            scheduler_phase.observe(seconds, name)
+
+
+def _render_caches() -> list[str]:
+    series: dict[str, list[str]] = {}
+    for name, source in sorted(_caches.items()):
+        for key, value in source().items():
+            if isinstance(value, (int, float)):
+                series.setdefault(key, []).append(f'chronoforge_cache_{key}{{cache="{_escape(name)}"}} {value:g}')
+    lines = []
+    for key, samples in series.items():
+        lines.append(f"# TYPE chronoforge_cache_{key} gauge")
+        lines.extend(samples)
+    return lines
+
+
+def render() -> str:
+    lines: list[str] = []
+    for instrument in _instruments:
+        lines.extend(instrument.render())
+    lines.extend(_render_caches())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for instrument in _instruments:
+        instrument.clear()
@@ -0,0 +1,99 @@
+"""Plan building shared by the plan router and background jobs."""
+
+from __future__ import annotations
+import hashlib
+import logging
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+
+from app.models.schemas import BusyInterval, CapacityConstraints, GoalCreate, PlanResponse
+from app.services.deadline import DeadlineExceeded
+from app.services.freshness import get_busy_intervals
+from app.services.goal_store import goal_store
+from app.services.push import bus
+from app.services.scheduler import generate_plan
+from app.services.shared_state import SharedMap, SharedStateError, shared_state
+from app.services.token_store import store
+
+log = logging.getLogger(__name__)
+
+# Shared across workers when SHARED_STATE_URL is set.
+plan_cache: SharedMap[PlanResponse] = SharedMap(shared_state(), "plan", PlanResponse)
+
+
+CALENDAR_UNAVAILABLE = "Calendar unavailable; try again shortly"
+
+
+async def busy_intervals_for(user_id: str) -> list[BusyInterval]:
+    """
+    FreeBusy across all calendars; full events are only for /calendar/events.
+    Empty only when Google is not connected: if neither a refresh nor a
+    snapshot is available this raises 503 rather than planning over meetings.
+    """
+    ut = await store.aio.get(user_id)
+    if not ut or not ut.google_access_token:
+        return []
+    try:
+        return await get_busy_intervals(user_id, ut.google_access_token)
+    except DeadlineExceeded:
+        raise  # the request's budget is gone: 504, not a calendar outage
+    except Exception as e:
+        log.warning("busy intervals unavailable for %s: %r", user_id, e)
+        raise HTTPException(503, CALENDAR_UNAVAILABLE, headers={"Retry-After": "30"}) from e
+
+
+BusySource = Callable[[str], Awaitable[list[BusyInterval]]]
+
+
+async def build_plan(
+    user_id: str,
+    simulate_goal: GoalCreate | None = None,
+    busy_source: BusySource | None = None,
+) -> PlanResponse:
+    """``busy_source`` replaces the FreeBusy lookup (e.g. with intervals a pre-sync just fetched)."""
+    goals = await goal_store.aio.list_goals(user_id)
+    busy = await (busy_source or busy_intervals_for)(user_id)
+    return generate_plan(
+        goals=goals,
+        fixed_events=[],
+        busy_intervals=busy,
+        constraints=CapacityConstraints(),
+        simulate_goal=simulate_goal,
+    )
+
+
+async def current_plan(user_id: str) -> PlanResponse:
+    """The cached plan, building (and caching) one if there is none yet."""
+    try:
+        plan = await plan_cache.aio.get(user_id)
+    except SharedStateError as e:
+        log.warning("plan cache read failed, rebuilding: %s", e)
+        plan = None
+    if plan is None:
+        plan = await build_plan(user_id)
+        await cache_plan(user_id, plan, reason="built")
+    return plan
+
+
+def plan_digest(plan: PlanResponse) -> str:
+    return hashlib.sha256(plan.model_dump_json().encode()).hexdigest()[:16]
+
+
+async def cache_plan(user_id: str, plan: PlanResponse, reason: str = "generate") -> None:
+    """
+    Store ``plan`` as the user's current plan (best effort) and notify the
+    user's /events streams; ``reason`` says what triggered the regeneration.
+    Nothing is published if the write failed: a refetch would not find it.
+    """
+    try:
+        await plan_cache.aio.set(user_id, plan)
+    except SharedStateError as e:
+        log.warning("plan cache write failed: %s", e)
+        return
+    bus.publish(user_id, "plan", {
+        "reason": reason,
+        "digest": plan_digest(plan),
+        "blocks": len(plan.blocks),
+        "unmet": len(plan.unmet),
+    })
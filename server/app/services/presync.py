@@ -0,0 +1,289 @@
+"""
+Background pre-sync so the first app open of the day is a cache hit.
+
+The plan and dashboard routes record when each user opens the app, in
+shared state so every worker's opens count. Every PRESYNC_INTERVAL_SECONDS
+the worker holding the presync lease walks the active users, soonest
+usual open time first. It refreshes the calendar, FreeBusy and Canvas
+snapshots of users due to open within PRESYNC_LEAD_SECONDS, and of anyone
+not synced for PRESYNC_MAX_AGE_SECONDS. A user's plan is regenerated only
+when its inputs (goals, busy time) changed since the last sync or no plan is
+cached; the first sync after a restart only records the inputs, so plans
+users built themselves are not overwritten.
+
+Stored Google access tokens expire after about an hour, so an idle user's
+token is refreshed with their refresh token on a 401. Users without a
+usable refresh token are skipped, and tried again once their last attempt is
+PRESYNC_MAX_AGE_SECONDS old (by then a sign-in may have stored a new token).
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import math
+import json
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.config import get_settings
+from app.models.schemas import BusyInterval
+from app.services.cache import LRUCache
+from app.services.freshness import sync_calendar, sync_canvas_tasks
+from app.services.goal_store import goal_store
+from app.services.google_service import refresh_access_token
+from app.services.lazy import lazy_import
+from app.services.planning import build_plan, cache_plan, plan_cache
+from app.services.push import bus
+from app.services.shared_state import InProcessState, SharedState, SharedStateError, shared_state
+from app.services.token_store import UserTokens, store
+
+httpx = lazy_import("httpx")
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DAY_MINUTES = 24 * 60
+
+
+OPENS_KEPT = 14  # days of first opens per user
+OPENS_TTL_SECONDS = (OPENS_KEPT + 1) * 86400.0
+
+
+def _encode_opens(opens: dict[str, Any]) -> bytes:
+    return json.dumps(opens, separators=(",", ":")).encode()
+
+
+class OpenTimes:
+    """
+    First app open per user per (UTC) day for the last two weeks, kept in
+    shared state so opens served by any worker count. Each worker writes a
+    user's record at most once a day, and reads are cached for
+    ``read_ttl_seconds`` (the usual open time moves at most once a day).
+    """
+
+    def __init__(
+        self,
+        state: SharedState | None = None,
+        max_users: int = 50_000,
+        read_ttl_seconds: float = 3600.0,
+    ) -> None:
+        self.state = state or InProcessState()
+        self._written: LRUCache[str] = LRUCache(max_users)  # user -> day this worker last wrote
+        self._read: LRUCache[dict[str, Any]] = LRUCache(max_users, read_ttl_seconds)
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"chronoforge:opens:{user_id}"
+
+    async def _load(self, user_id: str) -> dict[str, Any]:
+        opens = self._read.get(user_id)
+        if opens is None:
+            opens = await self.state.aio.get_value(self._key(user_id), json.loads) or {"day": "", "minutes": []}
+            self._read.set(user_id, opens)
+        return opens
+
+    async def record(self, user_id: str, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        day = now.date().isoformat()
+        if self._written.peek(user_id) == day:
+            return
+        try:
+            stored = await self.state.aio.get_value(self._key(user_id), json.loads) or {"day": "", "minutes": []}
+            if stored["day"] != day:  # another worker may have recorded today's first open already
+                stored = {"day": day, "minutes": [*stored["minutes"], now.hour * 60 + now.minute][-OPENS_KEPT:]}
+                await self.state.aio.set_value(self._key(user_id), stored, _encode_opens, OPENS_TTL_SECONDS)
+        except SharedStateError as e:
+            log.warning("open time not recorded for %s: %s", user_id, e)
+            return
+        self._written.set(user_id, day)
+        self._read.set(user_id, stored)
+
+    async def last_open_day(self, user_id: str) -> date | None:
+        day = (await self._load(user_id))["day"]
+        return date.fromisoformat(day) if day else None
+
+    async def usual_minute(self, user_id: str) -> int | None:
+        """Circular mean of first-open minute of day, so 23:50 and 00:10 average to midnight."""
+        minutes = (await self._load(user_id))["minutes"]
+        if not minutes:
+            return None
+        angles = [2 * math.pi * m / DAY_MINUTES for m in minutes]
+        x = sum(math.cos(a) for a in angles)
+        y = sum(math.sin(a) for a in angles)
+        return round(math.atan2(y, x) % (2 * math.pi) * DAY_MINUTES / (2 * math.pi)) % DAY_MINUTES
+
+    async def seconds_until_open(self, user_id: str, now: datetime) -> float:
+        """Seconds until the user's usual open today or tomorrow; inf with no history."""
+        usual = await self.usual_minute(user_id)
+        if usual is None:
+            return math.inf
+        current = now.hour * 60 + now.minute + now.second / 60
+        return (usual - current) % DAY_MINUTES * 60
+
+    def clear(self) -> None:
+        self._written.clear()
+        self._read.clear()
+
+
+open_times = OpenTimes(shared_state())
+
+
+def _inputs_fingerprint(goals: list, busy: list[BusyInterval]) -> str:
+    h = hashlib.sha256()
+    for g in goals:
+        h.update(g.model_dump_json().encode())
+    h.update(b"|")
+    for b in busy:
+        h.update(f"{b.start.isoformat()}/{b.end.isoformat()};".encode())
+    return h.hexdigest()
+
+
+class GoogleTokenExpired(Exception):
+    """The stored access token is rejected and there is no refresh token that works."""
+
+
+def _unauthorized(exc: Exception) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 401
+
+
+@dataclass
+class CycleReport:
+    candidates: int = 0
+    synced: int = 0
+    plans_regenerated: int = 0
+    tokens_refreshed: int = 0
+    skipped_expired: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+class PresyncScheduler:
+    def __init__(self, opens: OpenTimes, max_users: int = 50_000) -> None:
+        self.opens = opens
+        self._last_synced: LRUCache[float] = LRUCache(max_users)
+        self._inputs: LRUCache[str] = LRUCache(max_users)
+
+    async def due(self, user_ids: list[str], now: datetime, monotonic: float) -> list[str]:
+        """Users to sync this cycle, soonest expected open first."""
+        s = get_settings()
+        ranked = []
+        for user_id in user_ids:
+            try:
+                until_open = await self.opens.seconds_until_open(user_id, now)
+            except SharedStateError:
+                until_open = math.inf  # still synced once stale
+            last = self._last_synced.peek(user_id)
+            stale = last is None or monotonic - last >= s.presync_max_age_seconds
+            if until_open <= s.presync_lead_seconds or stale:
+                ranked.append((until_open, user_id))
+        ranked.sort()
+        return [user_id for _, user_id in ranked[: s.presync_max_users_per_cycle]]
+
+    async def _with_google_token(
+        self, user_id: str, ut: UserTokens, report: CycleReport, call: Callable[[str], Awaitable[T]],
+    ) -> T:
+        """``call(access_token)``, refreshing the token once if Google rejects it."""
+        try:
+            return await call(ut.google_access_token)
+        except Exception as e:
+            if not _unauthorized(e):
+                raise
+        refresh_token = ut.get_google_refresh()
+        if not refresh_token:
+            raise GoogleTokenExpired(user_id)
+        try:
+            tokens = await refresh_access_token(refresh_token)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500:  # revoked or invalid grant
+                raise GoogleTokenExpired(user_id) from e
+            raise
+        ut.google_access_token = tokens["access_token"]
+        await store.aio.set_google_access_token(user_id, ut.google_access_token)
+        report.tokens_refreshed += 1
+        return await call(ut.google_access_token)
+
+    async def sync_user(self, user_id: str, report: CycleReport) -> None:
+        s = get_settings()
+        ut = await store.aio.get(user_id)
+        busy: list[BusyInterval] = []
+        changed: list[str] = []
+        if ut and ut.google_access_token:
+            busy, calendar_changed = await self._with_google_token(
+                user_id, ut, report, lambda token: sync_calendar(user_id, token, s.upstream_fresh_seconds),
+            )
+            if calendar_changed:
+                changed.append("calendar")
+        if ut and ut.canvas_access_token:
+            if await sync_canvas_tasks(user_id, ut.canvas_access_token, s.upstream_fresh_seconds):
+                changed.append("canvas")
+        if changed:
+            bus.publish(user_id, "sync", {"changed": changed})
+
+        goals = await goal_store.aio.list_goals(user_id)
+        fingerprint = _inputs_fingerprint(goals, busy)
+        try:
+            cached = await plan_cache.aio.get(user_id)
+        except SharedStateError:
+            cached = None
+        known = self._inputs.peek(user_id)
+        if cached is None or (known is not None and known != fingerprint):
+            async def known_busy(_: str) -> list[BusyInterval]:
+                return busy
+            await cache_plan(user_id, await build_plan(user_id, busy_source=known_busy), reason="sync")
+            report.plans_regenerated += 1
+        self._inputs.set(user_id, fingerprint)
+
+    async def run_cycle(self, user_ids: list[str] | None = None) -> CycleReport:
+        s = get_settings()
+        started = time.monotonic()
+        if user_ids is None:
+            user_ids = sorted(set(await store.aio.user_ids()) | set(await goal_store.aio.user_ids()))
+        due = await self.due(user_ids, datetime.now(timezone.utc), started)
+        report = CycleReport(candidates=len(due))
+        slots = asyncio.Semaphore(max(1, s.presync_concurrency))
+
+        async def one(user_id: str) -> None:
+            async with slots:
+                try:
+                    await self.sync_user(user_id, report)
+                except GoogleTokenExpired:
+                    # Not retried every cycle; the next sign-in stores a fresh token.
+                    report.skipped_expired += 1
+                    self._last_synced.set(user_id, time.monotonic())
+                    return
+                except Exception as e:
+                    log.warning("presync failed for %s: %r", user_id, e)
+                    report.failed += 1
+                    return
+                self._last_synced.set(user_id, time.monotonic())
+                report.synced += 1
+
+        await asyncio.gather(*(one(u) for u in due))
+        report.seconds = round(time.monotonic() - started, 3)
+        if due:
+            log.info("presync cycle: %s", report)
+        return report
+
+
+scheduler = PresyncScheduler(open_times)
+
+
+async def presync_loop() -> None:
+    """
+    Run a cycle every PRESYNC_INTERVAL_SECONDS; started from the app
+    lifespan. With several workers on one database only the lease holder
+    runs cycles; the lease is renewed each cycle and lapses after three
+    missed ones, so another worker takes over.
+    """
+    while True:
+        interval = get_settings().presync_interval_seconds
+        try:
+            if await store.aio.lease("presync", 3 * interval):
+                await scheduler.run_cycle()
+        except Exception:
+            log.exception("presync cycle crashed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,208 @@
+"""
+Deterministic per-request profiler with speedscope output.
+
+An operator sends ``X-Profile-Token: <PROFILING_TOKEN>`` on one request;
+that request (and tasks it spawns) is traced on the event-loop thread with
+sys.setprofile, filtered by a context variable so concurrent requests are
+not mixed in. Coroutine suspensions close their frames and resumptions reopen
+them, so awaited upstream time shows up as gaps rather than as self time.
+
+Arguments are never stored verbatim. For app functions we keep only their
+shape (type, length, model name), so calendar event titles, email subjects
+and tokens never end up in a profile. Profiles are kept in memory and served
+by the admin router as speedscope JSON (https://www.speedscope.app).
+"""
+
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.cache import LRUCache
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_EVENTS = 500_000
+
+_current: ContextVar[Recorder | None] = ContextVar("profile_recorder", default=None)
+_install_lock = threading.Lock()
+_active = 0
+_previous_hook = None
+
+
+def shape(value: Any) -> str:
+    """A value's type and size, never its content."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return type(value).__name__
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, BaseModel):
+        return type(value).__name__
+    if isinstance(value, (list, tuple, set, frozenset)):
+        inner = shape(next(iter(value))) if value else ""
+        return f"{type(value).__name__}[{len(value)}]" + (f" of {inner}" if inner else "")
+    if isinstance(value, dict):
+        return f"dict[{len(value)}]"
+    return type(value).__name__
+
+
+@dataclass
+class Recorder:
+    name: str
+    frames: list[dict[str, Any]] = field(default_factory=list)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    arguments: dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+    started: float = field(default_factory=time.perf_counter)
+    _index: dict[Any, int] = field(default_factory=dict)
+    _stack: list[tuple[int, int]] = field(default_factory=list)  # (id(frame or c func), frame index)
+
+    def _now(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def _frame_index(self, key: Any, name: str, file: str, line: int) -> int:
+        i = self._index.get(key)
+        if i is None:
+            i = self._index[key] = len(self.frames)
+            self.frames.append({"name": name, "file": file, "line": line})
+        return i
+
+    def _open(self, ident: int, index: int) -> None:
+        if len(self.events) >= MAX_EVENTS:
+            self.truncated = True
+            return
+        self._stack.append((ident, index))
+        self.events.append({"type": "O", "frame": index, "at": self._now()})
+
+    def _close(self, ident: int) -> None:
+        # Only close frames we opened; interleaved child tasks can return out
+        # of order, so unwind to the matching entry to keep events nested.
+        if not any(entry[0] == ident for entry in self._stack):
+            return
+        at = self._now()
+        while self._stack:
+            entry_ident, index = self._stack.pop()
+            self.events.append({"type": "C", "frame": index, "at": at})
+            if entry_ident == ident:
+                break
+
+    def on_event(self, frame, event: str, arg) -> None:
+        if event == "call":
+            code = frame.f_code
+            index = self._frame_index(code, code.co_qualname, code.co_filename, code.co_firstlineno)
+            if code.co_filename.startswith(APP_ROOT) and code.co_qualname not in self.arguments:
+                self._record_arguments(frame)
+            self._open(id(frame), index)
+        elif event == "return":
+            self._close(id(frame))
+        elif event == "c_call":
+            name = f"{getattr(arg, '__module__', None) or 'builtins'}.{getattr(arg, '__qualname__', repr(arg))}"
+            self._open(id(arg), self._frame_index(arg, name, "<builtin>", 0))
+        elif event in ("c_return", "c_exception"):
+            self._close(id(arg))
+
+    def _record_arguments(self, frame) -> None:
+        code = frame.f_code
+        count = code.co_argcount + code.co_kwonlyargcount
+        names = code.co_varnames[:count]
+        local = frame.f_locals
+        self.arguments[code.co_qualname] = ", ".join(
+            f"{n}={shape(local.get(n))}" for n in names if n != "self"
+        )
+
+    def finish(self) -> float:
+        at = self._now()
+        while self._stack:
+            _, index = self._stack.pop()
+            self.events.append({"type": "C", "frame": index, "at": at})
+        return at
+
+    def speedscope(self, end: float, meta: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "chronoforge",
+            "name": self.name,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "evented",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": end,
+                "events": self.events,
+            }],
+            "chronoforge": {**meta, "arguments": self.arguments, "truncated": self.truncated},
+        }
+
+
+def _hook(frame, event, arg) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.on_event(frame, event, arg)
+
+
+def _install() -> None:
+    global _active, _previous_hook
+    with _install_lock:
+        if _active == 0:
+            _previous_hook = sys.getprofile()
+            sys.setprofile(_hook)
+        _active += 1
+
+
+def _uninstall() -> None:
+    global _active
+    with _install_lock:
+        _active -= 1
+        if _active == 0:
+            sys.setprofile(_previous_hook)
+
+
+class ProfileStore:
+    def __init__(self, max_profiles: int) -> None:
+        self._profiles: LRUCache[dict[str, Any]] = LRUCache(max_profiles)
+
+    def add(self, profile: dict[str, Any]) -> str:
+        profile_id = uuid.uuid4().hex[:12]
+        profile["chronoforge"]["id"] = profile_id
+        self._profiles.set(profile_id, profile)
+        return profile_id
+
+    def get(self, profile_id: str) -> dict[str, Any] | None:
+        return self._profiles.peek(profile_id)
+
+    def list(self) -> list[dict[str, Any]]:
+        """Newest first, without frames, events or argument shapes."""
+        return [
+            {k: v for k, v in p["chronoforge"].items() if k != "arguments"}
+            for _, p in reversed(self._profiles.items())
+        ]
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+profiles = ProfileStore(get_settings().profiling_max_profiles)
+
+
+def start(name: str) -> tuple[Recorder, Any]:
+    """Begin tracing the current context; pass the result to stop()."""
+    recorder = Recorder(name=name)
+    token = _current.set(recorder)
+    _install()
+    return recorder, token
+
+
+def stop(recorder: Recorder, token: Any, meta: dict[str, Any]) -> str:
+    """Stop tracing and store the profile; returns its id."""
+    _current.reset(token)
+    _uninstall()
+    end = recorder.finish()
+    return profiles.add(recorder.speedscope(end, {**meta, "duration_ms": round(end, 3)}))
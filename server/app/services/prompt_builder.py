@@ -0,0 +1,173 @@
+"""
+Token-budgeted prompt construction for plan insights.
+
+Instead of pasting raw blocks, the plan is pre-aggregated into per-goal,
+per-category and per-day statistics. Sections are added in priority order
+and trimmed line by line to fit the configured token budget, so long plans
+are covered by their aggregates rather than cut off after the first N blocks.
+"""
+
+from __future__ import annotations
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.models.schemas import Goal, PlanResponse
+
+# Rough chars-per-token for English prose with numbers; good to ~10% for Gemini.
+CHARS_PER_TOKEN = 4
+
+INSIGHTS_INSTRUCTIONS = """You are a ruthless schedule coach. Given this user's plan and goals, reply in JSON only with exactly these three keys (no markdown, no code block):
+- "summary": 2–3 sentences on how their time is split and whether they're on track.
+- "time_breakdown": A short bullet list of where their hours go (by category/goal).
+- "where_to_add_more": 1–2 sentences on where they still have room (spare hours, underused days) and what to prioritize. Be direct.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def measure(prompt: str) -> dict[str, int]:
+    """Size of a prompt: characters, lines and estimated tokens."""
+    return {
+        "chars": len(prompt),
+        "lines": prompt.count("\n") + 1,
+        "tokens": estimate_tokens(prompt),
+    }
+
+
+@dataclass
+class GoalStats:
+    name: str
+    category: str
+    priority: int
+    target_hours: float
+    planned_hours: float = 0.0
+    blocks: int = 0
+
+
+@dataclass
+class DayStats:
+    date: str
+    weekday: str
+    fixed_hours: float = 0.0
+    planned_hours: float = 0.0
+    spare_hours: float = 0.0
+
+
+@dataclass
+class PlanSummary:
+    days: int
+    fixed_hours: float = 0.0
+    planned_hours: float = 0.0
+    spare_hours: float = 0.0
+    by_goal: dict[str, GoalStats] = field(default_factory=dict)
+    by_category: dict[str, float] = field(default_factory=dict)
+    by_day: list[DayStats] = field(default_factory=list)
+
+
+def _hours(start: datetime, end: datetime) -> float:
+    return (end - start).total_seconds() / 3600
+
+
+def summarize_plan(plan: PlanResponse, goals: list[Goal]) -> PlanSummary:
+    days = len(plan.capacity_by_day) or 14
+    summary = PlanSummary(days=days)
+    for g in goals:
+        summary.by_goal[g.id] = GoalStats(
+            name=g.name,
+            category=g.category.value,
+            priority=g.priority_weight,
+            target_hours=g.weekly_target_hours * days / 7.0,
+        )
+
+    day_index: dict[str, DayStats] = {}
+    for c in plan.capacity_by_day:
+        day = DayStats(
+            date=c.date,
+            weekday=datetime.strptime(c.date, "%Y-%m-%d").strftime("%a"),
+            planned_hours=c.allocated_hours,
+            spare_hours=c.spare_hours,
+        )
+        day_index[c.date] = day
+        summary.by_day.append(day)
+        summary.spare_hours += c.spare_hours
+
+    by_category: dict[str, float] = defaultdict(float)
+    for b in plan.blocks:
+        hours = _hours(b.start, b.end)
+        if b.is_fixed:
+            summary.fixed_hours += hours
+            day = day_index.get(b.start.strftime("%Y-%m-%d"))
+            if day:
+                day.fixed_hours += hours
+            continue
+        summary.planned_hours += hours
+        by_category[b.category.value] += hours
+        stats = summary.by_goal.get(b.goal_id)
+        if stats is None:
+            stats = summary.by_goal[b.goal_id] = GoalStats(
+                name=b.goal_name, category=b.category.value, priority=0, target_hours=0.0,
+            )
+        stats.planned_hours += hours
+        stats.blocks += 1
+    summary.by_category = dict(sorted(by_category.items(), key=lambda kv: -kv[1]))
+    return summary
+
+
+def _sections(plan: PlanResponse, s: PlanSummary) -> list[tuple[str, list[str]]]:
+    totals = [
+        f"- Horizon: {s.days} days",
+        f"- Planned goal work: {s.planned_hours:.1f}h",
+        f"- Fixed calendar time: {s.fixed_hours:.1f}h",
+        f"- Spare (unallocated free) time: {s.spare_hours:.1f}h",
+    ]
+    unmet = [
+        f"- {u.goal_name}: {u.allocated_hours:.1f}h of {u.target_hours:.1f}h ({u.deficit_hours:.1f}h short)"
+        for u in sorted(plan.unmet, key=lambda u: -u.deficit_hours)
+    ] or ["- None"]
+    goals = [
+        f"- {g.name} [{g.category}, priority {g.priority}]: {g.planned_hours:.1f}h planned"
+        + (f" of {g.target_hours:.1f}h target" if g.target_hours else "")
+        + f" in {g.blocks} blocks"
+        for g in sorted(s.by_goal.values(), key=lambda g: (-g.priority, g.name))
+    ]
+    categories = [f"- {cat}: {hours:.1f}h" for cat, hours in s.by_category.items()]
+    days = [
+        f"- {d.date} ({d.weekday}): {d.fixed_hours:.1f}h fixed, {d.planned_hours:.1f}h planned, {d.spare_hours:.1f}h spare"
+        for d in s.by_day
+    ]
+    return [
+        ("Totals", totals),
+        ("Unmet goals (deficit)", unmet),
+        ("Goals", goals),
+        ("Hours by category", categories),
+        ("Daily capacity", days),
+    ]
+
+
+def build_insights_prompt(plan: PlanResponse, goals: list[Goal], token_budget: int) -> str:
+    """
+    Insights prompt fitted to ``token_budget`` estimated tokens. Higher
+    priority sections are filled first; the first section that does not fit
+    is cut with a trailing "… N more" line and everything after it dropped.
+    """
+    parts = [INSIGHTS_INSTRUCTIONS.rstrip("\n")]
+    used = estimate_tokens(INSIGHTS_INSTRUCTIONS)
+    for title, lines in _sections(plan, summarize_plan(plan, goals)):
+        header = f"\n{title}:"
+        cost = estimate_tokens(header) + 1
+        if used + cost > token_budget:
+            break
+        parts.append(header)
+        used += cost
+        for i, line in enumerate(lines):
+            line_cost = estimate_tokens(line) + 1
+            if used + line_cost > token_budget:
+                parts.append(f"- … {len(lines) - i} more")
+                return "\n".join(parts) + "\n"
+            parts.append(line)
+            used += line_cost
+    return "\n".join(parts) + "\n"
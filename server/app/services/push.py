@@ -0,0 +1,187 @@
+"""
+Per-user change notifications for the GET /events Server-Sent Events stream.
+
+Plan regeneration, upstream syncs and finished check-in assessments publish
+a small event (no plan body, just what changed and a digest), so the app
+refetches only when something did change instead of polling /plan/current.
+Each user keeps the last PUSH_BUFFER_SIZE events in a ring buffer; a client
+that reconnects with Last-Event-ID gets what it missed, or a ``reset`` event
+if the gap is no longer buffered (or the id is from before a restart).
+Past ``max_users`` channels, the least recently used one without an open
+stream is dropped; channels being streamed are kept.
+
+Events live in this worker's memory; with several workers, a stream only
+sees events published by the worker that serves it.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import secrets
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from app.config import get_settings
+from app.services.cache import LRUCache
+
+# Event ids are "<boot>-<seq>": ids from an earlier process never match.
+BOOT = secrets.token_hex(4)
+
+
+@dataclass
+class Event:
+    seq: int
+    type: str
+    data: dict[str, Any]
+
+    @property
+    def id(self) -> str:
+        return f"{BOOT}-{self.seq}"
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+
+@dataclass
+class Subscription:
+    user_id: str
+    backlog: list[Event]
+    queue: asyncio.Queue[Event | None]
+    loop: asyncio.AbstractEventLoop
+
+
+@dataclass
+class _Channel:
+    events: deque[Event]
+    subscribers: list[Subscription] = field(default_factory=list)
+    seq: int = 0
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+class EventBus:
+    def __init__(self, buffer_size: int, max_streams_per_user: int, max_users: int = 50_000) -> None:
+        self.buffer_size = buffer_size
+        self.max_streams_per_user = max_streams_per_user
+        self._channels: LRUCache[_Channel] = LRUCache(max_users)
+        self.published = 0
+        self.dropped_streams = 0
+        # publish() is called from worker threads too (check-in jobs, offloaded store calls).
+        self._lock = threading.Lock()
+
+    def _channel(self, user_id: str) -> _Channel:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            channel = _Channel(deque(maxlen=self.buffer_size))
+            if len(self._channels) >= self._channels.max_entries:
+                self._evict_idle()
+            self._channels.set(user_id, channel)
+        return channel
+
+    def _evict_idle(self) -> None:
+        """Drop the least recently used channel nobody is streaming, so open streams keep their buffer."""
+        for user_id, channel in self._channels.items():
+            if not channel.subscribers:
+                self._channels.pop(user_id)
+                return
+
+    def publish(self, user_id: str, type: str, data: dict[str, Any]) -> Event:
+        """Buffer an event and hand it to the user's open streams. Safe from any thread."""
+        with self._lock:
+            channel = self._channel(user_id)
+            channel.seq += 1
+            event = Event(channel.seq, type, {**data, "at": datetime.now(timezone.utc).isoformat()})
+            channel.events.append(event)
+            self.published += 1
+            for sub in list(channel.subscribers):
+                try:
+                    sub.loop.call_soon_threadsafe(self._deliver, sub, event)
+                except RuntimeError:  # its loop is gone
+                    channel.subscribers.remove(sub)
+        return event
+
+    def _deliver(self, sub: Subscription, event: Event) -> None:
+        try:
+            sub.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stream this far behind is closed; the client resumes from its last id.
+            self.unsubscribe(sub)
+            with self._lock:
+                self.dropped_streams += 1
+            sub.queue.get_nowait()
+            sub.queue.put_nowait(None)
+
+    def subscribe(self, user_id: str, last_event_id: str | None = None) -> Subscription:
+        """Open a stream; ``backlog`` holds what was missed since ``last_event_id``."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            channel = self._channel(user_id)
+            if len(channel.subscribers) >= self.max_streams_per_user:
+                raise TooManyStreams(user_id)
+            sub = Subscription(user_id, self._since(channel, last_event_id), asyncio.Queue(maxsize=self.buffer_size), loop)
+            channel.subscribers.append(sub)
+        return sub
+
+    def _since(self, channel: _Channel, last_event_id: str | None) -> list[Event]:
+        if not last_event_id:
+            return []
+        boot, _, seq = last_event_id.partition("-")
+        oldest = channel.events[0].seq if channel.events else channel.seq + 1
+        if boot != BOOT or not seq.isdigit() or int(seq) > channel.seq or int(seq) < oldest - 1:
+            # Carries the current id, so the next reconnect resumes from here.
+            return [Event(channel.seq, "reset", {"reason": "gap"})]
+        return [e for e in channel.events if e.seq > int(seq)]
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            channel = self._channels.peek(sub.user_id)
+            if channel is not None and sub in channel.subscribers:
+                channel.subscribers.remove(sub)
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "users": len(self._channels),
+                "streams": sum(len(c.subscribers) for _, c in self._channels.items()),
+                "published": self.published,
+                "dropped_streams": self.dropped_streams,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._channels.clear()
+
+    async def stream(
+        self,
+        sub: Subscription,
+        heartbeat_seconds: float,
+        is_disconnected: Callable[[], Awaitable[bool]],
+        retry_ms: int,
+    ) -> AsyncIterator[str]:
+        """SSE body: reconnect hint, missed events, then live events with comment heartbeats."""
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            for event in sub.backlog:
+                yield event.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event.encode()
+        finally:
+            self.unsubscribe(sub)
+
+
+_s = get_settings()
+bus = EventBus(_s.push_buffer_size, _s.push_max_streams_per_user)
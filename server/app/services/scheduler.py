@@ -2,7 +2,8 @@
 Greedy schedule allocator for ChronoForge MVP.
 
 Algorithm:
-1. Build free blocks by subtracting fixed events + sleep windows from each day.
+1. Build free blocks by subtracting fixed events / busy intervals + sleep
+   windows from each day.
 2. Sort goals by priority_weight descending.
 3. For each goal, allocate hours from free blocks that match preferred
    time windows first, then spill into any remaining free block.
@@ -14,10 +15,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, time, timezone
 from app.models.schemas import (
-    CalendarEvent, Goal, GoalCategory, CapacityConstraints,
+    BusyInterval, CalendarEvent, Goal, GoalCategory, CapacityConstraints,
     PlannedBlock, UnmetGoal, DayCapacity, PlanResponse,
     TimeWindow, TradeoffReport, TradeoffEntry, GoalCreate,
 )
+from app.services.metrics import PhaseTimer
 
 SLOT_MINUTES = 30
 
@@ -50,9 +52,10 @@ def compute_free_blocks(
     day_end: datetime,
     fixed_events: list[CalendarEvent],
     constraints: CapacityConstraints,
+    busy: list[BusyInterval] | None = None,
 ) -> list[FreeSlot]:
     """
-    Subtract fixed events and sleep window from [day_start, day_end].
+    Subtract fixed events, busy intervals and sleep window from [day_start, day_end].
     Returns sorted list of free slots (minimum SLOT_MINUTES long).
     """
     blocked: list[tuple[datetime, datetime]] = []
@@ -81,6 +84,12 @@ def compute_free_blocks(
             if ev_start < ev_end:
                 blocked.append((ev_start, ev_end))
 
+    for iv in busy or []:
+        iv_start = max(iv.start, day_start)
+        iv_end = min(iv.end, day_end)
+        if iv_start < iv_end:
+            blocked.append((iv_start, iv_end))
+
     blocked.sort(key=lambda b: b[0])
 
     merged: list[tuple[datetime, datetime]] = []
@@ -120,6 +129,7 @@ def generate_plan(
     start_date: datetime | None = None,
     days: int = 14,
     simulate_goal: GoalCreate | None = None,
+    busy_intervals: list[BusyInterval] | None = None,
 ) -> PlanResponse:
     if start_date is None:
         start_date = datetime.now(timezone.utc).replace(
@@ -147,6 +157,7 @@ def generate_plan(
     goal_allocated: dict[str, float] = {g.id: 0.0 for g in working_goals}
     weekly_target: dict[str, float] = {g.id: g.weekly_target_hours for g in working_goals}
 
+    timer = PhaseTimer()
     for d in range(days):
         day_dt = start_date + timedelta(days=d)
         day_start = day_dt.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -167,7 +178,23 @@ def generate_plan(
                 is_fixed=True,
             ))
 
-        free_slots = compute_free_blocks(day_start, day_end, day_events, constraints)
+        day_busy = [
+            b for b in busy_intervals or []
+            if b.end > day_start and b.start < day_end
+        ]
+
+        for b in day_busy:
+            all_blocks.append(PlannedBlock(
+                goal_id="busy",
+                goal_name="Busy",
+                category=GoalCategory.personal,
+                start=max(b.start, day_start),
+                end=min(b.end, day_end),
+                is_fixed=True,
+            ))
+
+        free_slots = compute_free_blocks(day_start, day_end, day_events, constraints, day_busy)
+        timer.lap("free_blocks")
         total_free = sum(s.hours for s in free_slots)
         day_allocated = 0.0
         daily_deep_used = 0.0
@@ -222,6 +249,7 @@ def generate_plan(
             allocated_hours=round(day_allocated, 2),
             spare_hours=round(spare, 2),
         ))
+        timer.lap("allocation")
 
     unmet: list[UnmetGoal] = []
     for goal in working_goals:
@@ -239,6 +267,8 @@ def generate_plan(
     coaching = _generate_coaching(working_goals, goal_allocated, unmet, days)
 
     all_blocks.sort(key=lambda b: b.start)
+    timer.lap("unmet_coaching")
+    timer.record()
 
     return PlanResponse(
         blocks=all_blocks,
@@ -253,9 +283,15 @@ def compute_tradeoffs(
     new_goal: GoalCreate,
     fixed_events: list[CalendarEvent],
     constraints: CapacityConstraints,
+    busy_intervals: list[BusyInterval] | None = None,
 ) -> TradeoffReport:
-    plan_without = generate_plan(existing_goals, fixed_events, constraints)
-    plan_with = generate_plan(existing_goals, fixed_events, constraints, simulate_goal=new_goal)
+    plan_without = generate_plan(
+        existing_goals, fixed_events, constraints, busy_intervals=busy_intervals,
+    )
+    plan_with = generate_plan(
+        existing_goals, fixed_events, constraints,
+        simulate_goal=new_goal, busy_intervals=busy_intervals,
+    )
 
     without_alloc: dict[str, float] = {}
     for b in plan_without.blocks:
@@ -0,0 +1,269 @@
+"""
+Shared key-value state for running more than one worker.
+
+State that must agree across uvicorn workers (currently the plan cache)
+goes through a SharedState backend instead of a module-level dict. The
+backend is chosen by SHARED_STATE_URL:
+
+- empty: InProcessState, a dict with expiry (single worker, tests) that
+  keeps SharedMap models as objects, so nothing is serialized
+- ``redis://[:password@]host[:port][/db]``: RESPState, which speaks the
+  Redis protocol (RESP2) to Redis, Valkey, KeyDB or anything compatible
+
+RESPState is a small dependency-free client: pooled blocking sockets and
+GET/SET/DEL only. It is reached through ``.aio`` like the SQLite stores, so
+calls run on a worker thread.
+"""
+
+from __future__ import annotations
+import abc
+import queue
+import socket
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Generic, TypeVar
+from urllib.parse import unquote, urlparse
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.store_async import AsyncAccess
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class SharedStateError(Exception):
+    """The shared-state server rejected a command or could not be reached."""
+
+
+class SharedState(AsyncAccess, abc.ABC):
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None: ...
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+    def get_value(self, key: str, decode: Callable[[bytes], Any]) -> Any:
+        """A value stored with set_value(); backends that share across processes decode bytes."""
+        raw = self.get(key)
+        return None if raw is None else decode(raw)
+
+    def set_value(
+        self, key: str, value: Any, encode: Callable[[Any], bytes], ttl_seconds: float | None = None,
+    ) -> None:
+        self.set(key, encode(value), ttl_seconds)
+
+
+class InProcessState(SharedState):
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[float | None, Any]] = {}
+        self._sweep_at = 1024
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and time.monotonic() > expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        now = time.monotonic()
+        if len(self._data) >= self._sweep_at:
+            # Expired keys nobody reads again would otherwise stay forever; amortized O(1).
+            self._data = {k: v for k, v in self._data.items() if v[0] is None or v[0] > now}
+            self._sweep_at = max(1024, 2 * len(self._data))
+        self._data[key] = (None if ttl_seconds is None else now + ttl_seconds, value)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def get_value(self, key: str, decode: Callable[[bytes], Any]) -> Any:
+        return self.get(key)  # same process: the object itself, no round trip
+
+    def set_value(
+        self, key: str, value: Any, encode: Callable[[Any], bytes], ttl_seconds: float | None = None,
+    ) -> None:
+        self.set(key, value, ttl_seconds)
+
+
+def _encode(args: tuple[str | bytes | int, ...]) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by shared-state server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise SharedStateError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        data = reader.read(size + 2)
+        if len(data) != size + 2:
+            raise ConnectionError("connection closed by shared-state server")
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise SharedStateError(f"unexpected reply: {line!r}")
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def execute(self, *args):
+        self.sock.sendall(_encode(args))
+        return _read_reply(self.reader)
+
+    def close(self) -> None:
+        self.reader.close()
+        self.sock.close()
+
+
+class RESPState(SharedState):
+    blocking = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 6379,
+        db: int = 0,
+        password: str | None = None,
+        pool_size: int = 8,
+        timeout_seconds: float = 2.0,
+    ) -> None:
+        self.host, self.port, self.db, self.password = host, port, db, password
+        self.timeout_seconds = timeout_seconds
+        self._pool: queue.LifoQueue[_Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, pool_size))
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> RESPState:
+        u = urlparse(url)
+        if u.scheme != "redis":
+            raise ValueError(f"unsupported shared-state URL: {url}")
+        return cls(
+            host=u.hostname or "localhost",
+            port=u.port or 6379,
+            db=int(u.path.lstrip("/") or 0),
+            password=unquote(u.password) if u.password else None,
+            **kwargs,
+        )
+
+    def _connect(self) -> _Connection:
+        conn = _Connection(self.host, self.port, self.timeout_seconds)
+        try:
+            if self.password:
+                conn.execute("AUTH", self.password)
+            if self.db:
+                conn.execute("SELECT", self.db)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def execute(self, *args):
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            raise SharedStateError("no shared-state connection available")
+        try:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                reply = conn.execute(*args)
+            except SharedStateError:
+                self._pool.put(conn)
+                raise
+            except (OSError, ValueError):
+                # Broken or desynchronised socket: drop it rather than reuse it.
+                conn.close()
+                raise
+            self._pool.put(conn)
+            return reply
+        except (OSError, ValueError) as e:
+            raise SharedStateError(f"shared-state server unavailable: {e}") from e
+        finally:
+            self._slots.release()
+
+    def get(self, key: str) -> bytes | None:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        if ttl_seconds is None:
+            self.execute("SET", key, value)
+        else:
+            self.execute("SET", key, value, "PX", max(1, int(ttl_seconds * 1000)))
+
+    def delete(self, key: str) -> None:
+        self.execute("DEL", key)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SharedMap(AsyncAccess, Generic[M]):
+    """
+    A namespace of pydantic models in a SharedState, stored as JSON by
+    backends shared across processes. In-process, get() returns the stored
+    instance itself, so callers must not mutate it.
+    """
+
+    def __init__(
+        self,
+        state: SharedState,
+        namespace: str,
+        model: type[M],
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self.state = state
+        self.namespace = namespace
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.blocking = state.blocking
+
+    def _key(self, key: str) -> str:
+        return f"chronoforge:{self.namespace}:{key}"
+
+    def get(self, key: str) -> M | None:
+        return self.state.get_value(self._key(key), self.model.model_validate_json)
+
+    def set(self, key: str, value: M) -> None:
+        self.state.set_value(self._key(key), value, lambda v: v.model_dump_json().encode(), self.ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.state.delete(self._key(key))
+
+
+@lru_cache
+def shared_state() -> SharedState:
+    url = get_settings().shared_state_url
+    return RESPState.from_url(url) if url else InProcessState()
@@ -0,0 +1,35 @@
+"""
+Async access to the stores: ``await goal_store.aio.list_goals(user_id)``.
+
+Blocking backends (SQLite) run each call on a worker thread so a slow disk
+never stalls the event loop; in-memory stores run the call inline.
+"""
+
+from __future__ import annotations
+import asyncio
+from functools import cached_property
+
+
+class AsyncView:
+    def __init__(self, target: object, offload: bool) -> None:
+        self._target = target
+        self._offload = offload
+
+    def __getattr__(self, name: str):
+        fn = getattr(self._target, name)
+        if self._offload:
+            async def call(*args, **kwargs):
+                return await asyncio.to_thread(fn, *args, **kwargs)
+        else:
+            async def call(*args, **kwargs):
+                return fn(*args, **kwargs)
+        call.__name__ = name
+        return call
+
+
+class AsyncAccess:
+    blocking = False
+
+    @cached_property
+    def aio(self) -> AsyncView:
+        return AsyncView(self, offload=self.blocking)
@@ -1,11 +1,18 @@
 """
-In-memory token store for MVP. In production, swap for a database.
+Token store: in-memory for development, SQLite when STORAGE_BACKEND=sqlite.
 Tokens are encrypted at rest via Fernet.
 """
 
 from __future__ import annotations
+import asyncio
+import logging
 from dataclasses import dataclass, field
-from app.services.crypto import encrypt_token, decrypt_token
+from app.config import get_settings
+from app.services.crypto import encrypt_token, decrypt_token, fernet, rotate_token
+from app.services.database import Database, database
+from app.services.store_async import AsyncAccess
+
+log = logging.getLogger(__name__)
 
 
 @dataclass
@@ -25,7 +32,7 @@ class UserTokens:
 
 
 @dataclass
-class TokenStore:
+class TokenStore(AsyncAccess):
     _users: dict[str, UserTokens] = field(default_factory=dict)
 
     def get_or_create(self, user_id: str) -> UserTokens:
@@ -36,5 +43,187 @@ class TokenStore:
     def get(self, user_id: str) -> UserTokens | None:
         return self._users.get(user_id)
 
+    def save(self, user_id: str, tokens: UserTokens) -> None:
+        self._users[user_id] = tokens
+
+    def user_ids(self) -> list[str]:
+        return list(self._users)
+
+    def encrypted(self, user_id: str) -> dict[str, str]:
+        ut = self._users.get(user_id)
+        return {"google_refresh_token_enc": ut.google_refresh_token_enc} if ut and ut.google_refresh_token_enc else {}
+
+    def replace_encrypted(self, user_id: str, column: str, old: str, new: str) -> bool:
+        ut = self._users.get(user_id)
+        if ut is None or getattr(ut, column) != old:
+            return False
+        setattr(ut, column, new)
+        return True
+
+    def set_google_access_token(self, user_id: str, token: str) -> None:
+        self.get_or_create(user_id).google_access_token = token
+
+    def lease(self, name: str, ttl_seconds: float) -> bool:
+        return True  # in-memory tokens are never shared between workers
+
+
+_TOKEN_COLUMNS = ("google_access_token_enc", "google_refresh_token_enc", "canvas_access_token_enc", "email")
+_ENCRYPTED_COLUMNS = ("google_access_token_enc", "google_refresh_token_enc", "canvas_access_token_enc")
+_LEGACY_PLAINTEXT = ("google_access_token", "canvas_access_token")
+
+
+def _encrypt(token: str | None) -> str | None:
+    return encrypt_token(token) if token else None
+
+
+def _decrypt(user_id: str, ciphertext: str | None) -> str | None:
+    """An access token no configured key can read is dropped; the user reconnects."""
+    if not ciphertext:
+        return None
+    try:
+        return decrypt_token(ciphertext)
+    except fernet.InvalidToken:
+        log.warning("unreadable access token for %s; treating as disconnected", user_id)
+        return None
+
+
+class SQLiteTokenStore(AsyncAccess):
+    """
+    Access tokens are encrypted on save() and decrypted on get(); the refresh
+    token stays encrypted in UserTokens as well. Rows are read into fresh
+    UserTokens objects, so callers that change one must hand it back with save().
+    """
+
+    blocking = True
+
+    def __init__(self, db: Database) -> None:
+        self.db = db
+        self._migrate_plaintext()
+
+    def _migrate_plaintext(self) -> None:
+        """Encrypt access tokens left in the plaintext columns of older databases, then drop them."""
+        with self.db.transaction() as conn:
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(tokens)")}
+            legacy = [c for c in _LEGACY_PLAINTEXT if c in columns]
+            if not legacy:
+                return
+            for column in legacy:
+                if f"{column}_enc" not in columns:
+                    conn.execute(f"ALTER TABLE tokens ADD COLUMN {column}_enc TEXT")
+                rows = conn.execute(f"SELECT user_id, {column} FROM tokens WHERE {column} IS NOT NULL").fetchall()
+                conn.executemany(
+                    f"UPDATE tokens SET {column}_enc = ? WHERE user_id = ?",
+                    [(encrypt_token(token), user_id) for user_id, token in rows],
+                )
+                conn.execute(f"ALTER TABLE tokens DROP COLUMN {column}")
+
+    def get(self, user_id: str) -> UserTokens | None:
+        with self.db.connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_TOKEN_COLUMNS)} FROM tokens WHERE user_id = ?", (user_id,),
+            ).fetchone()
+        if not row:
+            return None
+        google_access, google_refresh_enc, canvas_access, email = row
+        return UserTokens(
+            google_access_token=_decrypt(user_id, google_access),
+            google_refresh_token_enc=google_refresh_enc,
+            canvas_access_token=_decrypt(user_id, canvas_access),
+            email=email,
+        )
+
+    def get_or_create(self, user_id: str) -> UserTokens:
+        with self.db.connection() as conn:
+            conn.execute("INSERT OR IGNORE INTO tokens (user_id) VALUES (?)", (user_id,))
+        return self.get(user_id) or UserTokens()
+
+    def save(self, user_id: str, tokens: UserTokens) -> None:
+        with self.db.connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO tokens (user_id, {', '.join(_TOKEN_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                (
+                    user_id,
+                    _encrypt(tokens.google_access_token),
+                    tokens.google_refresh_token_enc,
+                    _encrypt(tokens.canvas_access_token),
+                    tokens.email,
+                ),
+            )
+
+    def user_ids(self) -> list[str]:
+        with self.db.connection() as conn:
+            return [r[0] for r in conn.execute("SELECT user_id FROM tokens")]
+
+    def encrypted(self, user_id: str) -> dict[str, str]:
+        """The user's stored ciphertexts by column, for re-encryption."""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_ENCRYPTED_COLUMNS)} FROM tokens WHERE user_id = ?", (user_id,),
+            ).fetchone()
+        return {c: v for c, v in zip(_ENCRYPTED_COLUMNS, row or ()) if v}
+
+    def replace_encrypted(self, user_id: str, column: str, old: str, new: str) -> bool:
+        """Compare-and-set one column, so a concurrent save() is never overwritten."""
+        if column not in _ENCRYPTED_COLUMNS:
+            raise ValueError(column)
+        with self.db.connection() as conn:
+            cur = conn.execute(
+                f"UPDATE tokens SET {column} = ? WHERE user_id = ? AND {column} = ?", (new, user_id, old),
+            )
+        return cur.rowcount == 1
+
+    def set_google_access_token(self, user_id: str, token: str) -> None:
+        """Update only the access token (e.g. after a refresh), leaving the rest of the row alone."""
+        with self.db.connection() as conn:
+            conn.execute(
+                "UPDATE tokens SET google_access_token_enc = ? WHERE user_id = ?", (_encrypt(token), user_id),
+            )
+
+    def lease(self, name: str, ttl_seconds: float) -> bool:
+        return self.db.try_lease(name, ttl_seconds)
+
+
+store = SQLiteTokenStore(database()) if get_settings().storage_backend == "sqlite" else TokenStore()
+
+
+@dataclass
+class ReencryptReport:
+    users: int = 0
+    rotated: int = 0
+    failed: int = 0
+
+
+def _reencrypt_batch(token_store, user_ids: list[str], report: ReencryptReport) -> None:
+    for user_id in user_ids:
+        for column, ciphertext in token_store.encrypted(user_id).items():
+            try:
+                rotated = rotate_token(ciphertext)
+            except fernet.InvalidToken:
+                report.failed += 1
+                continue
+            # Only if unchanged: a token saved meanwhile is already under the primary key.
+            if token_store.replace_encrypted(user_id, column, ciphertext, rotated):
+                report.rotated += 1
+
+
+REENCRYPT_LEASE_SECONDS = 3600.0
+
 
-store = TokenStore()
+async def reencrypt_all(token_store=None, batch_size: int = 100) -> ReencryptReport:
+    """
+    Re-encrypt every stored token under the primary key. Batches run on a
+    worker thread with a yield in between, so requests keep flowing. Tokens
+    no configured key can read are counted as failed and left alone. With
+    several workers on one database, only the one holding the lease runs it.
+    """
+    token_store = token_store or store
+    if not await token_store.aio.lease("token-reencrypt", REENCRYPT_LEASE_SECONDS):
+        log.info("token re-encryption is running in another worker")
+        return ReencryptReport()
+    user_ids = await token_store.aio.user_ids()
+    report = ReencryptReport(users=len(user_ids))
+    for i in range(0, len(user_ids), max(1, batch_size)):
+        await asyncio.to_thread(_reencrypt_batch, token_store, user_ids[i:i + batch_size], report)
+        await asyncio.sleep(0)
+    log.info("token re-encryption: %s", report)
+    return report
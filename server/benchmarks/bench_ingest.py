@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: per-item isoparse + model construction vs. the bulk
+ingestion path, on a synthetic 5,000-event Google Calendar dump.
+
+    cd server && python -m benchmarks.bench_ingest [--events 5000] [--repeat 5]
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil.parser import isoparse  # type: ignore[import-untyped]
+
+from app.models.schemas import CalendarEvent
+from app.services import ingest
+
+
+def make_dump(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    items: list[dict] = []
+    for i in range(n):
+        start = base + timedelta(minutes=30 * rng.randrange(0, 14 * 48))
+        if i % 25 == 0:
+            items.append({
+                "id": f"evt{i}",
+                "summary": f"All-day {i}",
+                "start": {"date": start.date().isoformat()},
+                "end": {"date": (start + timedelta(days=1)).date().isoformat()},
+            })
+            continue
+        end = start + timedelta(minutes=30 * rng.randint(1, 6))
+        offset = timezone(timedelta(hours=rng.choice([-8, -5, 0, 1])))
+        items.append({
+            "id": f"evt{i}",
+            "summary": f"Event {i}",
+            "start": {"dateTime": start.astimezone(offset).isoformat().replace("+00:00", "Z")},
+            "end": {"dateTime": end.astimezone(offset).isoformat().replace("+00:00", "Z")},
+        })
+    return items
+
+
+def legacy(items: list[dict]) -> list[CalendarEvent]:
+    events: list[CalendarEvent] = []
+    for item in items:
+        start_raw = item.get("start", {})
+        end_raw = item.get("end", {})
+        is_all_day = "date" in start_raw and "dateTime" not in start_raw
+        start_str = start_raw.get("dateTime") or start_raw.get("date", "")
+        end_str = end_raw.get("dateTime") or end_raw.get("date", "")
+        if not start_str or not end_str:
+            continue
+        events.append(CalendarEvent(
+            id=item.get("id", ""),
+            title=item.get("summary", "(No title)"),
+            start=isoparse(start_str),
+            end=isoparse(end_str),
+            is_all_day=is_all_day,
+        ))
+    return events
+
+
+def best_of(fn, items: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(items)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = make_dump(args.events)
+    assert legacy(items) == ingest.calendar_events(items)
+
+    old = best_of(legacy, items, args.repeat)
+    new = best_of(ingest.calendar_events, items, args.repeat)
+    print(f"events:            {args.events}")
+    print(f"isoparse + models: {old * 1000:8.2f} ms")
+    print(f"bulk ingest:       {new * 1000:8.2f} ms")
+    print(f"speedup:           {old / new:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Insights prompt size: legacy first-50-blocks prompt vs. the aggregated,
+token-budgeted prompt, on a synthetic busy two-week plan.
+
+    cd server && python -m benchmarks.bench_prompt [--goals 8] [--budget 1200]
+"""
+
+from __future__ import annotations
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.models.schemas import BusyInterval, CapacityConstraints, Goal, GoalCategory, PlanResponse
+from app.services.google_service import merge_intervals
+from app.services.prompt_builder import INSIGHTS_INSTRUCTIONS, build_insights_prompt, measure
+from app.services.scheduler import generate_plan
+
+
+def make_plan(n_goals: int, seed: int = 3) -> tuple[PlanResponse, list[Goal]]:
+    rng = random.Random(seed)
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    categories = list(GoalCategory)
+    goals = [
+        Goal(
+            id=f"g{i}", name=f"Goal {i}", category=categories[i % len(categories)],
+            priority_weight=rng.randint(1, 10), weekly_target_hours=rng.choice([3, 5, 8, 12]),
+            created_at=start,
+        )
+        for i in range(n_goals)
+    ]
+    busy = merge_intervals([
+        BusyInterval(start=s, end=s + timedelta(hours=rng.randint(1, 3)))
+        for s in (start + timedelta(hours=rng.randrange(8, 14 * 24, 2)) for _ in range(60))
+    ])
+    plan = generate_plan(goals, [], CapacityConstraints(), start_date=start, busy_intervals=busy)
+    return plan, goals
+
+
+def legacy_prompt(plan: PlanResponse, goals: list[Goal]) -> str:
+    blocks_text = "\n".join(
+        f"- {b.start.strftime('%H:%M')}–{b.end.strftime('%H:%M')}: {b.goal_name}"
+        + (" (fixed)" if b.is_fixed else "")
+        for b in plan.blocks[:50]
+    )
+    capacity_text = "\n".join(
+        f"- {c.date}: {c.allocated_hours:.1f}h allocated, {c.spare_hours:.1f}h spare"
+        for c in plan.capacity_by_day[:14]
+    )
+    goals_text = "\n".join(
+        f"- {g.name}: {g.weekly_target_hours}h/week, priority {g.priority_weight}" for g in goals
+    )
+    unmet_text = "\n".join(
+        f"- {u.goal_name}: {u.deficit_hours:.1f}h short" for u in plan.unmet
+    ) if plan.unmet else "None"
+    return (
+        f"{INSIGHTS_INSTRUCTIONS}\nPlan blocks (next 14 days):\n{blocks_text}\n\n"
+        f"Daily capacity:\n{capacity_text}\n\nGoals:\n{goals_text}\n\n"
+        f"Unmet goals (deficit):\n{unmet_text}\n"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--goals", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=1200)
+    args = parser.parse_args()
+
+    plan, goals = make_plan(args.goals)
+    old = measure(legacy_prompt(plan, goals))
+    new = measure(build_insights_prompt(plan, goals, args.budget))
+    print(f"plan blocks:     {len(plan.blocks)} (legacy prompt shows {min(50, len(plan.blocks))})")
+    print(f"legacy prompt:   {old['tokens']:5d} tokens, {old['lines']:4d} lines")
+    print(f"budgeted prompt: {new['tokens']:5d} tokens, {new['lines']:4d} lines (budget {args.budget})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Store throughput: in-memory stores vs. the SQLite backend (WAL, pooled
+connections), on the operations the API performs per request.
+
+    cd server && python -m benchmarks.bench_storage [--users 50] [--checkins 40]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.models.schemas import CheckInCreate, GoalCategory, GoalCreate
+from app.services.checkin_store import CheckInStore, SQLiteCheckInStore
+from app.services.database import Database
+from app.services.goal_store import GoalStore, SQLiteGoalStore
+
+
+def _checkin(i: int) -> CheckInCreate:
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc) + timedelta(hours=i)
+    return CheckInCreate(
+        block_id=f"b{i}", planned_goal_id="g1", planned_goal_name="Study",
+        start=start, end=start + timedelta(hours=1), what_i_did="Problem set",
+    )
+
+
+def run(goals, checkins, users: int, per_user: int) -> dict[str, float]:
+    """Operations per second for each store call."""
+    user_ids = [f"user{u}@example.com" for u in range(users)]
+    ops: dict[str, tuple[int, float]] = {}
+
+    def timed(name: str, fn, args_list) -> None:
+        started = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        ops[name] = (len(args_list), time.perf_counter() - started)
+
+    goal = GoalCreate(name="Gym", category=GoalCategory.fitness)
+    timed("create_goal", goals.create_goal, [(u, goal) for u in user_ids])
+    timed("list_goals", goals.list_goals, [(u,) for u in user_ids * 10])
+    timed("add_checkin", checkins.add, [(u, _checkin(i)) for u in user_ids for i in range(per_user)])
+    timed("list_recent", checkins.list_recent, [(u, 20) for u in user_ids * 10])
+    timed("get_by_block", checkins.get_by_block, [(u, f"b{per_user // 2}") for u in user_ids * 10])
+    return {name: n / seconds for name, (n, seconds) in ops.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--checkins", type=int, default=40, help="check-ins per user")
+    args = parser.parse_args()
+
+    memory = run(GoalStore(), CheckInStore(), args.users, args.checkins)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        sqlite = run(SQLiteGoalStore(db), SQLiteCheckInStore(db), args.users, args.checkins)
+        db.close()
+
+    print(f"{'operation':<14}{'memory ops/s':>14}{'sqlite ops/s':>14}")
+    for name in memory:
+        print(f"{name:<14}{memory[name]:>14,.0f}{sqlite[name]:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+End-to-end load test: many synthetic users driving a realistic route mix
+against a running server, reporting throughput, latency percentiles and
+error rates per route as JSON.
+
+By default this starts the upstream emulator and one server worker
+(SQLite backend, so synthetic users can be given Google tokens) on free
+local ports, and stops them afterwards:
+
+    cd server && python -m benchmarks.load --users 2000 --concurrency 64 --duration 30 --out run.json
+
+Use --target to hit a server you started yourself (it must share
+JWT_SECRET with this process), and --compare to diff against a saved run.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import httpx
+
+from app.config import get_settings
+from app.services.jwt_service import create_token
+
+SERVER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERCENTILES = (50, 90, 95, 99)
+
+# Relative weights per scenario; "app_open" approximates the iOS app's traffic.
+MIXES: dict[str, dict[str, int]] = {
+    "app_open": {
+        "plan_current": 45, "goals_list": 20, "checkins_list": 15,
+        "checkin_submit": 8, "plan_generate": 6, "plan_tradeoff": 3, "goals_create": 3,
+    },
+    "planning": {
+        "plan_generate": 40, "plan_tradeoff": 30, "plan_current": 20, "goals_list": 10,
+    },
+    "read_only": {"plan_current": 60, "goals_list": 25, "checkins_list": 15},
+}
+
+
+def _goal(rng: random.Random) -> dict[str, Any]:
+    return {
+        "name": rng.choice(["Gym", "Read", "Side project", "Language practice", "Interview prep"]),
+        "category": rng.choice(["fitness", "study", "career", "personal"]),
+        "priority_weight": rng.randint(1, 10),
+        "weekly_target_hours": rng.choice([2, 3, 5, 8]),
+    }
+
+
+def _checkin(rng: random.Random) -> dict[str, Any]:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=rng.randint(1, 48))
+    return {
+        "block_id": f"blk-{rng.randrange(10**6)}", "planned_goal_id": "g", "planned_goal_name": "Study",
+        "start": start.isoformat(), "end": (start + timedelta(hours=1)).isoformat(),
+        "what_i_did": rng.choice(["Finished the problem set", "Reviewed notes", "Got distracted", "Ran 5k"]),
+    }
+
+
+# route name -> (method, path, body factory)
+ROUTES: dict[str, tuple[str, str, Callable[[random.Random], Any] | None]] = {
+    "plan_current": ("GET", "/plan/current", None),
+    "plan_generate": ("POST", "/plan/generate", lambda rng: {}),
+    "plan_tradeoff": ("POST", "/plan/tradeoff", lambda rng: {"simulate_goal": _goal(rng)}),
+    "goals_list": ("GET", "/goals", None),
+    "goals_create": ("POST", "/goals", _goal),
+    "checkins_list": ("GET", "/checkins?limit=20", None),
+    "checkin_submit": ("POST", "/checkins", _checkin),
+}
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """A named mix or ``route=weight,...``."""
+    if spec in MIXES:
+        return MIXES[spec]
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ROUTES:
+            raise ValueError(f"unknown route {name.strip()!r}; choose from {', '.join(ROUTES)}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def record(self, status: str, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not status.startswith(("2", "3")):
+            self.errors += 1
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        n = len(lat)
+        return {
+            "requests": n,
+            "throughput_rps": round(n / seconds, 2) if seconds else 0.0,
+            "error_rate": round(self.errors / n, 4) if n else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency_ms": {
+                **{f"p{p}": round(percentile(lat, p), 2) for p in PERCENTILES},
+                "mean": round(sum(lat) / n, 2) if n else 0.0,
+                "max": round(lat[-1], 2) if n else 0.0,
+            },
+        }
+
+
+async def _send(client: httpx.AsyncClient, route: str, token: str, rng: random.Random) -> str:
+    method, path, body = ROUTES[route]
+    try:
+        resp = await client.request(
+            method, path, headers={"Authorization": f"Bearer {token}"},
+            json=body(rng) if body else None,
+        )
+        return str(resp.status_code)
+    except httpx.TimeoutException:
+        return "timeout"
+    except httpx.TransportError as e:
+        return type(e).__name__
+
+
+async def setup_users(client: httpx.AsyncClient, tokens: list[str], concurrency: int, seed: int) -> None:
+    """Give every user one or two goals so plans have something to schedule."""
+    rng = random.Random(seed)
+    queue = list(tokens)
+    async def worker() -> None:
+        while queue:
+            token = queue.pop()
+            for _ in range(rng.randint(1, 2)):
+                await _send(client, "goals_create", token, rng)
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    tokens: list[str],
+    mix: dict[str, int],
+    *,
+    concurrency: int,
+    duration_seconds: float | None = None,
+    requests: int | None = None,
+    seed: int = 1,
+) -> dict[str, Any]:
+    """
+    Closed-loop load: ``concurrency`` workers each send one request at a
+    time for a random user and route until the duration or request budget
+    runs out. Returns the report (without run metadata).
+    """
+    stats = {route: RouteStats() for route in mix}
+    names, weights = list(mix), list(mix.values())
+    budget = [requests if requests is not None else float("inf")]
+    deadline = time.perf_counter() + duration_seconds if duration_seconds else float("inf")
+
+    async def worker(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        while budget[0] > 0 and time.perf_counter() < deadline:
+            budget[0] -= 1
+            route = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status = await _send(client, route, rng.choice(tokens), rng)
+            stats[route].record(status, (time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    overall = RouteStats()
+    for s in stats.values():
+        overall.latencies_ms.extend(s.latencies_ms)
+        overall.errors += s.errors
+        for status, n in s.statuses.items():
+            overall.statuses[status] = overall.statuses.get(status, 0) + n
+    return {
+        "duration_seconds": round(elapsed, 3),
+        "overall": overall.summary(elapsed),
+        "routes": {route: s.summary(elapsed) for route, s in stats.items() if s.latencies_ms},
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """One line per route: throughput and p95 change versus ``baseline``."""
+    lines = []
+    routes = {"overall": (current["overall"], baseline.get("overall"))}
+    routes.update({r: (s, baseline.get("routes", {}).get(r)) for r, s in current["routes"].items()})
+    for route, (now, before) in routes.items():
+        if not before:
+            continue
+        rps = now["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        p95 = now["latency_ms"]["p95"] - before["latency_ms"]["p95"]
+        lines.append(f"{route:16s} rps {rps:+7.1%}   p95 {p95:+8.2f} ms   errors {now['error_rate']:.2%} (was {before['error_rate']:.2%})")
+    return lines
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _token_key() -> str:
+    """The server decrypts the tokens seeded from this process, so both need the same key."""
+    s = get_settings()
+    if not s.token_encryption_key:
+        from cryptography.fernet import Fernet
+
+        s.token_encryption_key = Fernet.generate_key().decode()
+    return s.token_encryption_key
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{proc.args} exited with {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+class LocalStack:
+    """The emulator and one server worker as subprocesses on free ports."""
+
+    def __init__(self, emulator_args: list[str], workdir: str) -> None:
+        self.emulator_port, self.server_port = _free_port(), _free_port()
+        self.db_path = os.path.join(workdir, "load.db")
+        upstream = f"http://127.0.0.1:{self.emulator_port}"
+        self.env = {
+            **os.environ,
+            "JWT_SECRET": get_settings().jwt_secret,
+            "TOKEN_ENCRYPTION_KEY": _token_key(),
+            "STORAGE_BACKEND": "sqlite",
+            "SQLITE_PATH": self.db_path,
+            "GOOGLE_API_BASE_URL": upstream,
+            "GOOGLE_OAUTH_BASE_URL": upstream,
+            "CANVAS_BASE_URL": upstream,
+            "GEMINI_API_BASE_URL": upstream,
+            "GEMINI_API_KEY": "emulator",
+        }
+        self.emulator_args = emulator_args
+        self.procs: list[subprocess.Popen] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def __enter__(self) -> LocalStack:
+        emulator = subprocess.Popen(
+            [sys.executable, "-m", "emulator", "--port", str(self.emulator_port), *self.emulator_args],
+            cwd=SERVER_ROOT, env=self.env,
+        )
+        self.procs.append(emulator)
+        _wait_ready(f"http://127.0.0.1:{self.emulator_port}/_emulator/config", emulator)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.server_port), "--log-level", "warning"],
+            cwd=SERVER_ROOT, env=self.env,
+        )
+        self.procs.append(server)
+        _wait_ready(f"{self.url}/health", server)
+        return self
+
+    def seed_google_tokens(self, user_ids: list[str]) -> None:
+        """Connect every synthetic user to Google; the emulator keys data off the token."""
+        from app.services.database import Database
+        from app.services.token_store import SQLiteTokenStore, UserTokens
+
+        db = Database(self.db_path)
+        tokens = SQLiteTokenStore(db)
+        for user_id in user_ids:
+            tokens.save(user_id, UserTokens(google_access_token=f"emu-{user_id}", email=user_id))
+        db.close()
+
+    def __exit__(self, *exc) -> None:
+        for proc in reversed(self.procs):
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+async def _run(url: str, user_ids: list[str], mix: dict[str, int], args: argparse.Namespace) -> dict[str, Any]:
+    tokens = [create_token(u) for u in user_ids]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        if not args.skip_setup:
+            await setup_users(client, tokens, args.concurrency, args.seed)
+        return await drive(
+            client, tokens, mix, concurrency=args.concurrency,
+            duration_seconds=args.duration, requests=args.requests, seed=args.seed,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", help="base URL of a running server; default starts a local stack")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load after setup")
+    parser.add_argument("--requests", type=int, help="stop after this many requests instead")
+    parser.add_argument("--mix", default="app_open", help=f"{', '.join(MIXES)} or route=weight,...")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--skip-setup", action="store_true", help="don't create goals first")
+    parser.add_argument("--upstream-latency-ms", type=float, default=40.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="a previous JSON report to diff against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    user_ids = [f"load-{args.seed}-{i}@example.test" for i in range(args.users)]
+    started_at = datetime.now(timezone.utc).isoformat()
+    if args.target:
+        report = asyncio.run(_run(args.target, user_ids, mix, args))
+    else:
+        emulator_args = [
+            "--latency-ms", str(args.upstream_latency_ms),
+            "--jitter-ms", str(args.upstream_latency_ms / 2),
+            "--error-rate", str(args.upstream_error_rate),
+        ]
+        with tempfile.TemporaryDirectory() as tmp, LocalStack(emulator_args, tmp) as stack:
+            stack.seed_google_tokens(user_ids)
+            report = asyncio.run(_run(stack.url, user_ids, mix, args))
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "target": args.target or "local",
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "seed": args.seed,
+            "upstream_latency_ms": None if args.target else args.upstream_latency_ms,
+        },
+        **report,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(["", f"vs. {args.compare}:", *compare(report, json.load(f))]))
+
+
+if __name__ == "__main__":
+    main()
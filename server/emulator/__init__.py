@@ -0,0 +1,13 @@
+"""
+Local stand-in for the upstream APIs ChronoForge calls (Google OAuth,
+Calendar, Gmail, Canvas, Gemini), for load tests and offline benchmarks.
+
+    cd server && python -m emulator --port 9100 --events-per-day 6 --latency-ms 40
+
+then point the server at it:
+
+    GOOGLE_API_BASE_URL=http://127.0.0.1:9100
+    GOOGLE_OAUTH_BASE_URL=http://127.0.0.1:9100
+    CANVAS_BASE_URL=http://127.0.0.1:9100
+    GEMINI_API_BASE_URL=http://127.0.0.1:9100
+"""
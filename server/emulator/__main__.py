@@ -0,0 +1,45 @@
+"""python -m emulator [--port 9100] [--latency-ms 40] ..."""
+
+import argparse
+
+import uvicorn
+
+from emulator.app import EmulatorConfig, create_app
+from emulator.data import Scale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ChronoForge upstream emulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--events-per-day", type=int, default=4)
+    parser.add_argument("--calendars", type=int, default=2)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--assignments", type=int, default=12)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per minute per token; 0 = off")
+    args = parser.parse_args()
+
+    config = EmulatorConfig(
+        scale=Scale(
+            seed=args.seed,
+            events_per_day=args.events_per_day,
+            calendars_per_user=args.calendars,
+            messages_per_user=args.messages,
+            courses_per_user=args.courses,
+            assignments_per_course=args.assignments,
+        ),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_per_minute=args.rate_limit,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
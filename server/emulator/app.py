@@ -0,0 +1,238 @@
+"""
+FastAPI app implementing the upstream endpoints ChronoForge calls.
+
+Any bearer token is accepted and names the synthetic user, so a load test
+can mint one token per virtual user. Faults are injected by middleware in
+front of every upstream route: fixed latency plus jitter, a random 503 rate
+and a per-token requests-per-minute limit answered with 429 + Retry-After.
+The knobs can be changed at runtime with PUT /_emulator/config.
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, datetime, timezone
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+from emulator.data import Dataset, Scale
+
+
+@dataclass
+class EmulatorConfig:
+    scale: Scale = field(default_factory=Scale)
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # fraction of upstream requests answered with 503
+    rate_limit_per_minute: int = 0  # per bearer token; 0 = unlimited
+
+
+_FAULT_KNOBS = ("latency_ms", "jitter_ms", "error_rate", "rate_limit_per_minute")
+FREEBUSY_EXPANSION_MAX = 50  # Google's calendarExpansionMax ceiling
+
+
+def _parse_time(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _caller(request: Request) -> str:
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        return auth[7:]
+    return request.query_params.get("key") or request.headers.get("x-goog-api-key", "")
+
+
+def _user(request: Request) -> str:
+    token = _caller(request)
+    if not token:
+        raise HTTPException(401, "Missing bearer token")
+    return token
+
+
+def _json(request: Request, payload) -> Response:
+    """JSON with a content ETag; a matching If-None-Match gets 304."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+def _gemini_text(prompt: str, rng: random.Random) -> str:
+    if "motivational_message" in prompt:
+        data = {
+            "assessment": rng.choice(["Matches the plan.", "Partly on plan.", "Drifted from the plan."]),
+            "motivational_message": "One more block like this and the week is yours.",
+        }
+    else:
+        data = {
+            "summary": "A full week with the heaviest load midweek.",
+            "time_breakdown": "Most hours go to coursework, the rest to goals.",
+            "where_to_add_more": "Weekend mornings are mostly free.",
+        }
+    return json.dumps(data)
+
+
+def create_app(config: EmulatorConfig | None = None) -> FastAPI:
+    config = config or EmulatorConfig()
+    app = FastAPI(title="ChronoForge upstream emulator")
+    app.state.config = config
+    rng = random.Random(config.scale.seed)
+    windows: dict[str, deque[float]] = {}
+
+    def dataset() -> Dataset:
+        return Dataset(app.state.config.scale)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/_emulator"):
+            return await call_next(request)
+        cfg: EmulatorConfig = app.state.config
+        if cfg.rate_limit_per_minute:
+            now = time.monotonic()
+            window = windows.setdefault(_caller(request), deque())
+            while window and window[0] <= now - 60:
+                window.popleft()
+            if len(window) >= cfg.rate_limit_per_minute:
+                retry_after = max(1, int(window[0] + 60 - now) + 1)
+                return JSONResponse(
+                    {"error": {"code": 429, "message": "Rate limit exceeded"}},
+                    status_code=429, headers={"Retry-After": str(retry_after)},
+                )
+            window.append(now)
+        delay = cfg.latency_ms + (rng.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if cfg.error_rate and rng.random() < cfg.error_rate:
+            return JSONResponse({"error": {"code": 503, "message": "Injected failure"}}, status_code=503)
+        return await call_next(request)
+
+    @app.get("/_emulator/config")
+    async def get_config():
+        return asdict(app.state.config)
+
+    @app.put("/_emulator/config")
+    async def update_config(changes: dict):
+        cfg: EmulatorConfig = app.state.config
+        known = {f.name for f in fields(Scale)}
+        for key, value in changes.items():
+            if key in _FAULT_KNOBS:
+                setattr(cfg, key, type(getattr(cfg, key))(value))
+            elif key in known:
+                setattr(cfg.scale, key, int(value))
+            else:
+                raise HTTPException(400, f"Unknown setting: {key}")
+        windows.clear()
+        return asdict(cfg)
+
+    # Google OAuth
+    @app.post("/token")
+    async def google_token(request: Request):
+        form = await request.form()
+        seed = form.get("code") or form.get("refresh_token") or "anonymous"
+        return {
+            "access_token": f"emu-access-{seed}",
+            "refresh_token": f"emu-refresh-{seed}",
+            "expires_in": 3600,
+            "token_type": "Bearer",
+        }
+
+    @app.get("/oauth2/v2/userinfo")
+    async def userinfo(request: Request):
+        user = _user(request)
+        return {"id": hashlib.sha256(user.encode()).hexdigest()[:21], "email": f"{user}@example.test"}
+
+    # Calendar
+    @app.get("/calendar/v3/users/me/calendarList")
+    async def calendar_list(request: Request, maxResults: int = 100, pageToken: str = "0"):
+        items = dataset().calendars(_user(request))
+        start = int(pageToken)
+        page: dict = {"items": items[start:start + maxResults]}
+        if start + maxResults < len(items):
+            page["nextPageToken"] = str(start + maxResults)
+        return _json(request, page)
+
+    @app.get("/calendar/v3/calendars/{calendar_id}/events")
+    async def calendar_events(request: Request, calendar_id: str, timeMin: str, timeMax: str):
+        items = dataset().events(_user(request), calendar_id, _parse_time(timeMin), _parse_time(timeMax))
+        return _json(request, {"kind": "calendar#events", "items": items})
+
+    @app.post("/calendar/v3/freeBusy")
+    async def free_busy(request: Request):
+        user = _user(request)
+        body = await request.json()
+        time_min, time_max = _parse_time(body["timeMin"]), _parse_time(body["timeMax"])
+        known = {c["id"] for c in dataset().calendars(user)}
+        calendars = {}
+        # Like Google, problems are reported per calendar in a 200 response.
+        for i, item in enumerate(body.get("items", [])):
+            if i >= FREEBUSY_EXPANSION_MAX:
+                calendars[item["id"]] = {"busy": [], "errors": [{"domain": "calendar", "reason": "tooManyCalendarsRequested"}]}
+            elif item["id"] not in known:
+                calendars[item["id"]] = {"busy": [], "errors": [{"domain": "global", "reason": "notFound"}]}
+            else:
+                calendars[item["id"]] = {"busy": dataset().busy(user, item["id"], time_min, time_max)}
+        return {"kind": "calendar#freeBusy", "calendars": calendars}
+
+    # Gmail
+    @app.get("/gmail/v1/users/me/messages")
+    async def gmail_list(request: Request, maxResults: int = 100):
+        ids = dataset().message_ids(_user(request))[:maxResults]
+        return _json(request, {"messages": [{"id": i, "threadId": i} for i in ids], "resultSizeEstimate": len(ids)})
+
+    @app.get("/gmail/v1/users/me/messages/{message_id}")
+    async def gmail_message(request: Request, message_id: str):
+        msg = dataset().message(_user(request), message_id, date.today())
+        if msg is None:
+            raise HTTPException(404, "Requested entity was not found.")
+        return _json(request, msg)
+
+    # Canvas
+    @app.post("/login/oauth2/token")
+    async def canvas_token(request: Request):
+        form = await request.form()
+        code = form.get("code") or "anonymous"
+        return {"access_token": f"emu-canvas-{code}", "refresh_token": f"emu-canvas-refresh-{code}", "expires_in": 3600}
+
+    @app.get("/api/v1/courses")
+    async def canvas_courses(request: Request):
+        return _json(request, dataset().courses(_user(request)))
+
+    @app.get("/api/v1/courses/{course_id}/assignments")
+    async def canvas_assignments(request: Request, course_id: int):
+        items = dataset().assignments(_user(request), course_id, date.today())
+        if items is None:
+            raise HTTPException(404, "The specified resource does not exist.")
+        return _json(request, items)
+
+    # Gemini (REST transport)
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(request: Request, model: str):
+        _user(request)
+        body = await request.json()
+        prompt = " ".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        text = _gemini_text(prompt, random.Random(hashlib.sha256(prompt.encode()).digest()))
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+            "modelVersion": model,
+        }
+
+    return app
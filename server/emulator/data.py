@@ -0,0 +1,121 @@
+"""Seeded synthetic upstream data, generated on demand per user and day."""
+
+from __future__ import annotations
+import hashlib
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+EVENT_TITLES = [
+    "Lecture", "Lab section", "Office hours", "Team sync", "Shift at work",
+    "Gym", "Study group", "Dentist", "Club meeting", "Dinner with family",
+]
+SUBJECTS = [
+    "Interview invitation: software intern", "Reminder: assignment deadline Friday",
+    "Your application was received", "Hackathon this weekend - RSVP",
+    "Weekly newsletter", "Offer letter attached", "Invite: project kickoff",
+    "Submission confirmation", "Campus events digest", "Internship fair next week",
+]
+COURSES = ["Algorithms", "Linear Algebra", "Operating Systems", "Technical Writing", "Databases", "Statistics"]
+
+
+@dataclass
+class Scale:
+    seed: int = 7
+    events_per_day: int = 4
+    calendars_per_user: int = 2
+    messages_per_user: int = 50
+    courses_per_user: int = 4
+    assignments_per_course: int = 12
+
+
+def _rng(*parts: object) -> random.Random:
+    digest = hashlib.sha256("|".join(map(str, parts)).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+class Dataset:
+    """Every answer is a pure function of (seed, user, day), so runs are repeatable."""
+
+    def __init__(self, scale: Scale) -> None:
+        self.scale = scale
+
+    def _day_events(self, user: str, calendar: str, day: date) -> list[dict]:
+        rng = _rng(self.scale.seed, user, calendar, day.isoformat())
+        n = rng.randint(0, 2 * self.scale.events_per_day // max(1, self.scale.calendars_per_user))
+        events = []
+        for i in range(n):
+            start = datetime(day.year, day.month, day.day, rng.randint(8, 20), rng.choice((0, 30)), tzinfo=timezone.utc)
+            end = start + timedelta(minutes=rng.choice((30, 60, 90, 120)))
+            events.append({
+                "id": f"{calendar}-{day.isoformat()}-{i}",
+                "summary": rng.choice(EVENT_TITLES),
+                "start": {"dateTime": _iso(start)},
+                "end": {"dateTime": _iso(end)},
+                "status": "confirmed",
+            })
+        return events
+
+    def calendars(self, user: str) -> list[dict]:
+        return [
+            {"id": "primary" if i == 0 else f"cal-{i}@group.calendar.test", "accessRole": "owner" if i == 0 else "reader"}
+            for i in range(max(1, self.scale.calendars_per_user))
+        ]
+
+    def events(self, user: str, calendar: str, time_min: datetime, time_max: datetime) -> list[dict]:
+        out: list[dict] = []
+        day = time_min.date()
+        while day <= time_max.date():
+            for e in self._day_events(user, calendar, day):
+                start = datetime.fromisoformat(e["start"]["dateTime"])
+                end = datetime.fromisoformat(e["end"]["dateTime"])
+                if end > time_min and start < time_max:
+                    out.append(e)
+            day += timedelta(days=1)
+        return sorted(out, key=lambda e: e["start"]["dateTime"])
+
+    def busy(self, user: str, calendar: str, time_min: datetime, time_max: datetime) -> list[dict]:
+        return [{"start": e["start"]["dateTime"], "end": e["end"]["dateTime"]} for e in self.events(user, calendar, time_min, time_max)]
+
+    def message_ids(self, user: str) -> list[str]:
+        return [f"m{i:05d}" for i in range(self.scale.messages_per_user)]
+
+    def message(self, user: str, message_id: str, today: date) -> dict | None:
+        if message_id not in self.message_ids(user):
+            return None
+        rng = _rng(self.scale.seed, user, message_id)
+        sent = datetime.combine(today, datetime.min.time(), timezone.utc) - timedelta(hours=rng.randint(1, 24 * 14))
+        subject = rng.choice(SUBJECTS)
+        return {
+            "id": message_id,
+            "threadId": message_id,
+            "snippet": f"{subject}. Please see details below.",
+            "payload": {"headers": [
+                {"name": "Subject", "value": subject},
+                {"name": "From", "value": "Notifications <noreply@example.test>"},
+                {"name": "Date", "value": sent.strftime("%a, %d %b %Y %H:%M:%S +0000")},
+            ]},
+        }
+
+    def courses(self, user: str) -> list[dict]:
+        return [{"id": 1000 + i, "name": COURSES[i % len(COURSES)]} for i in range(self.scale.courses_per_user)]
+
+    def assignments(self, user: str, course_id: int, today: date) -> list[dict] | None:
+        if course_id not in {c["id"] for c in self.courses(user)}:
+            return None
+        rng = _rng(self.scale.seed, user, course_id)
+        out = []
+        for i in range(self.scale.assignments_per_course):
+            due = datetime.combine(today, datetime.min.time(), timezone.utc) + timedelta(days=rng.randint(-7, 30), hours=23, minutes=59)
+            out.append({
+                "id": course_id * 100 + i,
+                "name": f"Assignment {i + 1}",
+                "due_at": _iso(due),
+                "points_possible": float(rng.choice((10, 20, 50, 100))),
+                "html_url": f"https://canvas.example.test/courses/{course_id}/assignments/{course_id * 100 + i}",
+            })
+        return sorted(out, key=lambda a: a["due_at"])
@@ -0,0 +1,138 @@
+"""Tests for per-user token buckets, fair queuing and the 429 path."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import admission
+from app.services.admission import AdmissionClass, Budget, FairQueue, Rejected, TokenBuckets
+from app.services.jwt_service import create_token
+
+
+class TestTokenBuckets:
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(rate_per_minute=60, burst=2)
+        assert buckets.take("u", now=0.0) == 0
+        assert buckets.take("u", now=0.0) == 0
+        assert buckets.take("u", now=0.0) == pytest.approx(1.0)
+        assert buckets.take("u", now=1.0) == 0
+
+    def test_users_are_independent(self):
+        buckets = TokenBuckets(rate_per_minute=1, burst=1)
+        assert buckets.take("a", now=0.0) == 0
+        assert buckets.take("a", now=0.0) > 0
+        assert buckets.take("b", now=0.0) == 0
+
+
+class TestFairQueue:
+    def test_round_robin_across_users(self):
+        async def run():
+            q = FairQueue(concurrency=1, max_queued_per_user=3)
+            await q.acquire("a", 1)  # a holds the only slot
+            order = []
+
+            async def waiter(user, tag):
+                await q.acquire(user, 1)
+                order.append(tag)
+                q.release()
+
+            tasks = [asyncio.create_task(waiter("a", "a2")), asyncio.create_task(waiter("a", "a3"))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(waiter("b", "b1")))
+            await asyncio.sleep(0)
+            q.release()
+            await asyncio.gather(*tasks)
+            return order, q
+
+        order, q = asyncio.run(run())
+        assert order == ["a2", "b1", "a3"]
+        assert q.in_use == 0 and q.queued == 0
+
+    def test_queue_depth_and_wait_are_capped(self):
+        async def run():
+            q = FairQueue(concurrency=1, max_queued_per_user=1)
+            await q.acquire("a", 1)
+            pending = asyncio.create_task(q.acquire("a", 0.05))
+            await asyncio.sleep(0)
+            with pytest.raises(Rejected, match="too many queued"):
+                await q.acquire("a", 1)
+            with pytest.raises(Rejected, match="wait exceeded"):
+                await pending
+            return q
+
+        q = asyncio.run(run())
+        assert q.queued == 0 and q.in_use == 1
+
+    def test_cancelled_waiter_leaves_queue(self):
+        async def run():
+            q = FairQueue(concurrency=1, max_queued_per_user=2)
+            await q.acquire("a", 1)
+            task = asyncio.create_task(q.acquire("b", 1))
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            q.release()
+            return q
+
+        q = asyncio.run(run())
+        assert q.queued == 0 and q.in_use == 0
+
+
+class TestUnderAbuse:
+    def test_well_behaved_user_keeps_low_latency(self):
+        """One user floods a 2-slot class; another user's requests still get the next slot."""
+        gate = AdmissionClass("cpu", Budget(
+            rate_per_minute=6000, burst=100, concurrency=2, max_queued_per_user=4, max_wait_seconds=5,
+        ))
+
+        async def request(user):
+            started = time.perf_counter()
+            try:
+                await gate.enter(user)
+            except Rejected:
+                return user, None
+            try:
+                await asyncio.sleep(0.02)
+            finally:
+                gate.exit()
+            return user, time.perf_counter() - started
+
+        async def run():
+            flood = [asyncio.create_task(request("abuser")) for _ in range(40)]
+            await asyncio.sleep(0)
+            polite = []
+            for _ in range(5):
+                polite.append(await request("polite"))
+            await asyncio.gather(*flood)
+            return [await f for f in flood], polite
+
+        flood, polite = asyncio.run(run())
+        assert sum(1 for _, t in flood if t is None) >= 30  # queue cap sheds most of the flood
+        assert all(t is not None and t < 0.1 for _, t in polite)
+
+
+class TestRoutes:
+    def test_429_with_retry_after_per_user(self, monkeypatch):
+        gate = admission.classes["cpu"]
+        monkeypatch.setattr(gate, "buckets", TokenBuckets(rate_per_minute=1, burst=2))
+        client = TestClient(app)
+        alice = {"Authorization": f"Bearer {create_token('admission-alice@example.test')}"}
+        bob = {"Authorization": f"Bearer {create_token('admission-bob@example.test')}"}
+
+        statuses = [client.post("/plan/generate", headers=alice).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        limited = client.post("/plan/generate", headers=alice)
+        assert int(limited.headers["Retry-After"]) >= 1
+        assert client.post("/plan/generate", headers=bob).status_code == 200
+        assert gate.queue.in_use == 0
+
+    def test_disabled(self, monkeypatch):
+        gate = admission.classes["cpu"]
+        monkeypatch.setattr(gate, "buckets", TokenBuckets(rate_per_minute=1, burst=1))
+        monkeypatch.setattr(admission.get_settings(), "admission_enabled", False)
+        client = TestClient(app)
+        carol = {"Authorization": f"Bearer {create_token('admission-carol@example.test')}"}
+        assert all(client.post("/plan/generate", headers=carol).status_code == 200 for _ in range(3))
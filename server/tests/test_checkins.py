@@ -0,0 +1,230 @@
+"""Tests for the background check-in assessment pipeline."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import get_settings
+from app.models.schemas import CheckInCreate, CheckInStatus, JobStatus
+from app.services import checkin_pipeline
+from app.services.checkin_store import CheckInStore, InvalidCursor
+from app.services.job_queue import JobQueue, PermanentJobError
+
+
+def _create() -> CheckInCreate:
+    return CheckInCreate(
+        block_id="b1", planned_goal_id="g1", planned_goal_name="Study",
+        start=datetime(2026, 3, 1, 9, tzinfo=timezone.utc),
+        end=datetime(2026, 3, 1, 10, tzinfo=timezone.utc),
+        what_i_did="Problem set",
+    )
+
+
+class TestJobQueue:
+    def test_retries_then_succeeds(self):
+        queue = JobQueue("test", concurrency=1, max_attempts=3, retry_backoff_seconds=0)
+        attempts: list[int] = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("transient")
+            return "ok"
+
+        async def run():
+            job = queue.submit("u1", flaky)
+            await queue.drain()
+            await queue.stop()
+            return job
+
+        job = asyncio.run(run())
+        assert job.status == "done"
+        assert job.result == "ok"
+        assert job.attempts == 3
+
+    def test_permanent_error_is_not_retried(self):
+        queue = JobQueue("test", concurrency=1, max_attempts=5, retry_backoff_seconds=0)
+        failed: list[str] = []
+
+        async def broken():
+            raise PermanentJobError("nope")
+
+        async def on_failure(job):
+            failed.append(job.id)
+
+        async def run():
+            job = queue.submit("u1", broken, on_failure=on_failure)
+            await queue.drain()
+            await queue.stop()
+            return job
+
+        job = asyncio.run(run())
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert failed == [job.id]
+
+    def test_cancelled_job_is_not_treated_as_a_failure(self):
+        queue = JobQueue("test", concurrency=1)
+        failed: list[str] = []
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(60)
+
+        async def on_failure(job):
+            failed.append(job.id)
+
+        async def run():
+            job = queue.submit("u1", slow, on_failure=on_failure)
+            await started.wait()
+            await queue.stop()
+            return job
+
+        job = asyncio.run(run())
+        assert (job.status, job.error) == (JobStatus.failed, "cancelled")
+        assert failed == []  # left for a restart to resume
+
+    def test_concurrency_is_capped(self):
+        queue = JobQueue("test", concurrency=2, retry_backoff_seconds=0)
+        running = {"now": 0, "peak": 0}
+
+        async def work():
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+        async def run():
+            for _ in range(6):
+                queue.submit("u1", work)
+            await queue.drain()
+            await queue.stop()
+
+        asyncio.run(run())
+        assert running["peak"] == 2
+
+
+class TestAssessmentPipeline:
+    @pytest.fixture
+    def store(self, monkeypatch):
+        s = CheckInStore()
+        monkeypatch.setattr(checkin_pipeline, "checkin_store", s)
+        monkeypatch.setattr(checkin_pipeline.checkin_jobs, "retry_backoff_seconds", 0)
+        return s
+
+    def _submit(self, store: CheckInStore):
+        async def run():
+            check_in = store.add("u1", _create(), status="pending")
+            job = checkin_pipeline.submit_assessment("u1", check_in, [])
+            await checkin_pipeline.checkin_jobs.drain()
+            await checkin_pipeline.checkin_jobs.stop()
+            return store.get("u1", check_in.id), job
+        return asyncio.run(run())
+
+    def test_assessment_fills_in_checkin(self, store, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_api_key", "test-key")
+
+        async def fake(**kwargs):
+            return "Aligned.", "Keep going."
+
+        monkeypatch.setattr(checkin_pipeline, "process_checkin", fake)
+        check_in, job = self._submit(store)
+        assert job.status == "done"
+        assert check_in.status == "assessed"
+        assert check_in.assessment == "Aligned."
+
+    def test_unconfigured_gemini_marks_failed(self, store, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_api_key", "")
+        check_in, job = self._submit(store)
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert check_in.status == "failed"
+        assert check_in.what_i_did == "Problem set"
+
+    def test_pending_check_ins_are_resubmitted_at_startup(self, store, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_api_key", "test-key")
+        seen: list[list[str]] = []
+
+        async def fake(**kwargs):
+            seen.append(kwargs["recent_summaries"])
+            return "Aligned.", "Keep going."
+
+        monkeypatch.setattr(checkin_pipeline, "process_checkin", fake)
+        done = store.add("u1", _create().model_copy(update={"block_id": "b0", "what_i_did": "Reading"}))
+        left = store.add("u1", _create(), status=CheckInStatus.pending)
+
+        async def run():
+            resumed = await checkin_pipeline.resume_pending()
+            await checkin_pipeline.checkin_jobs.drain()
+            await checkin_pipeline.checkin_jobs.stop()
+            return resumed
+
+        assert asyncio.run(run()) == 1
+        assert store.get("u1", left.id).status == CheckInStatus.assessed
+        assert seen == [["Study: Reading"]]
+        assert store.get("u1", done.id).status == CheckInStatus.assessed
+
+    def test_assessment_interrupted_by_shutdown_stays_pending(self, store, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_api_key", "test-key")
+        started = asyncio.Event()
+
+        async def slow(**kwargs):
+            started.set()
+            await asyncio.sleep(60)
+
+        monkeypatch.setattr(checkin_pipeline, "process_checkin", slow)
+        check_in = store.add("u1", _create(), status=CheckInStatus.pending)
+
+        async def run():
+            checkin_pipeline.submit_assessment("u1", check_in, [])
+            await started.wait()
+            await checkin_pipeline.checkin_jobs.stop()
+
+        asyncio.run(run())
+        assert store.get("u1", check_in.id).status == CheckInStatus.pending
+        assert store.pending() == [("u1", store.get("u1", check_in.id))]
+
+
+class TestCheckInStore:
+    def test_recent_first_with_indexes(self):
+        s = CheckInStore()
+        first = s.add("u1", _create())
+        second = s.add("u1", _create().model_copy(update={"block_id": "b2"}))
+        assert s.list_recent("u1") == [second, first]
+        assert s.get("u1", first.id) is first
+        assert s.get_by_block("u1", "b1") is first
+        assert s.get_by_block("u2", "b1") is None
+
+    def test_retention_drops_oldest_and_its_indexes(self):
+        s = CheckInStore(retention=2)
+        oldest = s.add("u1", _create())
+        kept = [s.add("u1", _create().model_copy(update={"block_id": f"b{i}"})) for i in (2, 3)]
+        assert s.list_recent("u1") == kept[::-1]
+        assert s.get("u1", oldest.id) is None
+        assert s.get_by_block("u1", "b1") is None
+
+    def test_cursor_pages_cover_history_once(self):
+        s = CheckInStore(retention=100)
+        added = [s.add("u1", _create()) for _ in range(7)]
+        seen, cursor = [], None
+        while True:
+            page, cursor = s.list_page("u1", limit=3, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert seen == added[::-1]
+
+    def test_cursor_survives_eviction(self):
+        s = CheckInStore(retention=4)
+        added = [s.add("u1", _create()) for _ in range(4)]
+        page, cursor = s.list_page("u1", limit=2)
+        s.add("u1", _create())  # evicts added[0]
+        page, cursor = s.list_page("u1", limit=2, cursor=cursor)
+        assert page == [added[1]]
+        assert cursor is None
+
+    def test_invalid_cursor(self):
+        with pytest.raises(InvalidCursor):
+            CheckInStore().list_page("u1", cursor="abc")
@@ -0,0 +1,59 @@
+"""Tests for token encryption, key rotation and bulk re-encryption."""
+
+import asyncio
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.config import get_settings
+from app.services import crypto
+from app.services.token_store import TokenStore, reencrypt_all
+
+OLD, NEW = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    def use(value: str) -> None:
+        monkeypatch.setattr(get_settings(), "token_encryption_key", value)
+    return use
+
+
+class TestCipher:
+    def test_round_trip_without_configured_key(self, keys):
+        keys("")
+        assert crypto.decrypt_token(crypto.encrypt_token("refresh")) == "refresh"
+
+    def test_cipher_is_built_once(self, keys):
+        keys(NEW)
+        assert crypto._get_fernet() is crypto._get_fernet()
+
+    def test_old_key_still_decrypts_after_rotation(self, keys):
+        keys(OLD)
+        token = crypto.encrypt_token("refresh")
+        keys(f"{NEW}, {OLD}")
+        assert crypto.decrypt_token(token) == "refresh"
+        keys(NEW)
+        with pytest.raises(InvalidToken):
+            crypto.decrypt_token(token)
+
+
+class TestReencryptAll:
+    def test_rotates_every_readable_token(self, keys):
+        store = TokenStore()
+        keys(OLD)
+        for i in range(5):
+            store.get_or_create(f"u{i}").set_google_refresh(f"refresh-{i}")
+        store.get_or_create("no-google")
+        store.get_or_create("foreign").google_refresh_token_enc = (
+            Fernet(Fernet.generate_key()).encrypt(b"x").decode()
+        )
+
+        keys(f"{NEW},{OLD}")
+        report = asyncio.run(reencrypt_all(store, batch_size=2))
+        assert (report.users, report.rotated, report.failed) == (7, 5, 1)
+
+        keys(NEW)
+        assert [store.get(f"u{i}").get_google_refresh() for i in range(5)] == [
+            f"refresh-{i}" for i in range(5)
+        ]
@@ -0,0 +1,121 @@
+"""Tests for the aggregated GET /dashboard endpoint (upstreams faked)."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import BusyInterval, CalendarEvent, CanvasTask, PlanResponse
+from app.routers import dashboard
+from app.services import planning
+from app.services.jwt_service import create_token
+from app.services.shared_state import InProcessState, SharedMap
+from app.services.token_store import TokenStore, UserTokens
+
+USER = "dash@example.com"
+HEADERS = {"Authorization": f"Bearer {create_token(USER)}"}
+
+
+def _event(hour: int) -> CalendarEvent:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1, hours=hour)
+    return CalendarEvent(id=f"e{hour}", title="Lecture", start=start, end=start + timedelta(hours=1))
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    tokens = TokenStore()
+    calls = {"calendar": 0, "busy": 0}
+
+    async def calendar(user_id, access_token, time_min=None, time_max=None):
+        calls["calendar"] += 1
+        await asyncio.sleep(0.1)
+        return [_event(2), _event(5)]
+
+    async def signals(user_id, access_token):
+        await asyncio.sleep(0.1)
+        raise RuntimeError("gmail down")
+
+    async def tasks(user_id, access_token):
+        await asyncio.sleep(0.1)
+        return [CanvasTask(id="t1", course_name="Algorithms", assignment_name="PS1")]
+
+    async def busy(user_id):
+        calls["busy"] += 1
+        await asyncio.sleep(0.1)
+        return [BusyInterval(start=_event(9).start, end=_event(9).end)]  # e.g. on a secondary calendar
+
+    monkeypatch.setattr(dashboard, "store", tokens)
+    monkeypatch.setattr(dashboard, "get_calendar_events", calendar)
+    monkeypatch.setattr(dashboard, "fetch_gmail_signals", signals)
+    monkeypatch.setattr(dashboard, "get_canvas_tasks", tasks)
+    monkeypatch.setattr("app.services.planning.busy_intervals_for", busy)
+    monkeypatch.setattr("app.services.planning.plan_cache", SharedMap(InProcessState(), "plan", PlanResponse))
+    return tokens, calls
+
+
+class TestDashboard:
+    def test_not_connected_sections_report_401(self, upstream):
+        resp = TestClient(app).get("/dashboard", headers=HEADERS)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["goals"] and body["plan"] is not None
+        assert {e["section"]: e["status"] for e in body["errors"]} == {"events": 401, "signals": 401, "tasks": 401}
+
+    def test_concurrent_fan_out_with_partial_failure(self, upstream):
+        tokens, calls = upstream
+        tokens.save(USER, UserTokens(google_access_token="g", canvas_access_token="c"))
+
+        started = time.perf_counter()
+        body = TestClient(app).get("/dashboard", headers=HEADERS).json()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.25  # three 100 ms upstreams in parallel, not in sequence
+        assert len(body["events"]) == 2 and body["tasks"][0]["id"] == "t1"
+        assert body["signals"] is None
+        assert body["errors"] == [{"section": "signals", "status": 502, "detail": "Failed to fetch Gmail signals"}]
+
+    def test_plan_uses_freebusy_across_calendars(self, upstream):
+        tokens, calls = upstream
+        tokens.save(USER, UserTokens(google_access_token="g"))
+
+        started = time.perf_counter()
+        body = TestClient(app).get("/dashboard", headers=HEADERS).json()
+        elapsed = time.perf_counter() - started
+
+        assert calls == {"calendar": 1, "busy": 1}
+        assert elapsed < 0.18  # FreeBusy runs alongside the event list
+        busy = {b["start"] for b in body["plan"]["blocks"] if b["goal_id"] == "busy"}
+        assert _event(9).start.isoformat().replace("+00:00", "Z") in busy
+        assert not busy & {e["start"] for e in body["events"]}  # events alone are not the busy source
+
+    def test_failed_event_list_leaves_the_plan_alone(self, upstream, monkeypatch):
+        tokens, calls = upstream
+        tokens.save(USER, UserTokens(google_access_token="g"))
+
+        async def calendar_down(*args, **kwargs):
+            raise RuntimeError("calendar down")
+
+        monkeypatch.setattr(dashboard, "get_calendar_events", calendar_down)
+        body = TestClient(app).get("/dashboard", headers=HEADERS).json()
+
+        assert calls["busy"] == 1
+        assert body["plan"] is not None
+        assert [e["section"] for e in body["errors"] if e["section"] in ("events", "plan")] == ["events"]
+
+    def test_freebusy_down_fails_the_plan_and_caches_nothing(self, upstream, monkeypatch):
+        tokens, _ = upstream
+        tokens.save(USER, UserTokens(google_access_token="g"))
+
+        async def freebusy_down(user_id):
+            raise HTTPException(503, "Calendar unavailable; try again shortly")
+
+        monkeypatch.setattr(planning, "busy_intervals_for", freebusy_down)
+        body = TestClient(app).get("/dashboard", headers=HEADERS).json()
+
+        assert body["plan"] is None
+        assert {"section": "plan", "status": 503, "detail": "Calendar unavailable; try again shortly"} in body["errors"]
+        assert asyncio.run(planning.plan_cache.aio.get(USER)) is None
@@ -0,0 +1,159 @@
+"""Tests for the local upstream emulator and the configurable base URLs."""
+
+import asyncio
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.services import google_service
+from app.services.http_cache import http_cache
+from emulator.app import EmulatorConfig, create_app
+from emulator.data import Dataset, Scale
+
+AUTH = {"Authorization": "Bearer alice"}
+WINDOW = {"timeMin": "2026-03-02T00:00:00Z", "timeMax": "2026-03-09T00:00:00Z"}
+
+
+def _client(**knobs) -> TestClient:
+    return TestClient(create_app(EmulatorConfig(scale=Scale(seed=3, events_per_day=6), **knobs)))
+
+
+class TestData:
+    def test_seeded_and_per_user(self):
+        a = _client().get("/calendar/v3/calendars/primary/events", params=WINDOW, headers=AUTH).json()
+        b = _client().get("/calendar/v3/calendars/primary/events", params=WINDOW, headers=AUTH).json()
+        other = _client().get(
+            "/calendar/v3/calendars/primary/events", params=WINDOW, headers={"Authorization": "Bearer bob"},
+        ).json()
+        assert a == b
+        assert a["items"] and a != other
+
+    def test_events_stay_inside_window(self):
+        items = _client().get("/calendar/v3/calendars/primary/events", params=WINDOW, headers=AUTH).json()["items"]
+        assert all("2026-03-02" <= e["start"]["dateTime"] < "2026-03-09" for e in items)
+
+    def test_scale_knobs(self):
+        client = TestClient(create_app(EmulatorConfig(scale=Scale(messages_per_user=7, courses_per_user=3))))
+        assert len(client.get("/gmail/v1/users/me/messages", headers=AUTH).json()["messages"]) == 7
+        assert len(client.get("/api/v1/courses", headers=AUTH).json()) == 3
+
+    def test_etag_revalidation(self):
+        client = _client()
+        first = client.get("/api/v1/courses", headers=AUTH)
+        again = client.get("/api/v1/courses", headers={**AUTH, "If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
+
+    def test_gemini_returns_json_text(self):
+        resp = _client().post(
+            "/v1beta/models/gemini-1.5-flash:generateContent?key=k",
+            json={"contents": [{"parts": [{"text": "Reply with motivational_message"}]}]},
+        )
+        text = resp.json()["candidates"][0]["content"]["parts"][0]["text"]
+        assert "motivational_message" in text
+
+    def test_requires_token(self):
+        assert _client().get("/api/v1/courses").status_code == 401
+
+
+class TestFaults:
+    def test_error_rate(self):
+        client = _client(error_rate=1.0)
+        assert client.get("/api/v1/courses", headers=AUTH).status_code == 503
+
+    def test_rate_limit_is_per_token(self):
+        client = _client(rate_limit_per_minute=2)
+        statuses = [client.get("/api/v1/courses", headers=AUTH).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        assert client.get("/api/v1/courses", headers={"Authorization": "Bearer bob"}).status_code == 200
+        assert int(client.get("/api/v1/courses", headers=AUTH).headers["Retry-After"]) >= 1
+
+    def test_latency(self):
+        client = _client(latency_ms=50)
+        started = time.perf_counter()
+        client.get("/api/v1/courses", headers=AUTH)
+        assert time.perf_counter() - started >= 0.05
+
+    def test_runtime_config(self):
+        client = _client()
+        assert client.put("/_emulator/config", json={"error_rate": 1.0}).status_code == 200
+        assert client.get("/api/v1/courses", headers=AUTH).status_code == 503
+        assert client.put("/_emulator/config", json={"bogus": 1}).status_code == 400
+
+
+@pytest.fixture
+def emulator_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+class TestServicesAgainstEmulator:
+    def test_google_service_uses_base_url(self, monkeypatch, emulator_url):
+        settings = google_service.get_settings()
+        monkeypatch.setattr(settings, "google_api_base_url", emulator_url)
+        http_cache.clear()
+        start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+        async def run():
+            events = await google_service.fetch_calendar_events("alice", "alice", start, start + timedelta(days=7))
+            busy = await google_service.fetch_busy_intervals("alice", "alice", start, start + timedelta(days=7))
+            signals = await google_service.fetch_gmail_signals("alice", "alice")
+            return events, busy, signals
+
+        events, busy, signals = asyncio.run(run())
+        http_cache.clear()
+        assert events and busy and signals
+        assert all(a.end < b.start for a, b in zip(busy, busy[1:]))
+
+    def test_busy_intervals_span_more_calendars_than_one_query_allows(self, monkeypatch, emulator_url):
+        monkeypatch.setattr(google_service.get_settings(), "google_api_base_url", emulator_url)
+        httpx.put(f"{emulator_url}/_emulator/config", json={"calendars_per_user": 120, "events_per_day": 240}).raise_for_status()
+        http_cache.clear()
+        start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        end = start + timedelta(days=7)
+
+        busy = asyncio.run(google_service.fetch_busy_intervals("alice", "alice", start, end))
+        http_cache.clear()
+        data = Dataset(Scale(calendars_per_user=120, events_per_day=240))
+        calendars = [cal["id"] for cal in data.calendars("alice")]
+        late = [b for cid in calendars[google_service.FREEBUSY_MAX_CALENDARS:] for b in data.busy("alice", cid, start, end)]
+        assert late  # otherwise the test proves nothing about the second query
+        for b in (b for cid in calendars for b in data.busy("alice", cid, start, end)):
+            s, e = datetime.fromisoformat(b["start"]), datetime.fromisoformat(b["end"])
+            assert any(iv.start <= s and e <= iv.end for iv in busy), (s, e)
+
+    def test_calendar_list_pages_are_followed(self, emulator_url):
+        httpx.put(f"{emulator_url}/_emulator/config", json={"calendars_per_user": 250}).raise_for_status()
+        http_cache.clear()
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await google_service._calendar_ids(client, emulator_url, "alice", "alice")
+
+        ids = asyncio.run(run())
+        http_cache.clear()
+        assert len(ids) == len(set(ids)) == 250  # three pages of at most 100
+
+    def test_per_calendar_errors_fail_the_query(self, monkeypatch, emulator_url):
+        monkeypatch.setattr(google_service.get_settings(), "google_api_base_url", emulator_url)
+
+        async def calendar_ids(*args):
+            return ["primary", "deleted@group.calendar.test"]
+
+        monkeypatch.setattr(google_service, "_calendar_ids", calendar_ids)
+        with pytest.raises(google_service.FreeBusyError, match="notFound"):
+            asyncio.run(google_service.fetch_busy_intervals("alice", "alice"))
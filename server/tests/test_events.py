@@ -0,0 +1,207 @@
+"""Tests for the per-user push bus and the GET /events SSE stream."""
+
+import asyncio
+import contextlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import PlanResponse
+from app.routers import events
+from app.services import planning, push
+from app.services.jwt_service import create_token
+from app.services.push import EventBus, TooManyStreams
+from app.services.shared_state import InProcessState, SharedMap, SharedStateError
+
+
+async def _never_disconnected() -> bool:
+    return False
+
+
+def _empty_plan() -> PlanResponse:
+    return PlanResponse(blocks=[], unmet=[], capacity_by_day=[], coaching_messages=[])
+
+
+class TestEventBus:
+    def test_live_events_reach_open_streams(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=5)
+            sub = bus.subscribe("u")
+            other = bus.subscribe("someone-else")
+            bus.publish("u", "plan", {"digest": "abc"})
+            event = await asyncio.wait_for(sub.queue.get(), 1)
+            assert (event.type, event.data["digest"]) == ("plan", "abc")
+            assert other.queue.empty()
+
+        asyncio.run(main())
+
+    def test_resume_replays_missed_events(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=5)
+            first = bus.publish("u", "plan", {})
+            bus.publish("u", "sync", {"changed": ["calendar"]})
+            bus.publish("u", "checkin", {"check_in_id": "c1", "status": "assessed"})
+            sub = bus.subscribe("u", last_event_id=first.id)
+            assert [e.type for e in sub.backlog] == ["sync", "checkin"]
+            latest = sub.backlog[-1].id
+            bus.unsubscribe(sub)
+            assert bus.subscribe("u", last_event_id=latest).backlog == []
+
+        asyncio.run(main())
+
+    # Fell out of the buffer, from a previous process, from the future, garbage.
+    @pytest.mark.parametrize("last_id", [f"{push.BOOT}-1", "deadbeef-5", f"{push.BOOT}-99", f"{push.BOOT}-x"])
+    def test_unresumable_id_gets_reset(self, last_id):
+        async def main():
+            bus = EventBus(buffer_size=3, max_streams_per_user=5)
+            for _ in range(6):
+                bus.publish("u", "plan", {})
+            backlog = bus.subscribe("u", last_event_id=last_id).backlog
+            assert [e.type for e in backlog] == ["reset"]
+            # The reset carries the head id, so the next reconnect resumes cleanly.
+            assert bus.subscribe("u", last_event_id=backlog[0].id).backlog == []
+
+        asyncio.run(main())
+
+    def test_stream_cap_per_user(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=2)
+            a = bus.subscribe("u")
+            bus.subscribe("u")
+            with pytest.raises(TooManyStreams):
+                bus.subscribe("u")
+            bus.unsubscribe(a)
+            bus.subscribe("u")
+            assert bus.metrics()["streams"] == 2
+
+        asyncio.run(main())
+
+    def test_slow_stream_is_closed_not_buffered_forever(self):
+        async def main():
+            bus = EventBus(buffer_size=2, max_streams_per_user=5)
+            sub = bus.subscribe("u")
+            for _ in range(3):
+                bus.publish("u", "plan", {})
+            await asyncio.sleep(0)
+            items = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+            assert items[-1] is None
+            assert bus.metrics() == {"users": 1, "streams": 0, "published": 3, "dropped_streams": 1}
+
+        asyncio.run(main())
+
+    def test_publish_from_another_thread(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=5)
+            sub = bus.subscribe("u")
+            await asyncio.to_thread(bus.publish, "u", "checkin", {"status": "failed"})
+            event = await asyncio.wait_for(sub.queue.get(), 1)
+            assert event.data["status"] == "failed"
+
+        asyncio.run(main())
+
+    def test_streamed_channel_survives_other_users_filling_the_bus(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=5, max_users=2)
+            sub = bus.subscribe("u")
+            first = bus.publish("u", "plan", {})
+            bus.publish("u", "sync", {})
+            for other in ("a", "b", "c"):
+                bus.publish(other, "plan", {})
+            await asyncio.sleep(0)
+            assert bus.metrics()["users"] == 2
+            assert sub.queue.qsize() == 2
+            bus.unsubscribe(sub)
+            assert [e.type for e in bus.subscribe("u", last_event_id=first.id).backlog] == ["sync"]
+
+        asyncio.run(main())
+
+
+class TestStream:
+    def test_heartbeat_then_events_then_disconnect(self):
+        async def main():
+            bus = EventBus(buffer_size=10, max_streams_per_user=5)
+            sub = bus.subscribe("u")
+            gone = False
+
+            async def is_disconnected():
+                return gone
+
+            chunks = bus.stream(sub, 0.02, is_disconnected, retry_ms=3000)
+            assert await anext(chunks) == "retry: 3000\n\n"
+            assert await anext(chunks) == ": ping\n\n"
+            bus.publish("u", "plan", {"digest": "d"})
+            chunk = await anext(chunks)
+            assert chunk.startswith(f"id: {push.BOOT}-1\nevent: plan\ndata: {{\"digest\":\"d\"")
+            assert chunk.endswith("\n\n")
+            gone = True
+            with pytest.raises(StopAsyncIteration):
+                await anext(chunks)
+            assert bus.metrics()["streams"] == 0
+
+        asyncio.run(main())
+
+
+class TestPublishers:
+    def test_cache_plan_publishes_digest(self, monkeypatch):
+        monkeypatch.setattr(planning, "plan_cache", SharedMap(InProcessState(), "plan", PlanResponse))
+        user = "push-plan@example.test"
+
+        async def main():
+            sub = push.bus.subscribe(user)
+            try:
+                await planning.cache_plan(user, _empty_plan(), reason="sync")
+                event = await asyncio.wait_for(sub.queue.get(), 1)
+            finally:
+                push.bus.unsubscribe(sub)
+            assert event.type == "plan"
+            assert event.data["reason"] == "sync"
+            assert event.data["digest"] == planning.plan_digest(_empty_plan())
+
+        asyncio.run(main())
+
+    def test_failed_cache_write_publishes_nothing(self, monkeypatch):
+        class Down(InProcessState):
+            def set_value(self, key, value, encode, ttl_seconds=None):
+                raise SharedStateError("shared-state server unavailable")
+
+        monkeypatch.setattr(planning, "plan_cache", SharedMap(Down(), "plan", PlanResponse))
+        user = "push-plan-down@example.test"
+
+        async def main():
+            sub = push.bus.subscribe(user)
+            try:
+                await planning.cache_plan(user, _empty_plan())
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(sub.queue.get(), 0.1)
+            finally:
+                push.bus.unsubscribe(sub)
+
+        asyncio.run(main())
+
+
+class TestEventsRoute:
+    def test_requires_auth(self):
+        assert TestClient(app).get("/events").status_code in (401, 403)
+
+    def test_streams_missed_events_as_sse(self, monkeypatch):
+        user = "push-route@example.test"
+        headers = {"Authorization": f"Bearer {create_token(user)}"}
+        first = push.bus.publish(user, "plan", {"digest": "a"})
+        push.bus.publish(user, "sync", {"changed": ["canvas"]})
+        real_stream = push.bus.stream
+
+        async def two_chunks(*args):
+            # The client hangs up after the reconnect hint and one event.
+            async with contextlib.aclosing(real_stream(*args)) as chunks:
+                for _ in range(2):
+                    yield await anext(chunks)
+
+        monkeypatch.setattr(events.bus, "stream", two_chunks)
+        resp = TestClient(app).get("/events", headers={**headers, "Last-Event-ID": first.id})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.headers["cache-control"] == "no-cache"
+        assert resp.text.startswith("retry: ")
+        assert "event: sync" in resp.text and "event: plan" not in resp.text
+        assert push.bus.metrics()["streams"] == 0
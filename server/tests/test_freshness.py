@@ -0,0 +1,242 @@
+"""Tests for stale-while-revalidate snapshots and the circuit breaker."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.models.schemas import PlanResponse
+from app.services import planning
+from app.services.deadline import DeadlineExceeded
+from app.services.freshness import CircuitBreaker, CircuitOpenError, SnapshotStore
+from app.services.shared_state import InProcessState, SharedMap
+from app.services.token_store import TokenStore
+
+
+def _breaker(threshold: int = 2, reset: float = 60.0) -> CircuitBreaker:
+    return CircuitBreaker("test", failure_threshold=threshold, reset_seconds=reset)
+
+
+async def _fail():
+    raise httpx.ConnectError("down")
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = _breaker(threshold=2)
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(httpx.ConnectError):
+                    await breaker.call(_fail)
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(_fail)
+
+        asyncio.run(run())
+        assert breaker.state == "open"
+
+    def test_client_errors_do_not_trip(self):
+        breaker = _breaker(threshold=1)
+        request = httpx.Request("GET", "https://api.test")
+        response = httpx.Response(401, request=request)
+
+        async def unauthorized():
+            raise httpx.HTTPStatusError("401", request=request, response=response)
+
+        async def run():
+            with pytest.raises(httpx.HTTPStatusError):
+                await breaker.call(unauthorized)
+
+        asyncio.run(run())
+        assert breaker.state == "closed"
+
+    def test_half_open_trial_closes_on_success(self):
+        breaker = _breaker(threshold=1, reset=0.0)
+
+        async def ok():
+            return 42
+
+        async def run():
+            with pytest.raises(httpx.ConnectError):
+                await breaker.call(_fail)
+            assert breaker.state == "half_open"
+            return await breaker.call(ok)
+
+        assert asyncio.run(run()) == 42
+        assert breaker.state == "closed"
+
+    def test_cancelled_trial_does_not_wedge_half_open(self):
+        breaker = _breaker(threshold=1, reset=0.0)
+
+        async def ok():
+            return 42
+
+        async def run():
+            with pytest.raises(httpx.ConnectError):
+                await breaker.call(_fail)
+            trial = asyncio.create_task(breaker.call(asyncio.Event().wait))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            assert breaker.state == "half_open"
+            return await breaker.call(ok)
+
+        assert asyncio.run(run()) == 42
+        assert breaker.state == "closed"
+
+
+    def test_non_upstream_errors_leave_the_state_alone(self):
+        breaker = _breaker(threshold=2, reset=0.0)
+
+        async def deadline():
+            raise DeadlineExceeded()
+
+        async def bug():
+            raise KeyError("items")
+
+        async def run():
+            with pytest.raises(httpx.ConnectError):
+                await breaker.call(_fail)
+            for fn in (deadline, bug):
+                with pytest.raises((DeadlineExceeded, KeyError)):
+                    await breaker.call(fn)
+            assert breaker.failures == 1  # not reset by a call that never reached the upstream
+            with pytest.raises(httpx.ConnectError):
+                await breaker.call(_fail)
+            assert breaker.opened_at is not None
+            with pytest.raises(DeadlineExceeded):
+                await breaker.call(deadline)  # the half-open trial
+            assert breaker.state == "half_open"
+
+        asyncio.run(run())
+
+    def test_only_the_trial_releases_the_trial_slot(self):
+        breaker = _breaker(threshold=1, reset=0.0)
+        fail_now, finish_trial = asyncio.Event(), asyncio.Event()
+
+        async def slow_fail():
+            await fail_now.wait()
+            raise httpx.ConnectError("down")
+
+        async def ok():
+            return 42
+
+        async def run():
+            ordinary = asyncio.create_task(breaker.call(slow_fail))  # admitted while closed
+            await asyncio.sleep(0)
+            with pytest.raises(httpx.ConnectError):
+                await breaker.call(_fail)
+            trial = asyncio.create_task(breaker.call(finish_trial.wait))
+            await asyncio.sleep(0)
+            fail_now.set()
+            with pytest.raises(httpx.ConnectError):
+                await ordinary
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(ok)  # still one trial at a time
+            finish_trial.set()
+            await trial
+            return await breaker.call(ok)
+
+        assert asyncio.run(run()) == 42
+        assert breaker.state == "closed"
+
+class TestSnapshotStore:
+    def test_serves_stale_and_refreshes_in_background(self):
+        store = SnapshotStore(_breaker(), fresh_seconds=0.0, max_staleness_seconds=60.0)
+        calls: list[int] = []
+
+        async def loader():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            first = await store.get("u1", loader)
+            second = await store.get("u1", loader)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            third = await store.get("u1", loader)
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        assert (first, second) == (1, 1)
+        assert third == 2
+        assert store.stale_served >= 1
+
+    def test_falls_back_to_snapshot_on_failure(self):
+        store = SnapshotStore(_breaker(), fresh_seconds=0.0, max_staleness_seconds=0.0)
+        state = {"fail": False}
+
+        async def loader():
+            if state["fail"]:
+                raise httpx.ConnectError("down")
+            return ["event"]
+
+        async def run():
+            await store.get("u1", loader)
+            state["fail"] = True
+            return await store.get("u1", loader)
+
+        assert asyncio.run(run()) == ["event"]
+
+    def test_raises_without_snapshot(self):
+        store = SnapshotStore(_breaker(), fresh_seconds=60.0, max_staleness_seconds=60.0)
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(store.get("u1", _fail))
+
+    def test_sync_reloads_only_when_older_than_max_age(self):
+        store = SnapshotStore(_breaker(), fresh_seconds=60.0, max_staleness_seconds=60.0)
+        values = iter([["a"], ["a"], ["b"]])
+
+        async def loader():
+            return next(values)
+
+        async def run():
+            first = await store.sync("u1", loader, max_age=60.0)
+            skipped = await store.sync("u1", loader, max_age=60.0)
+            same = await store.sync("u1", loader, max_age=0.0)
+            changed = await store.sync("u1", loader, max_age=0.0)
+            served = await store.get("u1", loader)
+            return first, skipped, same, changed, served
+
+        first, skipped, same, changed, served = asyncio.run(run())
+        assert first == (["a"], True)
+        assert skipped == (["a"], False)
+        assert same == (["a"], False)
+        assert changed == (["b"], True)
+        assert served == ["b"]  # a pre-synced snapshot is a plain cache hit
+
+
+class TestBusyIntervalsFor:
+    def test_failed_refresh_without_snapshot_is_503_and_nothing_cached(self, monkeypatch):
+        tokens = TokenStore()
+        tokens.get_or_create("u").google_access_token = "access"
+        plans = SharedMap(InProcessState(), "plan", PlanResponse)
+
+        async def down(user_id, access_token):
+            raise CircuitOpenError("google circuit is open")
+
+        monkeypatch.setattr(planning, "store", tokens)
+        monkeypatch.setattr(planning, "get_busy_intervals", down)
+        monkeypatch.setattr(planning, "plan_cache", plans)
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(planning.current_plan("u"))
+        assert e.value.status_code == 503
+        assert plans.get("u") is None
+
+    def test_not_connected_means_no_busy_time(self, monkeypatch):
+        monkeypatch.setattr(planning, "store", TokenStore())
+        assert asyncio.run(planning.busy_intervals_for("u")) == []
+
+    def test_deadline_exceeded_is_not_swallowed(self, monkeypatch):
+        tokens = TokenStore()
+        tokens.get_or_create("u").google_access_token = "access"
+
+        async def out_of_time(user_id, access_token):
+            raise DeadlineExceeded()
+
+        monkeypatch.setattr(planning, "store", tokens)
+        monkeypatch.setattr(planning, "get_busy_intervals", out_of_time)
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(planning.busy_intervals_for("u"))
@@ -0,0 +1,88 @@
+"""Tests for the non-blocking Gemini call path (no network: fake models)."""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import get_settings
+from app.services import gemini_service
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, text: str, delay: float = 0.0) -> None:
+        self.text = text
+        self.delay = delay
+        self.timeouts: list[float] = []
+
+    def generate_content(self, prompt: str, request_options: dict | None = None) -> _Response:
+        self.timeouts.append((request_options or {}).get("timeout"))
+        time.sleep(self.delay)
+        return _Response(self.text)
+
+
+def _checkin():
+    return gemini_service.process_checkin(
+        planned_goal_name="Study",
+        start=datetime(2026, 3, 1, 9, tzinfo=timezone.utc),
+        end=datetime(2026, 3, 1, 10, tzinfo=timezone.utc),
+        what_user_did="Finished problem set",
+        recent_summaries=[],
+    )
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel('```json\n{"assessment": "Aligned.", "motivational_message": "Keep going."}\n```')
+    monkeypatch.setattr(gemini_service, "_client", lambda: fake)
+    return fake
+
+
+class TestGenerate:
+    def test_parses_fenced_json(self, model):
+        assert asyncio.run(_checkin()) == ("Aligned.", "Keep going.")
+
+    def test_timeout_returns_none(self, model, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_timeout_seconds", 0.05)
+        model.delay = 0.3
+        assert asyncio.run(_checkin()) is None
+
+    def test_event_loop_stays_responsive(self, model):
+        model.delay = 0.2
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            t = asyncio.create_task(ticker())
+            await _checkin()
+            t.cancel()
+            return ticks
+
+        assert asyncio.run(run()) >= 5
+
+    def test_thread_call_gets_the_sdk_timeout(self, model, monkeypatch):
+        monkeypatch.setattr(get_settings(), "gemini_timeout_seconds", 7.0)
+        asyncio.run(_checkin())
+        assert 0 < model.timeouts[-1] <= 7.0
+
+    def test_contended_slots_work_across_event_loops(self, model):
+        model.delay = 0.02
+        n = get_settings().gemini_max_concurrency + 2
+
+        async def burst():
+            return await asyncio.gather(*(_checkin() for _ in range(n)))
+
+        for _ in range(2):  # each asyncio.run is a new loop, as in batch jobs and tests
+            assert asyncio.run(burst()) == [("Aligned.", "Keep going.")] * n
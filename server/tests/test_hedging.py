@@ -0,0 +1,99 @@
+"""Tests for deadline propagation and hedged upstream GETs."""
+
+import asyncio
+
+import httpx
+import pytest
+
+import app.main  # noqa: F401  (registers the metrics sources)
+from app.config import get_settings
+from app.services import hedging, metrics
+from app.services.deadline import DeadlineExceeded, deadline_scope, remaining, upstream_timeout
+
+
+@pytest.fixture(autouse=True)
+def _hedge_settings(monkeypatch):
+    s = get_settings()
+    monkeypatch.setattr(s, "hedge_enabled", True)
+    monkeypatch.setattr(s, "hedge_min_samples", 5)
+    monkeypatch.setattr(s, "hedge_min_delay_seconds", 0.01)
+    monkeypatch.setattr(s, "hedge_max_ratio", 0.5)
+    hedging.reset()
+    yield
+    hedging.reset()
+
+
+class TestDeadline:
+    def test_nested_scope_only_shrinks(self):
+        with deadline_scope(10):
+            with deadline_scope(60):
+                assert remaining() <= 10
+        assert remaining() is None
+
+    def test_timeout_clipped_to_remaining(self):
+        with deadline_scope(0.5):
+            assert upstream_timeout() <= 0.5
+
+    def test_expired_deadline_raises(self):
+        with deadline_scope(-1):
+            with pytest.raises(DeadlineExceeded):
+                upstream_timeout()
+
+
+def _run(handler, n: int) -> list[httpx.Response]:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await hedging.hedged_get(client, "https://api.test/x") for _ in range(n)]
+    return asyncio.run(run())
+
+
+class TestHedgedGet:
+    def test_hedge_wins_over_slow_primary(self):
+        calls = {"n": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls["n"] += 1
+            if calls["n"] == 11:
+                await asyncio.sleep(1.0)
+                return httpx.Response(200, json={"who": "primary"})
+            return httpx.Response(200, json={"who": "fast"})
+
+        responses = _run(handler, 11)
+        assert responses[-1].json() == {"who": "fast"}
+        stats = hedging.metrics()
+        assert stats["api_test_hedges"] == 1
+        assert stats["api_test_hedge_wins"] == 1
+
+    def test_hedge_rate_is_capped(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "hedge_max_ratio", 0.0)
+        calls = {"n": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls["n"] += 1
+            if calls["n"] > 5:
+                await asyncio.sleep(0.05)
+            return httpx.Response(200)
+
+        _run(handler, 8)
+        assert hedging.metrics()["api_test_hedges"] == 0
+        assert calls["n"] == 8
+
+    def test_fast_5xx_does_not_beat_slow_success(self):
+        calls = {"n": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls["n"] += 1
+            if calls["n"] == 11:
+                await asyncio.sleep(0.1)
+                return httpx.Response(200, json={"who": "primary"})
+            if calls["n"] == 12:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"who": "warm-up"})
+
+        responses = _run(handler, 11)
+        assert responses[-1].json() == {"who": "primary"}
+        assert hedging.metrics()["api_test_hedge_wins"] == 0
+
+    def test_exported_with_metrics(self):
+        _run(lambda request: httpx.Response(200), 1)
+        assert 'chronoforge_cache_api_test_hedge_rate{cache="hedging"} 0' in metrics.render()
@@ -0,0 +1,113 @@
+"""Tests for the conditional-request cache and its LRU."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.cache import LRUCache
+from app.services.http_cache import cached_get, http_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    http_cache.clear()
+    yield
+    http_cache.clear()
+
+
+def _etag_transport(calls: list[httpx.Request], body: dict, etag: str = '"v1"'):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+    return httpx.MockTransport(handler)
+
+
+def _get(transport: httpx.MockTransport, parse, user: str = "u1", token: str = "tok"):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await cached_get(
+                client, "https://api.test/items",
+                user_id=user, access_token=token, params={"page": "1"}, parse=parse,
+            )
+    return asyncio.run(run())
+
+
+class TestConditionalGet:
+    def test_304_reuses_parsed_value(self):
+        calls: list[httpx.Request] = []
+        transport = _etag_transport(calls, {"items": [1, 2, 3]})
+        parsed: list[dict] = []
+
+        def parse(data):
+            parsed.append(data)
+            return data["items"]
+
+        first = _get(transport, parse)
+        second = _get(transport, parse)
+
+        assert first == second == [1, 2, 3]
+        assert len(calls) == 2
+        assert calls[1].headers["If-None-Match"] == '"v1"'
+        assert len(parsed) == 1
+        assert http_cache.stats.hits == 1
+        assert http_cache.stats.misses == 1
+
+    def test_cache_is_per_user(self):
+        calls: list[httpx.Request] = []
+        transport = _etag_transport(calls, {"items": []})
+        _get(transport, lambda d: d, user="alice", token="same")
+        _get(transport, lambda d: d, user="bob", token="same")
+        assert "If-None-Match" not in calls[1].headers
+
+    def test_survives_access_token_refresh(self):
+        calls: list[httpx.Request] = []
+        transport = _etag_transport(calls, {"items": [1]})
+        _get(transport, lambda d: d, token="before-refresh")
+        assert _get(transport, lambda d: d, token="after-refresh") == {"items": [1]}
+        assert calls[1].headers["If-None-Match"] == '"v1"'
+        assert calls[1].headers["Authorization"] == "Bearer after-refresh"
+        assert http_cache.metrics()["entries"] == 1
+
+    def test_last_modified_is_sent(self):
+        calls: list[httpx.Request] = []
+        stamp = "Wed, 04 Mar 2026 10:00:00 GMT"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if request.headers.get("If-Modified-Since") == stamp:
+                return httpx.Response(304)
+            return httpx.Response(200, json=[], headers={"Last-Modified": stamp})
+
+        transport = httpx.MockTransport(handler)
+        _get(transport, lambda d: d)
+        _get(transport, lambda d: d)
+        assert calls[1].headers["If-Modified-Since"] == stamp
+        assert http_cache.stats.hits == 1
+
+    def test_error_status_raises(self):
+        transport = httpx.MockTransport(lambda r: httpx.Response(500))
+        with pytest.raises(httpx.HTTPStatusError):
+            _get(transport, lambda d: d)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache: LRUCache[int] = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats.evictions == 1
+
+    def test_ttl_expiry_counts_as_miss(self):
+        cache: LRUCache[int] = LRUCache(max_entries=4, ttl_seconds=0.001)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        assert cache.get("a") is None
+        assert cache.stats.misses == 1
@@ -0,0 +1,62 @@
+"""Tests for bulk upstream payload ingestion."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import ingest
+
+
+class TestParseDatetime:
+    def test_rfc3339_with_zulu_and_offset(self):
+        assert ingest.parse_datetime("2026-03-01T10:00:00Z") == datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+        parsed = ingest.parse_datetime("2026-03-01T10:00:00.250-05:00")
+        assert parsed.utcoffset() == timedelta(hours=-5)
+        assert parsed.microsecond == 250000
+
+    def test_falls_back_for_odd_formats(self, monkeypatch):
+        from dateutil import parser
+
+        seen = []
+        real = parser.isoparse
+
+        def spy(value):
+            seen.append(value)
+            return real(value)
+
+        monkeypatch.setattr(parser, "isoparse", spy)
+        # End-of-day 24:00 is valid ISO 8601 but rejected by datetime.fromisoformat.
+        assert ingest.parse_datetime("2026-03-01T24:00:00Z") == datetime(2026, 3, 2, tzinfo=timezone.utc)
+        assert seen == ["2026-03-01T24:00:00Z"]
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            ingest.parse_datetime("next tuesday")
+
+    def test_email_date_header(self):
+        parsed = ingest.parse_email_date("Sun, 01 Mar 2026 10:00:00 +0000")
+        assert parsed == datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+
+
+class TestBulkValidation:
+    def test_calendar_events(self):
+        events = ingest.calendar_events([
+            {"id": "a", "summary": "Standup",
+             "start": {"dateTime": "2026-03-01T09:00:00Z"},
+             "end": {"dateTime": "2026-03-01T09:15:00Z"}},
+            {"id": "b", "start": {"date": "2026-03-02"}, "end": {"date": "2026-03-03"}},
+            {"id": "c", "start": {}, "end": {}},
+        ])
+        assert [e.id for e in events] == ["a", "b"]
+        assert events[1].is_all_day
+        assert events[1].title == "(No title)"
+
+    def test_canvas_tasks_drop_bad_due_dates(self):
+        tasks = ingest.canvas_tasks([
+            {"id": 1, "name": "HW1", "due_at": "2026-03-05T23:59:00Z", "points_possible": 10},
+            {"id": 2, "name": "HW2", "due_at": "not a date"},
+            {"id": 3, "name": "Reading"},
+        ], "CS 101")
+        assert [t.id for t in tasks] == ["1", "3"]
+        assert tasks[0].course_name == "CS 101"
+        assert tasks[1].due_at is None
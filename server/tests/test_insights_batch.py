@@ -0,0 +1,125 @@
+"""Tests for the nightly insights batch."""
+
+import asyncio
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.models.schemas import PlanResponse
+from app.services import insights_batch, planning
+from app.services.goal_store import GoalStore
+from app.services.insights_cache import InsightsCache, fingerprint
+from app.services.presync import OpenTimes
+from app.services.shared_state import InProcessState, SharedMap
+from app.services.token_store import TokenStore
+
+
+class TestRateLimiter:
+    def test_spaces_requests_evenly(self):
+        limiter = insights_batch.RateLimiter(per_minute=1200)  # one every 50 ms
+
+        async def run():
+            started = time.monotonic()
+            for _ in range(4):
+                await limiter.acquire()
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) >= 0.14
+
+
+class TestRunBatch:
+    @pytest.fixture
+    def env(self, monkeypatch):
+        goals = GoalStore()
+        cache = InsightsCache(max_entries=16, ttl_seconds=60)
+        calls: list[int] = []
+
+        async def fake_insights(plan, goal_list):
+            calls.append(1)
+            return {"summary": "s", "time_breakdown": "t", "where_to_add_more": "w"}
+
+        async def no_busy(user_id):
+            return []
+
+        monkeypatch.setattr(insights_batch, "goal_store", goals)
+        monkeypatch.setattr(insights_batch, "insights_cache", cache)
+        monkeypatch.setattr(insights_batch, "get_plan_insights", fake_insights)
+        monkeypatch.setattr("app.services.planning.plan_cache", SharedMap(InProcessState(), "plan", PlanResponse))
+        monkeypatch.setattr("app.services.planning.goal_store", goals)
+        monkeypatch.setattr("app.services.planning.busy_intervals_for", no_busy)
+        return goals, cache, calls
+
+    def test_populates_cache_and_skips_cached(self, env):
+        goals, cache, calls = env
+        for u in ("a", "b", "c"):
+            goals.list_goals(u)
+
+        first = asyncio.run(insights_batch.run_batch(["a", "b", "c"], concurrency=2, per_minute=0))
+        second = asyncio.run(insights_batch.run_batch(["a", "b", "c"], concurrency=2, per_minute=0))
+
+        assert first.generated == 3
+        assert second.already_cached == 3
+        assert len(calls) == 3
+        assert cache.metrics()["entries"] == 3
+
+    def test_batch_results_are_shared_with_other_workers(self, env, monkeypatch):
+        goals, _, calls = env
+        state = InProcessState()
+        monkeypatch.setattr(insights_batch, "insights_cache", InsightsCache(16, 60, shared=state))
+        goals.list_goals("a")
+        asyncio.run(insights_batch.run_batch(["a"], per_minute=0))
+
+        other_worker = InsightsCache(16, 60, shared=state)
+        key = fingerprint(planning.plan_cache.get("a"), goals.list_goals("a"))
+
+        async def generate():
+            calls.append(1)
+            return None
+
+        assert asyncio.run(other_worker.get_or_generate(key, generate))["summary"] == "s"
+        assert len(calls) == 1  # only the batch's call
+
+
+class TestActiveUsers:
+    def test_only_users_seen_recently(self, monkeypatch):
+        tokens, goals, opens = TokenStore(), GoalStore(), OpenTimes()
+        monkeypatch.setattr(insights_batch, "store", tokens)
+        monkeypatch.setattr(insights_batch, "goal_store", goals)
+        monkeypatch.setattr(insights_batch, "open_times", opens)
+        monkeypatch.setattr(insights_batch.get_settings(), "insights_batch_active_days", 7)
+        for user in ("recent", "lapsed", "never"):
+            goals.list_goals(user)
+
+        async def run():
+            await opens.record("recent", datetime(2026, 3, 9, 8, tzinfo=timezone.utc))
+            await opens.record("lapsed", datetime(2026, 2, 1, 8, tzinfo=timezone.utc))
+            return await insights_batch.active_users(today=date(2026, 3, 10))
+
+        assert asyncio.run(run()) == ["recent"]
+
+
+class TestNightlyLoop:
+    @pytest.mark.parametrize("holder", [True, False])
+    def test_only_the_lease_holder_runs_the_batch(self, monkeypatch, holder):
+        runs: list[int] = []
+
+        class Store(TokenStore):
+            def lease(self, name, ttl_seconds):
+                assert name == "insights-batch"
+                return holder
+
+        async def run_batch():
+            runs.append(1)
+
+        monkeypatch.setattr(insights_batch, "store", Store())
+        monkeypatch.setattr(insights_batch, "run_batch", run_batch)
+        monkeypatch.setattr(insights_batch, "_seconds_until", lambda hour: 0.01)
+
+        async def main():
+            loop = asyncio.create_task(insights_batch.nightly_loop())
+            await asyncio.sleep(0.03)
+            loop.cancel()
+
+        asyncio.run(main())
+        assert bool(runs) == holder
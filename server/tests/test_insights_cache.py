@@ -0,0 +1,62 @@
+"""Tests for the fingerprint-keyed insights cache."""
+
+import asyncio
+from datetime import datetime, timezone
+
+from app.models.schemas import Goal, GoalCategory, PlanResponse
+from app.services.insights_cache import InsightsCache, fingerprint
+
+
+def _goal(hours: float = 5.0) -> Goal:
+    return Goal(
+        id="g1", name="Study", category=GoalCategory.study,
+        weekly_target_hours=hours, created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _plan(msg: str = "On track.") -> PlanResponse:
+    return PlanResponse(blocks=[], unmet=[], capacity_by_day=[], coaching_messages=[msg])
+
+
+class TestFingerprint:
+    def test_stable_and_sensitive(self):
+        assert fingerprint(_plan(), [_goal()]) == fingerprint(_plan(), [_goal()])
+        assert fingerprint(_plan(), [_goal()]) != fingerprint(_plan(), [_goal(6.0)])
+        assert fingerprint(_plan(), [_goal()]) != fingerprint(_plan("Behind."), [_goal()])
+
+
+class TestInsightsCache:
+    def test_concurrent_requests_share_one_call(self):
+        cache = InsightsCache(max_entries=8, ttl_seconds=60)
+        calls: list[int] = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"summary": "s"}
+
+        async def run():
+            results = await asyncio.gather(*[cache.get_or_generate("k", generate) for _ in range(5)])
+            again = await cache.get_or_generate("k", generate)
+            return results, again
+
+        results, again = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(r == {"summary": "s"} for r in results)
+        assert again == {"summary": "s"}
+        assert cache.coalesced == 4
+
+    def test_failures_are_not_cached(self):
+        cache = InsightsCache(max_entries=8, ttl_seconds=60)
+        calls: list[int] = []
+
+        async def generate():
+            calls.append(1)
+            return None
+
+        async def run():
+            await cache.get_or_generate("k", generate)
+            await cache.get_or_generate("k", generate)
+
+        asyncio.run(run())
+        assert len(calls) == 2
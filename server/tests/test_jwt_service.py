@@ -0,0 +1,130 @@
+"""Tests for JWT verification caching, secret rotation and revocation."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.config import get_settings
+from app.main import app
+from app.services import jwt_service
+from app.services.shared_state import InProcessState, SharedStateError
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(get_settings(), "jwt_secret", "current")
+    monkeypatch.setattr(get_settings(), "jwt_previous_secrets", "")
+    monkeypatch.setattr(jwt_service, "revocations", InProcessState())
+    monkeypatch.setattr(jwt_service, "_revoked_here", 0)
+    jwt_service._verified.clear()
+
+
+def _token(secret: str, exp_in: float = 3600, sub: str = "u1") -> str:
+    return jwt.encode({"sub": sub, "exp": int(time.time() + exp_in)}, secret, algorithm="HS256")
+
+
+def decode(token: str) -> str:
+    return asyncio.run(jwt_service.decode_token(token))
+
+
+def revoke(token: str) -> None:
+    asyncio.run(jwt_service.revoke_token(token))
+
+
+class TestDecodeToken:
+    def test_verifies_once_then_serves_from_cache(self, monkeypatch):
+        token = jwt_service.create_token("u1")
+        calls = []
+        real = jwt_service._verify
+
+        def counting(*args):
+            calls.append(1)
+            return real(*args)
+
+        monkeypatch.setattr(jwt_service, "_verify", counting)
+        assert [decode(token) for _ in range(5)] == ["u1"] * 5
+        assert len(calls) == 1
+        assert jwt_service.metrics()["hits"] >= 4
+
+    def test_cached_entry_expires_with_token(self):
+        token = _token("current", exp_in=30)
+        assert decode(token) == "u1"
+        (expires_at, _), = jwt_service._verified._data.values()
+        assert expires_at - time.monotonic() <= 30
+
+    def test_bad_signature_rejected(self):
+        with pytest.raises(HTTPException):
+            decode(_token("attacker"))
+
+
+class TestRotation:
+    def test_previous_secret_still_accepted(self, monkeypatch):
+        old = _token("old")
+        monkeypatch.setattr(get_settings(), "jwt_previous_secrets", "old")
+        assert decode(old) == "u1"
+        assert decode(_token("current")) == "u1"
+
+    def test_dropping_secret_invalidates_cached_tokens(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "jwt_previous_secrets", "old")
+        old = _token("old")
+        assert decode(old) == "u1"
+        monkeypatch.setattr(get_settings(), "jwt_previous_secrets", "")
+        with pytest.raises(HTTPException):
+            decode(old)
+
+
+class TestRevocation:
+    def test_revoked_token_rejected_even_when_cached(self):
+        token = jwt_service.create_token("u1")
+        decode(token)
+        revoke(token)
+        with pytest.raises(HTTPException, match="revoked"):
+            decode(token)
+        assert decode(_token("current", sub="u2")) == "u2"
+
+    def test_only_verified_tokens_can_be_revoked(self):
+        for forged in (_token("attacker", exp_in=10**9), _token("current", exp_in=-10), "garbage"):
+            with pytest.raises(HTTPException):
+                revoke(forged)
+        assert jwt_service.metrics()["revoked"] == 0
+
+    def test_entry_expires_with_the_token(self):
+        token = _token("current", exp_in=60)
+        revoke(token)
+        (expires_at, _), = jwt_service.revocations._data.values()
+        assert 55 <= expires_at - time.monotonic() <= 60
+
+    def test_revocation_made_on_another_worker_applies_here(self):
+        token = jwt_service.create_token("u1")
+        assert decode(token) == "u1"  # verified and cached in this worker
+        other_worker_state = jwt_service.revocations  # what another worker's revoke writes to
+        other_worker_state.set(jwt_service._revoked_key(jwt_service._digest(token)), b"1", ttl_seconds=60)
+        with pytest.raises(HTTPException, match="revoked"):
+            decode(token)
+
+    def test_unreachable_shared_state_fails_closed(self, monkeypatch):
+        class Down(InProcessState):
+            def get(self, key):
+                raise SharedStateError("shared-state server unavailable")
+
+        monkeypatch.setattr(jwt_service, "revocations", Down())
+        with pytest.raises(HTTPException) as exc:
+            decode(jwt_service.create_token("u1"))
+        assert exc.value.status_code == 503
+
+
+class TestLogout:
+    def test_forged_token_is_rejected_and_not_stored(self):
+        client = TestClient(app)
+        forged = {"Authorization": f"Bearer {_token('attacker', exp_in=10**9)}"}
+        assert client.post("/auth/logout", headers=forged).status_code == 401
+        assert jwt_service.metrics()["revoked"] == 0
+
+        real = {"Authorization": f"Bearer {jwt_service.create_token('u1')}"}
+        assert client.post("/auth/logout", headers=real).status_code == 200
+        assert client.post("/auth/logout", headers=real).status_code == 401
+        assert jwt_service.metrics()["revoked"] == 1
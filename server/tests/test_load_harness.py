@@ -0,0 +1,48 @@
+"""Tests for the load-test harness, driven in-process against the ASGI app."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.jwt_service import create_token
+from benchmarks.load import MIXES, compare, drive, parse_mix, percentile, setup_users
+
+
+class TestReport:
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([7.0], 95) == 7.0
+        assert percentile([], 50) == 0.0
+
+    def test_parse_mix(self):
+        assert parse_mix("read_only") == MIXES["read_only"]
+        assert parse_mix("plan_current=3,goals_list") == {"plan_current": 3, "goals_list": 1}
+        with pytest.raises(ValueError):
+            parse_mix("nope=1")
+
+    def test_compare(self):
+        run = {"overall": {"throughput_rps": 110.0, "error_rate": 0.0, "latency_ms": {"p95": 12.0}}, "routes": {}}
+        base = {"overall": {"throughput_rps": 100.0, "error_rate": 0.0, "latency_ms": {"p95": 10.0}}, "routes": {}}
+        (line,) = compare(run, base)
+        assert "+10.0%" in line and "+2.00 ms" in line
+
+
+class TestDrive:
+    def test_runs_mix_and_counts_per_route(self):
+        tokens = [create_token(f"load-test-{i}@example.test") for i in range(5)]
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await setup_users(client, tokens, concurrency=2, seed=1)
+                return await drive(client, tokens, MIXES["app_open"], concurrency=4, requests=60)
+
+        report = asyncio.run(run())
+        assert report["overall"]["requests"] == 60
+        assert sum(r["requests"] for r in report["routes"].values()) == 60
+        assert report["overall"]["error_rate"] == 0.0
+        assert set(report["routes"]) <= set(MIXES["app_open"])
@@ -0,0 +1,47 @@
+"""Tests for the rule-based local insights engine."""
+
+from datetime import datetime, timezone
+
+from app.models.schemas import CalendarEvent, CapacityConstraints, Goal, GoalCategory
+from app.services.local_insights import generate_insights
+from app.services.scheduler import generate_plan
+
+
+def _dt(day: int, hour: int = 0) -> datetime:
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+def _goal(name: str, hours: float, category: GoalCategory = GoalCategory.study) -> Goal:
+    return Goal(
+        id=name.lower(), name=name, category=category,
+        priority_weight=5, weekly_target_hours=hours, created_at=_dt(1),
+    )
+
+
+def _insights(goals: list[Goal], events: list[CalendarEvent] | None = None):
+    plan = generate_plan(goals, events or [], CapacityConstraints(), start_date=_dt(2), days=7)
+    return generate_insights(plan, goals)
+
+
+class TestLocalInsights:
+    def test_on_track_plan(self):
+        insights = _insights([_goal("Study", 5.0)])
+        assert "Every goal is covered" in insights["summary"]
+        assert insights["time_breakdown"].startswith("- study:")
+        assert "Most room:" in insights["where_to_add_more"]
+
+    def test_deficits_are_named(self):
+        insights = _insights([_goal("Gym", 3.0, GoalCategory.fitness), _goal("Thesis", 80.0)])
+        assert "not on track" in insights["summary"]
+        assert "'Thesis'" in insights["where_to_add_more"]
+        assert "- fitness:" in insights["time_breakdown"]
+
+    def test_fixed_time_in_breakdown(self):
+        lecture = CalendarEvent(id="l", title="Lecture", start=_dt(2, 9), end=_dt(2, 12))
+        insights = _insights([_goal("Study", 5.0)], [lecture])
+        assert "- fixed calendar: 3.0h" in insights["time_breakdown"]
+
+    def test_empty_plan(self):
+        insights = _insights([])
+        assert "Nothing is scheduled" in insights["summary"]
+        assert insights["time_breakdown"] == "- Nothing planned yet."
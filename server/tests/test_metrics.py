@@ -0,0 +1,89 @@
+"""Tests for the Prometheus instrumentation."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.models.schemas import CapacityConstraints, Goal, GoalCategory
+from app.services import metrics
+from app.services.scheduler import generate_plan
+
+
+@pytest.fixture
+def on(monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        h = metrics.Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 5.0):
+            h.observe(v, "/x")
+        lines = h.render()
+        assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+        assert 't_seconds_bucket{route="/x",le="1"} 2' in lines
+        assert 't_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+        assert 't_seconds_count{route="/x"} 3' in lines
+
+
+class TestUpstream:
+    def test_counts_by_outcome(self, on):
+        @metrics.instrumented("canvas")
+        async def fetch(status: int):
+            if status != 200:
+                request = httpx.Request("GET", "https://canvas.test")
+                raise httpx.HTTPStatusError("x", request=request, response=httpx.Response(status, request=request))
+            return "ok"
+
+        async def run():
+            await fetch(200)
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await fetch(503)
+
+        asyncio.run(run())
+        text = metrics.render()
+        assert 'chronoforge_upstream_calls_total{service="canvas",function="fetch",status="ok"} 1' in text
+        assert 'chronoforge_upstream_calls_total{service="canvas",function="fetch",status="503"} 2' in text
+        assert metrics.upstream_latency.count("canvas", "fetch") == 3
+
+    def test_disabled_records_nothing(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "metrics_enabled", False)
+        metrics.reset()
+        with metrics.upstream("google", "fetch"):
+            pass
+        assert metrics.upstream_latency.count("google", "fetch") == 0
+
+
+class TestSchedulerPhases:
+    def test_generate_plan_records_each_phase_once(self, on):
+        goal = Goal(
+            id="g1", name="Study", category=GoalCategory.study, weekly_target_hours=10,
+            created_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        )
+        generate_plan([goal], [], CapacityConstraints(), start_date=datetime(2026, 3, 2, tzinfo=timezone.utc))
+        for phase in ("free_blocks", "allocation", "unmet_coaching"):
+            assert metrics.scheduler_phase.count(phase) == 1
+
+
+class TestEndpoint:
+    def test_hidden_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "metrics_enabled", False)
+        assert TestClient(app).get("/metrics").status_code == 404
+
+    def test_exposes_routes_and_caches(self, on):
+        client = TestClient(app)
+        client.get("/health")
+        client.get("/goals")  # 401, still counted under its route template
+        text = client.get("/metrics").text
+        assert 'chronoforge_http_requests_total{method="GET",route="/health",status="200"} 1' in text
+        assert 'chronoforge_http_requests_total{method="GET",route="/goals",status="401"} 1' in text
+        assert 'chronoforge_cache_hit_rate{cache="insights"}' in text
@@ -0,0 +1,223 @@
+"""Tests for the background pre-sync scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.models.schemas import BusyInterval, GoalCategory, GoalCreate, PlanResponse
+from app.services import presync
+from app.services.goal_store import GoalStore
+from app.services.presync import OpenTimes, PresyncScheduler
+from app.services.shared_state import InProcessState, SharedMap
+from app.services.token_store import TokenStore, UserTokens
+
+
+def _at(hour: int, minute: int = 0, day: int = 2) -> datetime:
+    return datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+class TestOpenTimes:
+    def test_first_open_per_day_only(self):
+        opens = OpenTimes()
+
+        async def run():
+            await opens.record("u", _at(8, 0, day=2))
+            await opens.record("u", _at(20, 0, day=2))  # later opens the same day don't count
+            await opens.record("u", _at(8, 30, day=3))
+            return await opens.usual_minute("u")
+
+        assert asyncio.run(run()) == 8 * 60 + 15
+
+    def test_circular_mean_across_midnight(self):
+        opens = OpenTimes()
+
+        async def run():
+            await opens.record("u", _at(23, 50, day=2))
+            await opens.record("u", _at(0, 10, day=4))
+            return await opens.usual_minute("u")
+
+        assert asyncio.run(run()) == 0
+
+    def test_seconds_until_open_wraps_to_tomorrow(self):
+        opens = OpenTimes()
+
+        async def run():
+            await opens.record("u", _at(7, 0))
+            return [
+                await opens.seconds_until_open("u", _at(6, 30)),
+                await opens.seconds_until_open("u", _at(7, 30)),
+                await opens.seconds_until_open("nobody", _at(7, 30)),
+            ]
+
+        assert asyncio.run(run()) == [30 * 60, 23.5 * 3600, float("inf")]
+
+    def test_opens_recorded_by_other_workers_count(self):
+        state = InProcessState()
+        worker_a, worker_b = OpenTimes(state), OpenTimes(state)
+
+        async def run():
+            await worker_a.record("u", _at(8, 0, day=2))
+            await worker_b.record("u", _at(9, 0, day=2))  # same day: not a second first open
+            await worker_b.record("u", _at(9, 0, day=3))
+            return await OpenTimes(state).usual_minute("u"), await worker_a.last_open_day("u")
+
+        assert asyncio.run(run()) == (8 * 60 + 30, _at(9, 0, day=2).date())
+
+
+class TestDue:
+    def test_soonest_open_first_and_recently_synced_skipped(self, monkeypatch):
+        settings = presync.get_settings()
+        monkeypatch.setattr(settings, "presync_lead_seconds", 3600.0)
+        monkeypatch.setattr(settings, "presync_max_age_seconds", 6 * 3600.0)
+        opens = OpenTimes()
+        for user, at in (("nine", _at(9, 0)), ("eight_forty", _at(8, 40)), ("tonight", _at(21, 0))):
+            asyncio.run(opens.record(user, at))
+        scheduler = PresyncScheduler(opens)
+        now = _at(8, 30, day=5)
+        for user in ("nine", "eight_forty", "tonight"):
+            scheduler._last_synced.set(user, 1000.0)
+
+        due = asyncio.run(scheduler.due(["nine", "eight_forty", "tonight", "new"], now, monotonic=1000.0))
+        assert due == ["eight_forty", "nine", "new"]
+
+    def test_per_cycle_cap(self, monkeypatch):
+        monkeypatch.setattr(presync.get_settings(), "presync_max_users_per_cycle", 2)
+        assert len(asyncio.run(PresyncScheduler(OpenTimes()).due(["a", "b", "c"], _at(8), monotonic=0.0))) == 2
+
+
+@pytest.fixture
+def env(monkeypatch):
+    goals, tokens = GoalStore(), TokenStore()
+    plans = SharedMap(InProcessState(), "plan", PlanResponse)
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    upstream = {"busy": [BusyInterval(start=start, end=start + timedelta(hours=2))], "calls": 0, "canvas": 0}
+
+    async def sync_calendar(user_id, access_token, max_age):
+        upstream["calls"] += 1
+        return list(upstream["busy"]), True
+
+    async def sync_canvas_tasks(user_id, access_token, max_age):
+        upstream["canvas"] += 1
+        return False
+
+    monkeypatch.setattr(presync, "store", tokens)
+    monkeypatch.setattr(presync, "goal_store", goals)
+    monkeypatch.setattr(presync, "plan_cache", plans)
+    monkeypatch.setattr(presync, "sync_calendar", sync_calendar)
+    monkeypatch.setattr(presync, "sync_canvas_tasks", sync_canvas_tasks)
+    monkeypatch.setattr("app.services.planning.goal_store", goals)
+    monkeypatch.setattr("app.services.planning.plan_cache", plans)
+    tokens.save("u1", UserTokens(google_access_token="g", canvas_access_token="c"))
+    return goals, plans, upstream
+
+
+class TestCycle:
+    def test_regenerates_plan_only_when_inputs_change(self, env):
+        goals, plans, upstream = env
+        scheduler = PresyncScheduler(OpenTimes())
+
+        async def cycle():
+            scheduler._last_synced.clear()
+            return await scheduler.run_cycle(["u1"])
+
+        first = asyncio.run(cycle())
+        assert (first.synced, first.plans_regenerated) == (1, 1)
+        assert (upstream["calls"], upstream["canvas"]) == (1, 1)
+        assert any(b.goal_id == "busy" for b in plans.get("u1").blocks)
+
+        assert asyncio.run(cycle()).plans_regenerated == 0
+
+        goals.create_goal("u1", GoalCreate(name="Gym", category=GoalCategory.fitness))
+        assert asyncio.run(cycle()).plans_regenerated == 1
+
+        upstream["busy"] = []
+        assert asyncio.run(cycle()).plans_regenerated == 1
+
+    def test_first_sync_after_restart_keeps_the_cached_plan(self, env):
+        goals, plans, upstream = env
+        mine = PlanResponse(blocks=[], unmet=[], capacity_by_day=[], coaching_messages=["simulated"])
+        plans.set("u1", mine)
+
+        report = asyncio.run(PresyncScheduler(OpenTimes()).run_cycle(["u1"]))
+        assert (report.synced, report.plans_regenerated) == (1, 0)
+        assert plans.get("u1") == mine
+
+    def test_failures_are_counted_and_retried(self, env, monkeypatch):
+        async def broken(user_id, access_token, max_age):
+            raise RuntimeError("google down")
+
+        monkeypatch.setattr(presync, "sync_calendar", broken)
+        scheduler = PresyncScheduler(OpenTimes())
+        report = asyncio.run(scheduler.run_cycle(["u1"]))
+        assert (report.synced, report.failed) == (0, 1)
+        assert "u1" not in scheduler._last_synced
+
+
+def _unauthorized() -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://www.googleapis.com/calendar/v3/freeBusy")
+    return httpx.HTTPStatusError("401", request=request, response=httpx.Response(401, request=request))
+
+
+class TestExpiredTokens:
+    def test_expired_access_token_is_refreshed_and_saved(self, env, monkeypatch):
+        _, _, upstream = env
+        tokens = presync.store
+        ut = tokens.get("u1")
+        ut.set_google_refresh("refresh")
+        real = presync.sync_calendar
+        seen: list[str] = []
+
+        async def calendar(user_id, access_token, max_age):
+            seen.append(access_token)
+            if access_token == "g":
+                raise _unauthorized()
+            return await real(user_id, access_token, max_age)
+
+        async def refresh(refresh_token):
+            assert refresh_token == "refresh"
+            return {"access_token": "fresh", "expires_in": 3599}
+
+        monkeypatch.setattr(presync, "sync_calendar", calendar)
+        monkeypatch.setattr(presync, "refresh_access_token", refresh)
+        report = asyncio.run(PresyncScheduler(OpenTimes()).run_cycle(["u1"]))
+        assert (report.synced, report.tokens_refreshed, report.failed) == (1, 1, 0)
+        assert seen == ["g", "fresh"]
+        assert tokens.get("u1").google_access_token == "fresh"
+
+    def test_without_refresh_token_the_user_is_skipped_not_failed(self, env, monkeypatch):
+        async def calendar(user_id, access_token, max_age):
+            raise _unauthorized()
+
+        monkeypatch.setattr(presync, "sync_calendar", calendar)
+        scheduler = PresyncScheduler(OpenTimes())
+        report = asyncio.run(scheduler.run_cycle(["u1"]))
+        assert (report.synced, report.skipped_expired, report.failed) == (0, 1, 0)
+        assert "u1" in scheduler._last_synced  # not retried on the next cycle
+
+
+class TestLoop:
+    @pytest.mark.parametrize("holder", [True, False])
+    def test_only_the_lease_holder_runs_cycles(self, monkeypatch, holder):
+        cycles: list[int] = []
+
+        class Store(TokenStore):
+            def lease(self, name, ttl_seconds):
+                assert name == "presync"
+                return holder
+
+        async def run_cycle():
+            cycles.append(1)
+
+        monkeypatch.setattr(presync, "store", Store())
+        monkeypatch.setattr(presync.scheduler, "run_cycle", run_cycle)
+        monkeypatch.setattr(presync.get_settings(), "presync_interval_seconds", 0.01)
+
+        async def main():
+            loop = asyncio.create_task(presync.presync_loop())
+            await asyncio.sleep(0.05)
+            loop.cancel()
+
+        asyncio.run(main())
+        assert bool(cycles) == holder
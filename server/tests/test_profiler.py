@@ -0,0 +1,123 @@
+"""Tests for the per-request profiler and its admin endpoints."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.models.schemas import CalendarEvent, CapacityConstraints, Goal, GoalCategory
+from app.services import profiler
+from app.services.scheduler import generate_plan
+
+SECRET_TITLE = "Therapy with Dr. Example"
+
+
+def _plan_with_private_event():
+    day = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    goal = Goal(id="g1", name="Study", category=GoalCategory.study, weekly_target_hours=5, created_at=day)
+    event = CalendarEvent(
+        id="e1", title=SECRET_TITLE,
+        start=day.replace(hour=10), end=day.replace(hour=11),
+    )
+    return generate_plan([goal], [event], CapacityConstraints(), start_date=day, days=2)
+
+
+def _balanced(events: list[dict]) -> bool:
+    stack = []
+    for e in events:
+        if e["type"] == "O":
+            stack.append(e["frame"])
+        elif not stack or stack.pop() != e["frame"]:
+            return False
+    return not stack
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    profiler.profiles.clear()
+    yield
+    profiler.profiles.clear()
+
+
+class TestShape:
+    def test_never_includes_content(self):
+        assert profiler.shape(SECRET_TITLE) == f"str[{len(SECRET_TITLE)}]"
+        assert profiler.shape([{"title": SECRET_TITLE}]) == "list[1] of dict[1]"
+        assert profiler.shape(None) == "NoneType"
+
+
+class TestRecorder:
+    def test_profile_is_nested_and_redacted(self):
+        recorder, token = profiler.start("test")
+        _plan_with_private_event()
+        profile_id = profiler.stop(recorder, token, {"path": "/test"})
+
+        profile = profiler.profiles.get(profile_id)
+        names = {f["name"] for f in profile["shared"]["frames"]}
+        assert "generate_plan" in names
+        assert "compute_free_blocks" in names
+        assert _balanced(profile["profiles"][0]["events"])
+        assert profile["chronoforge"]["arguments"]["generate_plan"].startswith(
+            "goals=list[1] of Goal, fixed_events=list[1] of CalendarEvent"
+        )
+        assert SECRET_TITLE not in json.dumps(profile)
+
+    def test_other_tasks_are_not_traced(self):
+        def untraced_work():
+            return sum(range(10))
+
+        async def bystander():
+            await asyncio.sleep(0)
+            return untraced_work()
+
+        async def run():
+            other = asyncio.create_task(bystander())
+            recorder, token = profiler.start("test")
+            await asyncio.sleep(0.01)
+            profile_id = profiler.stop(recorder, token, {})
+            await other
+            return profiler.profiles.get(profile_id)
+
+        profile = asyncio.run(run())
+        assert "untraced_work" not in {f["name"] for f in profile["shared"]["frames"]}
+
+
+class TestEndpoints:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "profiling_enabled", True)
+        monkeypatch.setattr(get_settings(), "profiling_token", "op-token")
+        return TestClient(app)
+
+    def test_capture_and_fetch(self, client):
+        resp = client.get("/health", headers={"X-Profile-Token": "op-token"})
+        profile_id = resp.headers["X-Profile-Id"]
+
+        listed = client.get("/admin/profiles", headers={"X-Profile-Token": "op-token"}).json()
+        assert [p["id"] for p in listed["profiles"]] == [profile_id]
+        assert listed["profiles"][0]["path"] == "/health"
+
+        profile = client.get(f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": "op-token"}).json()
+        assert profile["profiles"][0]["type"] == "evented"
+        assert "health" in {f["name"] for f in profile["shared"]["frames"]}
+
+    def test_wrong_token_neither_profiles_nor_reads(self, client):
+        resp = client.get("/health", headers={"X-Profile-Token": "guess"})
+        assert "X-Profile-Id" not in resp.headers
+        assert client.get("/admin/profiles", headers={"X-Profile-Token": "guess"}).status_code == 403
+
+    def test_non_ascii_token_is_rejected_not_an_error(self, client):
+        headers = {"X-Profile-Token": "op-t\xf6ken".encode("latin-1")}
+        assert "X-Profile-Id" not in client.get("/health", headers=headers).headers
+        assert client.get("/admin/profiles", headers=headers).status_code == 403
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "profiling_enabled", False)
+        monkeypatch.setattr(get_settings(), "profiling_token", "op-token")
+        client = TestClient(app)
+        assert "X-Profile-Id" not in client.get("/health", headers={"X-Profile-Token": "op-token"}).headers
+        assert client.get("/admin/profiles", headers={"X-Profile-Token": "op-token"}).status_code == 404
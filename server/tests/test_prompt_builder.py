@@ -0,0 +1,66 @@
+"""Tests for the aggregated, token-budgeted insights prompt."""
+
+from datetime import datetime, timezone
+
+from app.models.schemas import CalendarEvent, CapacityConstraints, Goal, GoalCategory
+from app.services.prompt_builder import (
+    build_insights_prompt, estimate_tokens, measure, summarize_plan,
+)
+from app.services.scheduler import generate_plan
+
+
+def _dt(day: int, hour: int = 0) -> datetime:
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+def _goals(n: int) -> list[Goal]:
+    return [
+        Goal(
+            id=f"g{i}", name=f"Goal {i}", category=GoalCategory.study,
+            priority_weight=5, weekly_target_hours=20.0, created_at=_dt(1),
+        )
+        for i in range(n)
+    ]
+
+
+def _plan(goals: list[Goal]):
+    meeting = CalendarEvent(id="m", title="Lecture", start=_dt(2, 9), end=_dt(2, 11))
+    return generate_plan(goals, [meeting], CapacityConstraints(), start_date=_dt(1), days=14)
+
+
+class TestSummarizePlan:
+    def test_totals_match_blocks(self):
+        goals = _goals(2)
+        plan = _plan(goals)
+        summary = summarize_plan(plan, goals)
+        planned = sum(
+            (b.end - b.start).total_seconds() / 3600 for b in plan.blocks if not b.is_fixed
+        )
+        assert abs(summary.planned_hours - planned) < 1e-6
+        assert summary.fixed_hours == 2.0
+        assert sum(summary.by_category.values()) == summary.planned_hours
+        assert len(summary.by_day) == 14
+        assert summary.by_goal["g0"].target_hours == 40.0
+
+
+class TestBuildPrompt:
+    def test_fits_budget(self):
+        goals = _goals(30)
+        plan = _plan(goals)
+        for budget in (250, 600, 1200):
+            assert measure(build_insights_prompt(plan, goals, budget))["tokens"] <= budget + 5
+
+    def test_truncated_sections_say_so(self):
+        goals = _goals(30)
+        prompt = build_insights_prompt(_plan(goals), goals, 400)
+        assert "more" in prompt.splitlines()[-1]
+
+    def test_generous_budget_covers_every_day(self):
+        goals = _goals(3)
+        prompt = build_insights_prompt(_plan(goals), goals, 5000)
+        assert "2026-03-14" in prompt
+        assert "Hours by category" in prompt
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcdefgh") == 2
@@ -4,9 +4,10 @@ import pytest
 from datetime import datetime, timedelta, timezone
 
 from app.models.schemas import (
-    CalendarEvent, Goal, GoalCategory, CapacityConstraints,
+    BusyInterval, CalendarEvent, Goal, GoalCategory, CapacityConstraints,
     TimeWindow,
 )
+from app.services.google_service import merge_intervals
 from app.services.scheduler import compute_free_blocks, generate_plan, FreeSlot
 
 
@@ -156,3 +157,37 @@ class TestGeneratePlan:
         fixed = [b for b in plan.blocks if b.is_fixed]
         assert len(fixed) == 1
         assert fixed[0].goal_name == "Team Standup"
+
+
+class TestBusyIntervals:
+    def test_merge_intervals_coalesces_overlaps(self):
+        merged = merge_intervals([
+            BusyInterval(start=_dt(2026, 3, 1, 13), end=_dt(2026, 3, 1, 14)),
+            BusyInterval(start=_dt(2026, 3, 1, 9), end=_dt(2026, 3, 1, 11)),
+            BusyInterval(start=_dt(2026, 3, 1, 10), end=_dt(2026, 3, 1, 12)),
+            BusyInterval(start=_dt(2026, 3, 1, 12), end=_dt(2026, 3, 1, 13)),
+        ])
+        assert len(merged) == 1
+        assert merged[0].start == _dt(2026, 3, 1, 9)
+        assert merged[0].end == _dt(2026, 3, 1, 14)
+
+    def test_busy_subtracts_time(self):
+        constraints = CapacityConstraints(sleep_start_hour=0, sleep_end_hour=7)
+        busy = [BusyInterval(start=_dt(2026, 3, 1, 10), end=_dt(2026, 3, 1, 12))]
+        free = compute_free_blocks(_dt(2026, 3, 1), _dt(2026, 3, 2), [], constraints, busy)
+        total_free = sum(s.hours for s in free)
+        assert 14.5 <= total_free <= 15.0
+
+    def test_busy_appears_as_fixed_blocks(self):
+        busy = [BusyInterval(start=_dt(2026, 3, 1, 9), end=_dt(2026, 3, 1, 10))]
+        plan = generate_plan(
+            goals=[],
+            fixed_events=[],
+            constraints=CapacityConstraints(),
+            start_date=_dt(2026, 3, 1),
+            days=1,
+            busy_intervals=busy,
+        )
+        fixed = [b for b in plan.blocks if b.is_fixed]
+        assert len(fixed) == 1
+        assert fixed[0].goal_name == "Busy"
@@ -0,0 +1,178 @@
+"""Tests for the shared-state backends, run against a local RESP stand-in."""
+
+import asyncio
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app.models.schemas import PlanResponse
+from app.services.shared_state import (
+    InProcessState, RESPState, SharedMap, SharedState, SharedStateError,
+)
+
+
+class _StandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for RESPState: AUTH, SELECT, GET, SET [PX], DEL."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, password: str | None = None) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.password = password
+        self.data: dict[bytes, tuple[float | None, bytes]] = {}
+        self.connections = 0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self) -> None:
+        server: _StandIn = self.server
+        server.connections += 1
+        authed = server.password is None
+        while (args := self._command()) is not None:
+            name, rest = args[0].upper(), args[1:]
+            if name == b"AUTH":
+                authed = rest[0].decode() == server.password
+                self.wfile.write(b"+OK\r\n" if authed else b"-WRONGPASS invalid password\r\n")
+            elif not authed:
+                self.wfile.write(b"-NOAUTH Authentication required.\r\n")
+            elif name == b"SELECT":
+                self.wfile.write(b"+OK\r\n")
+            elif name == b"GET":
+                expires_at, value = server.data.get(rest[0], (None, None))
+                if value is None or (expires_at is not None and time.monotonic() > expires_at):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif name == b"SET":
+                ttl = int(rest[3]) / 1000 if len(rest) > 3 and rest[2].upper() == b"PX" else None
+                server.data[rest[0]] = (None if ttl is None else time.monotonic() + ttl, rest[1])
+                self.wfile.write(b"+OK\r\n")
+            elif name == b"DEL":
+                self.wfile.write(b":%d\r\n" % int(server.data.pop(rest[0], None) is not None))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+            self.wfile.flush()
+
+
+@pytest.fixture
+def stand_in():
+    server = _StandIn(password="s3cret")
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resp(stand_in):
+    host, port = stand_in.server_address
+    state = RESPState.from_url(f"redis://:s3cret@{host}:{port}/1", pool_size=2)
+    yield state
+    state.close()
+
+
+def _plan() -> PlanResponse:
+    return PlanResponse(blocks=[], unmet=[], capacity_by_day=[], coaching_messages=["Stay on it."])
+
+
+class TestInProcessState:
+    def test_get_set_delete_and_expiry(self):
+        state = InProcessState()
+        state.set("a", b"1")
+        state.set("b", b"2", ttl_seconds=0.01)
+        assert state.get("a") == b"1"
+        time.sleep(0.02)
+        assert state.get("b") is None
+        state.delete("a")
+        assert state.get("a") is None
+
+    def test_expired_keys_nobody_reads_are_swept(self):
+        state = InProcessState()
+        for i in range(3000):
+            state.set(f"gone-{i}", b"x", ttl_seconds=0.001)
+        time.sleep(0.01)
+        for i in range(3000):
+            state.set(f"kept-{i}", b"x")
+        assert len(state._data) < 4100
+
+
+class TestRESPState:
+    def test_round_trip(self, resp):
+        assert resp.get("missing") is None
+        resp.set("k", b"binary\r\nvalue\x00")
+        assert resp.get("k") == b"binary\r\nvalue\x00"
+        resp.delete("k")
+        assert resp.get("k") is None
+
+    def test_ttl(self, resp):
+        resp.set("k", b"v", ttl_seconds=0.01)
+        time.sleep(0.02)
+        assert resp.get("k") is None
+
+    def test_reuses_pooled_connections(self, resp, stand_in):
+        for i in range(10):
+            resp.set(f"k{i}", b"v")
+        assert stand_in.connections == 1
+
+    def test_wrong_password(self, stand_in):
+        host, port = stand_in.server_address
+        state = RESPState(host, port, password="nope")
+        with pytest.raises(SharedStateError, match="WRONGPASS"):
+            state.get("k")
+
+    def test_unreachable_server(self, stand_in):
+        host, port = stand_in.server_address
+        stand_in.shutdown()
+        stand_in.server_close()
+        with pytest.raises(SharedStateError):
+            RESPState(host, port, timeout_seconds=0.2).get("k")
+
+    def test_unsupported_url(self):
+        with pytest.raises(ValueError):
+            RESPState.from_url("memcached://localhost")
+
+
+class TestSharedMap:
+    def test_workers_share_plans(self, resp, stand_in):
+        host, port = stand_in.server_address
+        other = RESPState(host, port, password="s3cret")
+        writer = SharedMap(resp, "plan", PlanResponse)
+        reader = SharedMap(other, "plan", PlanResponse)
+
+        async def run():
+            await writer.aio.set("u1", _plan())
+            return await reader.aio.get("u1")
+
+        assert asyncio.run(run()) == _plan()
+        assert b"chronoforge:plan:u1" in stand_in.data
+        other.close()
+
+    def test_in_process_runs_inline_without_serializing(self, monkeypatch):
+        plans = SharedMap(InProcessState(), "plan", PlanResponse)
+        plan = _plan()
+        monkeypatch.setattr(PlanResponse, "model_dump_json", None)  # would fail if called
+        plans.set("u1", plan)
+        assert plans.get("u1") is plan
+        assert plans.aio._offload is False
+
+    def test_backends_must_implement_the_interface(self):
+        class Partial(SharedState):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Partial()
@@ -0,0 +1,92 @@
+"""Cold-start budget for importing app.main, measured in a fresh interpreter."""
+
+import asyncio
+import builtins
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.services import lazy
+
+SERVER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous on purpose (about 2x a laptop measurement); tighten as startup gets leaner.
+IMPORT_BUDGET_SECONDS = 2.0
+MEMORY_BUDGET_MB = 45
+
+DEFERRED = ("httpx._client", "jose.jwt", "cryptography.fernet", "google.generativeai")
+
+_PROBE = """
+import json, resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - started
+grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+loaded = [n for n, m in sys.modules.items() if type(m).__name__ == "module"]
+print(json.dumps({"seconds": seconds, "mb": grown * scale / 2**20, "loaded": loaded}))
+"""
+
+
+def _probe() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=SERVER_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestImportBudget:
+    def test_app_main_within_budget(self):
+        result = _probe()
+        assert result["seconds"] < IMPORT_BUDGET_SECONDS, result["seconds"]
+        assert result["mb"] < MEMORY_BUDGET_MB, result["mb"]
+
+    def test_heavy_dependencies_are_deferred(self):
+        loaded = set(_probe()["loaded"])
+        assert not loaded & set(DEFERRED)
+
+
+class TestWarmUp:
+    def test_loads_deferred_modules_and_runs_warmers(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(lazy, "_warmers", [lambda: calls.append(1), lambda: 1 / 0])
+        module = lazy.lazy_import("app.services.lazy")  # already loaded: returned as-is
+        assert module is lazy
+        asyncio.run(lazy.warm_up_in_background())
+        assert calls == [1]
+        assert all(type(m).__name__ == "module" for m in lazy._deferred)
+
+    def test_missing_module(self):
+        with pytest.raises(ModuleNotFoundError):
+            lazy.lazy_import("chronoforge_no_such_module")
+
+    def test_concurrent_first_access_runs_the_module_once(self, tmp_path, monkeypatch):
+        (tmp_path / "chronoforge_slow_module.py").write_text(
+            "import builtins, time\n"
+            "builtins.chronoforge_slow_runs = getattr(builtins, 'chronoforge_slow_runs', 0) + 1\n"
+            "time.sleep(0.2)\n"
+            "VALUE = 42\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "chronoforge_slow_module", raising=False)
+        module = lazy.lazy_import("chronoforge_slow_module")
+        monkeypatch.setattr(lazy, "_deferred", [module])
+        monkeypatch.setattr(lazy, "_warmers", [])
+
+        async def race():
+            warm = asyncio.create_task(lazy.warm_up_in_background())
+            await asyncio.sleep(0.05)  # the warm-up thread is mid-load
+            values = await asyncio.gather(*(asyncio.to_thread(getattr, module, "VALUE") for _ in range(4)))
+            await warm
+            return values
+
+        try:
+            assert asyncio.run(race()) == [42] * 4
+            assert builtins.chronoforge_slow_runs == 1
+        finally:
+            builtins.__dict__.pop("chronoforge_slow_runs", None)
+            sys.modules.pop("chronoforge_slow_module", None)
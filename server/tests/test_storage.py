@@ -0,0 +1,221 @@
+"""Tests for the SQLite store backend."""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.config import get_settings
+from app.models.schemas import CheckInCreate, CheckInStatus, GoalCategory, GoalCreate
+from app.services.checkin_store import SQLiteCheckInStore
+from app.services.database import Database
+from app.services.goal_store import SQLiteGoalStore
+from app.services.token_store import SQLiteTokenStore, reencrypt_all
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "test.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+def _checkin(block_id: str = "b1") -> CheckInCreate:
+    return CheckInCreate(
+        block_id=block_id, planned_goal_id="g1", planned_goal_name="Study",
+        start=datetime(2026, 3, 1, 9, tzinfo=timezone.utc),
+        end=datetime(2026, 3, 1, 10, tzinfo=timezone.utc),
+        what_i_did="Problem set",
+    )
+
+
+class TestDatabase:
+    def test_wal_mode_and_indexes(self, db):
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"checkins_user_created", "checkins_user_block", "goals_user_created"} <= indexes
+
+    def test_lease_is_held_by_one_worker(self, db, monkeypatch):
+        assert db.try_lease("job", 60)
+        assert db.try_lease("job", 60)  # the holder may renew
+        monkeypatch.setattr("app.services.database.WORKER_ID", "other-worker")
+        assert not db.try_lease("job", 60)
+        assert db.try_lease("another-job", 60)
+
+    def test_released_leases_go_to_the_next_process(self, db, monkeypatch):
+        assert db.try_lease("job", 600)
+        db.release_leases()
+        monkeypatch.setattr("app.services.database.WORKER_ID", "restarted-worker")
+        assert db.try_lease("job", 600)
+
+    def test_pool_is_bounded(self, db):
+        def borrow():
+            with db.connection():
+                pass
+
+        threads = [threading.Thread(target=borrow) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert db._size <= 2
+
+    def test_data_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "reopen.db")
+        first = Database(path)
+        SQLiteGoalStore(first).create_goal("u1", GoalCreate(name="Gym", category=GoalCategory.fitness))
+        first.close()
+        names = [g.name for g in SQLiteGoalStore(Database(path)).list_goals("u1")]
+        assert names == ["Study / Homework", "Gym"]
+
+
+class TestSQLiteGoalStore:
+    def test_seeds_default_goal_once(self, db):
+        goals = SQLiteGoalStore(db)
+        assert len(goals.list_goals("u1")) == 1
+        assert len(goals.list_goals("u1")) == 1
+        assert goals.user_ids() == ["u1"]
+
+    def test_create_and_get(self, db):
+        goals = SQLiteGoalStore(db)
+        goal = goals.create_goal("u1", GoalCreate(name="Gym", category=GoalCategory.fitness))
+        assert goals.get_goal("u1", goal.id) == goal
+        assert goals.get_goal("u2", goal.id) is None
+
+
+class TestSQLiteCheckInStore:
+    def test_recent_first_and_by_block(self, db):
+        checkins = SQLiteCheckInStore(db)
+        first = checkins.add("u1", _checkin("b1"))
+        second = checkins.add("u1", _checkin("b2"))
+        checkins.add("u2", _checkin("b1"))
+        assert [c.id for c in checkins.list_recent("u1")] == [second.id, first.id]
+        assert checkins.get_by_block("u1", "b1") == first
+        assert checkins.recent_summaries("u1", limit=1) == ["Study: Problem set"]
+
+    def test_cursor_pages(self, db):
+        checkins = SQLiteCheckInStore(db)
+        added = [checkins.add("u1", _checkin(f"b{i}")) for i in range(5)]
+        seen, cursor = [], None
+        while True:
+            page, cursor = checkins.list_page("u1", limit=2, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert seen == added[::-1]
+
+    def test_set_assessment(self, db):
+        checkins = SQLiteCheckInStore(db)
+        check_in = checkins.add("u1", _checkin(), status="pending")
+        checkins.set_assessment("u1", check_in.id, "Solid", "Keep going")
+        stored = checkins.get("u1", check_in.id)
+        assert (stored.status, stored.assessment) == ("assessed", "Solid")
+        assert checkins.set_assessment("u2", check_in.id, "x", "y") is None
+
+    def test_pending_lists_unassessed_check_ins(self, db):
+        checkins = SQLiteCheckInStore(db)
+        checkins.add("u1", _checkin("b1"))
+        waiting = checkins.add("u2", _checkin("b2"), status=CheckInStatus.pending)
+        assert checkins.pending() == [("u2", waiting)]
+
+    def test_async_access_runs_off_the_loop(self, db):
+        checkins = SQLiteCheckInStore(db)
+
+        async def run():
+            loop_thread = threading.get_ident()
+            seen = []
+            original = checkins.add
+
+            def add(*args, **kwargs):
+                seen.append(threading.get_ident())
+                return original(*args, **kwargs)
+
+            checkins.add = add
+            check_in = await checkins.aio.add("u1", _checkin())
+            return check_in, seen[0] != loop_thread
+
+        check_in, offloaded = asyncio.run(run())
+        assert offloaded
+        assert checkins.get("u1", check_in.id) == check_in
+
+
+class TestSQLiteTokenStore:
+    def test_round_trip_with_every_token_encrypted(self, db, monkeypatch):
+        monkeypatch.setattr(get_settings(), "token_encryption_key", Fernet.generate_key().decode())
+        tokens = SQLiteTokenStore(db)
+        assert tokens.get("u1") is None
+        ut = tokens.get_or_create("u1")
+        ut.google_access_token = "access"
+        ut.canvas_access_token = "canvas"
+        ut.set_google_refresh("refresh")
+        tokens.save("u1", ut)
+
+        with db.connection() as conn:
+            stored = conn.execute(
+                "SELECT google_access_token_enc, google_refresh_token_enc, canvas_access_token_enc FROM tokens"
+            ).fetchone()
+        assert not {"access", "refresh", "canvas"} & set(stored)
+        loaded = tokens.get("u1")
+        assert (loaded.google_access_token, loaded.canvas_access_token) == ("access", "canvas")
+        assert loaded.get_google_refresh() == "refresh"
+        assert tokens.user_ids() == ["u1"]
+
+        tokens.set_google_access_token("u1", "refreshed")
+        loaded = tokens.get("u1")
+        assert (loaded.google_access_token, loaded.canvas_access_token) == ("refreshed", "canvas")
+
+    def test_plaintext_columns_of_older_databases_are_encrypted(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(get_settings(), "token_encryption_key", Fernet.generate_key().decode())
+        path = str(tmp_path / "old.db")
+        old = Database(path)
+        with old.connection() as conn:
+            conn.execute("DROP TABLE tokens")
+            conn.execute(
+                "CREATE TABLE tokens (user_id TEXT PRIMARY KEY, google_access_token TEXT, "
+                "google_refresh_token_enc TEXT, canvas_access_token TEXT, email TEXT)"
+            )
+            conn.execute("INSERT INTO tokens VALUES ('u1', 'access', NULL, 'canvas', 'u1@example.test')")
+        old.close()
+
+        db = Database(path)
+        tokens = SQLiteTokenStore(db)
+        with db.connection() as conn:
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(tokens)")}
+        assert not {"google_access_token", "canvas_access_token"} & columns
+        loaded = tokens.get("u1")
+        assert (loaded.google_access_token, loaded.canvas_access_token) == ("access", "canvas")
+        db.close()
+
+    def test_reencrypt_rotates_every_column_without_clobbering_saves(self, db, monkeypatch):
+        old, new = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+        monkeypatch.setattr(get_settings(), "token_encryption_key", old)
+        tokens = SQLiteTokenStore(db)
+        ut = tokens.get_or_create("u1")
+        ut.google_access_token, ut.canvas_access_token = "access", "canvas"
+        ut.set_google_refresh("refresh")
+        tokens.save("u1", ut)
+
+        monkeypatch.setattr(get_settings(), "token_encryption_key", f"{new},{old}")
+        stale = tokens.encrypted("u1")["canvas_access_token_enc"]
+        report = asyncio.run(reencrypt_all(tokens))
+        assert (report.rotated, report.failed) == (3, 0)
+        # A reconnect saved between our read and write wins over the rotation.
+        fresh = tokens.get("u1")
+        fresh.canvas_access_token = "reconnected"
+        tokens.save("u1", fresh)
+        assert not tokens.replace_encrypted("u1", "canvas_access_token_enc", stale, "rotated")
+
+        monkeypatch.setattr(get_settings(), "token_encryption_key", new)
+        loaded = tokens.get("u1")
+        assert (loaded.google_access_token, loaded.canvas_access_token) == ("access", "reconnected")
+        assert loaded.get_google_refresh() == "refresh"
+
+    def test_reencrypt_skipped_while_another_worker_holds_the_lease(self, db, monkeypatch):
+        tokens = SQLiteTokenStore(db)
+        monkeypatch.setattr("app.services.database.WORKER_ID", "other-worker")
+        assert db.try_lease("token-reencrypt", 60)
+        monkeypatch.undo()
+        assert asyncio.run(reencrypt_all(tokens)).users == 0